@@ -0,0 +1,64 @@
+"""
+Wall time of the `clean` + `features` stages (load, clean, imputation, tenure
+binning, derived features) with execution.backend "pandas" vs. "polars"
+(one lazy query; needs `pip install polars`), with and without `data.schema`,
+and whether both backends produce the same frame.
+
+    python -m benchmarks.bench_backends --rows 1000000
+"""
+from __future__ import annotations
+import argparse
+import copy
+import os
+import tempfile
+import time
+import warnings
+import pandas as pd
+import yaml
+
+from benchmarks.bench_feature_engine import sample_rows
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.polars_backend import PolarsFeaturePlan
+
+def measure(config: dict, backend: str, repeat: int) -> tuple:
+    config = copy.deepcopy(config)
+    config["execution"] = {**config.get("execution", {}), "backend": backend}
+    pipeline = DataPipeline(config)
+    best, df = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = pipeline._features(pipeline._clean()["clean_df"])["features_df"]
+        best = min(best, time.perf_counter() - start)
+    return best, df
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    if not PolarsFeaturePlan.available():
+        raise SystemExit("polars is not installed (pip install polars)")
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    sample_rows(pd.read_csv(args.data, dtype=str, keep_default_na=False), args.rows).to_csv(tmp_path, index=False)
+    config["data"]["file_path"] = tmp_path
+    inferred = copy.deepcopy(config)
+    inferred["data"].pop("schema", None)
+    try:
+        print(f"{'schema':>9} {'rows':>11} {'pandas s':>9} {'polars s':>9} {'speedup':>8} {'identical':>10}")
+        for label, conf in (("inferred", inferred), ("explicit", config)):
+            pandas_s, expected = measure(conf, "pandas", args.repeat)
+            polars_s, actual = measure(conf, "polars", args.repeat)
+            identical = expected.equals(actual) and list(expected.dtypes) == list(actual.dtypes)
+            print(f"{label:>9} {len(expected):>11,} {pandas_s:>9.2f} {polars_s:>9.2f} {pandas_s / polars_s:>7.1f}x {str(identical):>10}")
+    finally:
+        os.remove(tmp_path)
+
+if __name__ == "__main__":
+    main()
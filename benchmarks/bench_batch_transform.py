@@ -0,0 +1,65 @@
+"""
+Wall time of the parallel batch transform (BatchTransformer) on a synthetic
+scoring file for several worker counts, next to the single-call transform of
+the whole file (`main.py transform <csv> -o X.npy`). The artifacts are those
+of --config, which must have been produced by a pipeline run.
+
+    python -m benchmarks.bench_batch_transform --rows 10000000 --workers 1 2 4 8
+"""
+from __future__ import annotations
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import pandas as pd
+import yaml
+
+from benchmarks.synthetic_telco import TelcoSynthesizer
+from data_pipeline.batch_transformer import BatchTransformer
+from data_pipeline.scoring_service import ChurnScorer
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--skip-single", action="store_true", help="Skip the whole-file transform (needs the file in memory)")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    workdir = tempfile.mkdtemp(prefix="bench_batch_")
+    try:
+        path = os.path.join(workdir, "records.csv")
+        start = time.perf_counter()
+        TelcoSynthesizer.from_csv(args.data).write_csv(path, args.rows)
+        print(f"Synthesized {args.rows:,} rows ({os.path.getsize(path) / 2**20:,.0f} MiB) in {time.perf_counter() - start:.1f}s "
+              f"on {os.cpu_count()} cores")
+
+        print(f"{'mode':>14} {'wall s':>8} {'rows/s':>12} {'speedup':>8}")
+        if not args.skip_single:
+            start = time.perf_counter()
+            ChurnScorer.load_preprocessor(config).transform(ChurnScorer.load_preparer(config).features_only(pd.read_csv(path)))
+            wall = time.perf_counter() - start
+            print(f"{'single call':>14} {wall:>8.2f} {args.rows / wall:>12,.0f} {'':>8}")
+        walls = {}
+        for workers in args.workers:
+            out = os.path.join(workdir, f"shards_{workers}")
+            start = time.perf_counter()
+            BatchTransformer(config, workers=workers, chunk_size=args.chunk_size).run(path, out)
+            wall = time.perf_counter() - start
+            walls[workers] = wall
+            # Relative to the 1-worker run (or the first one measured)
+            reference = walls.get(1, next(iter(walls.values())))
+            print(f"{f'{workers} workers':>14} {wall:>8.2f} {args.rows / wall:>12,.0f} {reference / wall:>7.2f}x")
+            shutil.rmtree(out)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Rows/sec of the declarative FeatureEngine vs. the legacy
+FeatureBinning + FeatureEngineering.add_features stages.
+
+    python -m benchmarks.bench_feature_engine --sizes 10000 1000000 10000000
+"""
+from __future__ import annotations
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import yaml
+
+from data_pipeline.feature_engine import FeatureEngine
+
+def sample_rows(source: pd.DataFrame, n_rows: int, seed: int = 0) -> pd.DataFrame:
+    idx = np.random.default_rng(seed).integers(0, len(source), n_rows)
+    return source.take(idx).reset_index(drop=True)
+
+def time_stage(stage, df: pd.DataFrame) -> float:
+    frame = df.copy()
+    start = time.perf_counter()
+    stage(frame)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=None,
+                        help="Skip the row-wise legacy stage above this many rows")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    legacy = FeatureEngine.stage_for({**config, "features": {"engine": "legacy"}})
+    engine = FeatureEngine.stage_for({**config, "features": {**config.get("features", {}), "engine": "vectorized"}})
+    source = pd.read_csv(args.data)
+
+    print(f"{'rows':>12} {'legacy rows/s':>15} {'engine rows/s':>15} {'speedup':>9}")
+    for n_rows in args.sizes:
+        df = sample_rows(source, n_rows)
+        engine_s = time_stage(engine, df)
+        if args.legacy_max_rows is not None and n_rows > args.legacy_max_rows:
+            print(f"{n_rows:>12,} {'skipped':>15} {n_rows / engine_s:>15,.0f} {'-':>9}")
+            continue
+        legacy_s = time_stage(legacy, df)
+        print(f"{n_rows:>12,} {n_rows / legacy_s:>15,.0f} {n_rows / engine_s:>15,.0f} {legacy_s / engine_s:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
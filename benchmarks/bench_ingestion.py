@@ -0,0 +1,59 @@
+"""
+Parse time and resident bytes per row of the raw CSV load, with pandas type
+inference vs. the explicit `data.schema` (categoricals, usecols, na_values).
+
+    python -m benchmarks.bench_ingestion --rows 1000000
+"""
+from __future__ import annotations
+import argparse
+import copy
+import os
+import tempfile
+import time
+import pandas as pd
+import yaml
+
+from benchmarks.bench_feature_engine import sample_rows
+from data_pipeline.data_ingestion import DataIngestion
+
+def measure(config: dict) -> tuple:
+    ingestion = DataIngestion(config)
+    start = time.perf_counter()
+    df = ingestion.load_data()
+    seconds = time.perf_counter() - start
+    return seconds, df.memory_usage(deep=True).sum() / len(df), len(df)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type=int, default=None,
+                        help="Resample the CSV to this many rows (written to a temp file) before measuring")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    config["data"]["file_path"] = args.data
+    tmp_path = None
+    if args.rows is not None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        sample_rows(pd.read_csv(args.data, dtype=str, keep_default_na=False), args.rows).to_csv(tmp_path, index=False)
+        config["data"]["file_path"] = tmp_path
+
+    inferred = copy.deepcopy(config)
+    inferred["data"].pop("schema", None)
+    try:
+        print(f"{'load':>10} {'rows':>12} {'seconds':>9} {'bytes/row':>11}")
+        results = {}
+        for label, conf in (("inferred", inferred), ("schema", config)):
+            seconds, bpr, n_rows = measure(conf)
+            results[label] = bpr
+            print(f"{label:>10} {n_rows:>12,} {seconds:>9.3f} {bpr:>11,.0f}")
+        print(f"schema uses {results['inferred'] / results['schema']:.1f}x less memory per row")
+    finally:
+        if tmp_path is not None:
+            os.remove(tmp_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Scaling curve of every pipeline component on synthetic Telco data.
+
+For each row count a CSV is generated with benchmarks.synthetic_telco and the
+components run in pipeline order, each timed with StageProfiler (wall, CPU,
+peak-RSS growth). Results go to a JSON file; `--compare` checks them against
+an earlier file and exits non-zero when a component's throughput dropped by
+more than `--tolerance`.
+
+    python -m benchmarks.bench_pipeline_stages --sizes 10000 100000 1000000
+    python -m benchmarks.bench_pipeline_stages --sizes 10000 --compare benchmarks/results/baseline.json
+"""
+from __future__ import annotations
+import argparse
+import copy
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+import sklearn
+import yaml
+
+from benchmarks.synthetic_telco import TelcoSynthesizer, parse_cardinality
+from data_pipeline.data_ingestion import DataIngestion
+from data_pipeline.handle_missing_values import MissingValueHandler
+from data_pipeline.feature_binning import FeatureBinning
+from data_pipeline.feature_engineering import FeatureEngineering
+from data_pipeline.feature_engine import FeatureEngine
+from data_pipeline.data_splitter import DataSplitter
+from data_pipeline.feature_encoding import PreprocessorFactory
+from data_pipeline.imbalance_handler import ImbalanceHandler
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.stage_profiler import StageProfiler
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": sys.version.split()[0], "platform": platform.platform(), "cpu_count": os.cpu_count(),
+        "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__, "git_commit": commit,
+    }
+
+def run_components(config: Dict, n_rows: int, out_dir: str, legacy_max_rows: int, resample_max_rows: int) -> List[Dict]:
+    prep = config["preprocessing"]
+    profiler = StageProfiler(report_path=os.path.join(out_dir, "unused.json"))
+
+    with profiler.stage("DataIngestion") as r:
+        ingestion = DataIngestion(config)
+        df = ingestion.basic_clean(ingestion.load_data())
+        r["outputs"] = StageProfiler.shapes({"df": df})
+    with profiler.stage("MissingValueHandler", {"df": df}):
+        df = MissingValueHandler(prep["missing_value_strategy"], prep.get("numeric_to_coerce", [])).coerce_and_impute(df)
+    with profiler.stage("FeatureBinning", {"df": df}):
+        df = FeatureBinning(prep["binning"]["tenure_bins"], prep["binning"]["tenure_labels"]).add_tenure_category(df)
+    if n_rows <= legacy_max_rows:
+        with profiler.stage("FeatureEngineering", {"df": df}):
+            FeatureEngineering(prep["service_columns"], prep["autopay_keywords"]).add_features(df.copy())
+    with profiler.stage("FeatureEngine", {"df": df}):
+        df = FeatureEngine.from_config(config).transform(df)
+
+    target = config["data"]["target_column"]
+    with profiler.stage("DataSplitter", {"df": df}):
+        X_train, X_test, y_train, y_test = DataSplitter.split(
+            df.drop(columns=[target]), df[target], test_size=prep["test_size"], random_state=prep["random_state"])
+    with profiler.stage("PreprocessorFactory", {"X_train": X_train, "X_test": X_test}) as r:
+        numeric = list(X_train.select_dtypes(include=["int64", "float64"]).columns)
+        categorical = list(X_train.select_dtypes(include=["object", "category"]).columns)
+        preprocessor = PreprocessorFactory.create(numeric, categorical, config)
+        X_train_proc = preprocessor.fit_transform(X_train)
+        X_test_proc = preprocessor.transform(X_test)
+        r["outputs"] = StageProfiler.shapes({"X_train_proc": X_train_proc, "X_test_proc": X_test_proc})
+    if n_rows <= resample_max_rows and ImbalanceHandler.strategy_for(config) != "none":
+        with profiler.stage("ImbalanceHandler", {"X_train_proc": X_train_proc}, strategy=ImbalanceHandler.strategy_for(config)) as r:
+            X_train_proc, y_train = ImbalanceHandler.from_config(config).fit_resample(X_train_proc, y_train)
+            r["outputs"] = StageProfiler.shapes({"X_train_final": X_train_proc})
+    with profiler.stage("ArtifactSaver", {"X_train": X_train_proc, "X_test": X_test_proc}):
+        ArtifactSaver.save_matrix(os.path.join(out_dir, "X_train.npz"), X_train_proc)
+        ArtifactSaver.save_npz(os.path.join(out_dir, "y_train.npz"), np.asarray(y_train))
+        ArtifactSaver.save_matrix(os.path.join(out_dir, "X_test.npz"), X_test_proc)
+        ArtifactSaver.save_npz(os.path.join(out_dir, "y_test.npz"), np.asarray(y_test))
+        ArtifactSaver.save_preprocessor(os.path.join(out_dir, "preprocessor.joblib"), preprocessor)
+
+    results = []
+    for record in profiler.stages:
+        results.append({
+            "rows": n_rows, "component": record["stage"], "wall_s": record["wall_s"], "cpu_s": record["cpu_s"],
+            "rss_peak_delta_bytes": record["rss_peak_delta_bytes"],
+            "rows_per_s": n_rows / record["wall_s"] if record["wall_s"] > 0 else None,
+            **({"strategy": record["strategy"]} if "strategy" in record else {}),
+        })
+    return results
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    with open(baseline_path, "r") as f:
+        baseline = {(r["rows"], r["component"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["rows"], r["component"]))
+        if base and base["rows_per_s"] and r["rows_per_s"] and r["rows_per_s"] * tolerance < base["rows_per_s"]:
+            regressions.append(f"{r['component']} @ {r['rows']:,} rows: {r['rows_per_s']:,.0f} rows/s "
+                               f"vs baseline {base['rows_per_s']:,.0f}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--source", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--cardinality", nargs="*", default=[], metavar="COLUMN=LEVELS",
+                        help="Widen categorical columns of the synthetic data, e.g. PaymentMethod=1000")
+    parser.add_argument("--legacy-max-rows", type=int, default=200_000,
+                        help="Skip the row-wise FeatureEngineering stage above this many rows")
+    parser.add_argument("--resample-max-rows", type=int, default=200_000,
+                        help="Skip ImbalanceHandler above this many rows")
+    parser.add_argument("--output", default="benchmarks/results/pipeline_stages.json")
+    parser.add_argument("--compare", default=None, help="Earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Allowed slowdown factor in rows/s before --compare reports a regression")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    cardinality = parse_cardinality(args.cardinality)
+    synth = TelcoSynthesizer.from_csv(args.source, cardinality=cardinality)
+
+    results: List[Dict] = []
+    print(f"{'rows':>11} {'component':<20} {'wall s':>8} {'cpu s':>8} {'rows/s':>12} {'peak RSS +MiB':>14}")
+    for n_rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conf = copy.deepcopy(config)
+            conf["data"]["file_path"] = synth.write_csv(os.path.join(tmp, "telco.csv"), n_rows)
+            for r in run_components(conf, n_rows, tmp, args.legacy_max_rows, args.resample_max_rows):
+                results.append(r)
+                print(f"{n_rows:>11,} {r['component']:<20} {r['wall_s']:>8.3f} {r['cpu_s']:>8.3f} "
+                      f"{r['rows_per_s'] or 0:>12,.0f} {(r['rss_peak_delta_bytes'] or 0) / 2**20:>14.1f}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "cardinality": cardinality, "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
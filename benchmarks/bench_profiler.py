@@ -0,0 +1,84 @@
+"""
+Column statistics of a large CSV: pandas over the fully loaded frame
+(describe, median, value_counts: one read, then a pass per statistic) vs.
+BatchProfiler.profile_csv (one chunked pass of mergeable sketches), serially
+and with worker processes. Reports wall time, rows/s, the peak RSS of the
+measuring process (each variant runs in a fresh one) and how far the sketch
+medians are from the exact ones.
+
+    python -m benchmarks.bench_profiler --rows 1000000 --workers 2
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import yaml
+
+from benchmarks.bench_feature_engine import sample_rows
+from data_pipeline.batch_profiler import BatchProfiler
+
+def _pandas_stats(config: dict, path: str) -> dict:
+    df = pd.read_csv(path)
+    for col in config["preprocessing"].get("numeric_to_coerce", []):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    numeric = df.select_dtypes("number")
+    numeric.describe()
+    for col in df.columns:
+        if col not in numeric.columns:
+            df[col].value_counts(dropna=False)
+    return {col: float(numeric[col].median()) for col in numeric.columns}
+
+def _sketch_stats(config: dict, path: str, workers: int, chunk_size: int) -> dict:
+    profile = BatchProfiler.profile_csv(config, path, workers, chunk_size)
+    return {col: s.quantile(0.5) for col, s in profile.columns.items() if s.kind == "numeric"}
+
+def _measure(variant: str, config: dict, path: str, workers: int, chunk_size: int) -> tuple:
+    start = time.perf_counter()
+    if variant == "pandas":
+        medians = _pandas_stats(config, path)
+    else:
+        medians = _sketch_stats(config, path, workers, chunk_size)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, medians
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    fd, tmp_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    sample_rows(pd.read_csv(args.data, dtype=str, keep_default_na=False), args.rows).to_csv(tmp_path, index=False)
+    variants = [("pandas", 1), ("sketch", 1)] + ([("sketch", args.workers)] if args.workers > 1 else [])
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        results = {}
+        print(f"{'variant':>10} {'workers':>8} {'wall s':>8} {'rows/s':>12} {'peak RSS MiB':>13} {'max median err':>15}")
+        for variant, workers in variants:
+            # A fresh process per variant, so ru_maxrss is that variant's own peak
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                elapsed, rss_kib, medians = pool.submit(_measure, variant, config, tmp_path, workers,
+                                                        args.chunk_size).result()
+            results[(variant, workers)] = medians
+            exact = results[("pandas", 1)]
+            error = max((abs(medians[c] - v) / abs(v) for c, v in exact.items() if v), default=0.0)
+            print(f"{variant:>10} {workers:>8} {elapsed:>8.2f} {args.rows / elapsed:>12,.0f} {rss_kib / 1024:>13.0f} "
+                  f"{error:>14.2%}")
+    finally:
+        os.remove(tmp_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Switching between registered models: reloading the files with joblib on every
+switch vs. ModelRegistry.load (cold, with and without memory-mapping, and
+warm from its LRU). Models are the logistic regression from JoblibModels, a
+random forest fitted on the pipeline's training matrix and its
+TreeEnsembleExporter export. Each scenario runs in a fresh process, so load
+times include nothing cached by an earlier one; reports the median load time
+and the resident memory the first load added.
+
+    python -m benchmarks.bench_registry --trees 300 --switches 50
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import yaml
+
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.model_registry import ModelRegistry, _rss_bytes
+from data_pipeline.tree_exporter import TreeEnsembleExporter
+
+SCENARIOS = ["joblib", "cold mmap", "cold copy", "warm LRU"]
+
+def _measure(scenario: str, root: str, name: str, switches: int) -> tuple:
+    warnings.simplefilter("ignore")
+    import sklearn.linear_model, sklearn.ensemble  # noqa: F401  import cost is not load cost
+    registry = ModelRegistry(root, max_loaded=0 if scenario.startswith("cold") else 4, mmap=scenario != "cold copy")
+    folder = os.path.dirname(registry.path(name, 1))
+    times, rss_delta = [], None
+    for i in range(switches):
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        if scenario == "joblib":
+            loaded = (joblib.load(os.path.join(folder, "preprocessor.joblib")),
+                      joblib.load(os.path.join(folder, "model.joblib")))
+        else:
+            loaded = registry.load(name, 1)
+        times.append(time.perf_counter() - start)
+        if i == 0:
+            rss_delta = _rss_bytes() - rss_before
+        del loaded
+    return statistics.median(times), rss_delta
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--switches", type=int, default=50)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    from sklearn.ensemble import RandomForestClassifier
+
+    out = DataPipeline(config).run_in_memory()
+    forest = RandomForestClassifier(n_estimators=args.trees, random_state=0, n_jobs=-1).fit(out["X_train"], out["y_train"])
+    models = {"logistic_regression": joblib.load("JoblibModels/logistic_regression.pkl"),
+              "random_forest": forest, "flat_trees": TreeEnsembleExporter.export(forest)}
+    root = tempfile.mkdtemp(prefix="registry-")
+    try:
+        registry = ModelRegistry(root)
+        for name, model in models.items():
+            registry.register(name, model, out["preprocessor"], out["feature_names"], config, out["fill_values"])
+        ctx = multiprocessing.get_context("spawn")
+        print(f"{'model':>20} {'scenario':>10} {'median load ms':>15} {'first-load RSS MiB':>19}")
+        for name in models:
+            for scenario in SCENARIOS:
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    median_s, rss_delta = pool.submit(_measure, scenario, root, name, args.switches).result()
+                print(f"{name:>20} {scenario:>10} {median_s * 1000:>15.3f} {rss_delta / 2 ** 20:>19.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
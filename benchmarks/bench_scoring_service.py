@@ -0,0 +1,114 @@
+"""
+Load generator for the micro-batching scoring service: p50/p99 latency and
+throughput for concurrent clients each sending `--records` customers per request.
+
+    python -m benchmarks.bench_scoring_service --concurrency 32 --requests 200
+    python -m benchmarks.bench_scoring_service --url 127.0.0.1:8080   # external server
+
+By default the server runs in-process on an ephemeral port. --build-artifacts DIR
+first runs DataPipeline with its artifacts redirected into DIR (handy when the
+configured preprocessor.joblib was pickled with another sklearn version).
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import copy
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import yaml
+
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.scoring_service import ScoringServer
+
+async def _client(host: str, port: int, bodies, n_requests: int, latencies: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(n_requests):
+        body = bodies[i % len(bodies)]
+        start = time.perf_counter()
+        writer.write(f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+        status = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        if b" 200 " not in status:
+            raise RuntimeError(f"Request failed: {status!r}")
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+async def _run(args, config) -> None:
+    server = None
+    if args.url:
+        host, port = args.url.rsplit(":", 1)
+        port = int(port)
+    else:
+        server = ScoringServer.from_config(config, args.model)
+        server.port = 0
+        await server.start()
+        host, port = server.host, server.port
+
+    raw = pd.read_csv(args.data).drop(columns=[config["data"]["target_column"]])
+    rng = np.random.default_rng(0)
+    bodies = []
+    for _ in range(64):
+        rows = raw.iloc[rng.integers(0, len(raw), args.records)]
+        bodies.append(json.dumps({"records": rows.to_dict(orient="records")}).encode("utf-8"))
+
+    latencies: list = []
+    per_client = max(1, args.requests // args.concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, bodies, per_client, latencies) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000
+    print(f"requests={len(latencies)} concurrency={args.concurrency} records/request={args.records}")
+    print(f"p50={np.percentile(lat_ms, 50):.2f} ms  p99={np.percentile(lat_ms, 99):.2f} ms")
+    print(f"throughput={len(latencies) / elapsed:,.0f} req/s  {len(latencies) * args.records / elapsed:,.0f} records/s")
+    if server is not None:
+        b = server.batcher
+        print(f"batches={b.batches} avg_batch_rows={b.rows / max(b.batches, 1):.1f}")
+        await server.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--model", default=None, help="Model pickle (default: serving.model_path)")
+    parser.add_argument("--url", default=None, help="host:port of a running service")
+    parser.add_argument("--build-artifacts", default=None, metavar="DIR")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=1)
+    parser.add_argument("--max-batch-size", type=int, default=None)
+    parser.add_argument("--max-wait-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    config["data"]["file_path"] = args.data
+    serving = config.setdefault("serving", {})
+    if args.max_batch_size is not None:
+        serving["max_batch_size"] = args.max_batch_size
+    if args.max_wait_ms is not None:
+        serving["max_wait_ms"] = args.max_wait_ms
+    if args.build_artifacts:
+        build = copy.deepcopy(config)
+        for key, path in build["artifacts"].items():
+            if isinstance(path, str) and key not in ("format",):
+                build["artifacts"][key] = os.path.join(args.build_artifacts, os.path.basename(path))
+        build["cache"] = {"enabled": False}
+        DataPipeline(build).run()
+        config["artifacts"] = build["artifacts"]
+    asyncio.run(_run(args, config))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Original model predict_proba vs the exported FlatTreeEnsemble: agreement,
+throughput per batch size and cold start (fresh interpreter: import, load,
+score one row). Models are the loadable tree pickles in JoblibModels/ plus a
+random forest and a gradient-boosting model fitted on the encoded Telco data
+(xgboost/catboost pickles are included when those libraries are installed).
+
+    python -m benchmarks.bench_tree_eval --batch-sizes 1 16 256 4096
+"""
+from __future__ import annotations
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+import joblib
+import numpy as np
+import yaml
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.tree_exporter import TreeEnsembleExporter
+
+COLD_ORIGINAL = "import joblib, numpy as np; m = joblib.load({path!r}); m.predict_proba(np.zeros((1, {n})))"
+COLD_FLAT = ("import numpy as np; from data_pipeline.flat_trees import FlatTreeEnsemble; "
+             "m = FlatTreeEnsemble.load({path!r}); m.predict_proba(np.zeros((1, {n})))")
+
+def per_call(fn, X, batch: int, min_time: float = 0.3) -> float:
+    """Seconds per call of fn on consecutive `batch`-row slices."""
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        i = (calls * batch) % max(1, len(X) - batch)
+        fn(X[i:i + batch])
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+def cold_start(code: str, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--data", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256, 4096])
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    config["data"]["file_path"] = args.data
+    config["cache"] = {"enabled": False}
+    out = DataPipeline(config)._resolve(["X_train_proc", "y_train", "X_test_proc"])
+    X_train, y_train = np.asarray(out["X_train_proc"]), np.asarray(out["y_train"])
+    X = np.tile(np.asarray(out["X_test_proc"]), (4, 1))
+
+    models = {}
+    for path in sorted(glob.glob("JoblibModels/*.pkl")):
+        try:
+            model = joblib.load(path)
+            TreeEnsembleExporter.export(model)
+            models[os.path.basename(path)] = (model, path)
+        except (ImportError, TypeError, ValueError) as e:
+            print(f"skip {path}: {type(e).__name__}: {e}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in (("random_forest_300", RandomForestClassifier(n_estimators=300, max_depth=12, random_state=0)),
+                            ("gradient_boosting_200", GradientBoostingClassifier(n_estimators=200, max_depth=3, random_state=0))):
+            path = os.path.join(tmp, name + ".pkl")
+            joblib.dump(model.fit(X_train, y_train), path)
+            models[name] = (model, path)
+
+        header = "".join(f"{f'batch {b} orig/flat us':>26}" for b in args.batch_sizes)
+        print(f"{'model':<24} {'trees':>6} {'max |dp|':>9}{header} {'cold start orig/flat s':>24}")
+        for name, (model, path) in models.items():
+            flat = TreeEnsembleExporter.export(model)
+            flat_path = os.path.join(tmp, name + ".flat.npz")
+            flat.save(flat_path)
+            diff = float(np.max(np.abs(flat.predict_proba(X) - model.predict_proba(X))))
+            cells = ""
+            for b in args.batch_sizes:
+                orig = per_call(model.predict_proba, X, b) * 1e6
+                fast = per_call(flat.predict_proba, X, b) * 1e6
+                cells += f"{f'{orig:,.0f} / {fast:,.0f}':>26}"
+            n = model.n_features_in_
+            cold = f"{cold_start(COLD_ORIGINAL.format(path=path, n=n)):.2f} / {cold_start(COLD_FLAT.format(path=flat_path, n=n)):.2f}"
+            print(f"{name:<24} {flat.n_trees:>6} {diff:>9.1e}{cells} {cold:>24}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Synthetic customers with the Telco churn schema, at any row count.
+
+Distributions are learned from the real CSV: every categorical column is
+sampled conditionally on Churn (and on its parent service, so e.g. no
+InternetService always means "No internet service"), tenure conditionally
+on Churn, MonthlyCharges on (Churn, InternetService), and TotalCharges is
+derived from tenure x MonthlyCharges (NaN for tenure 0, written to CSV as
+the original blank).
+`cardinality` widens chosen categorical columns with extra long-tail levels.
+
+    python -m benchmarks.synthetic_telco --rows 1000000 --output data/synthetic/telco_1m.csv
+"""
+from __future__ import annotations
+import argparse
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+TARGET = "Churn"
+# Child column -> the service it depends on
+PARENTS = {
+    "MultipleLines": "PhoneService",
+    "OnlineSecurity": "InternetService",
+    "OnlineBackup": "InternetService",
+    "DeviceProtection": "InternetService",
+    "TechSupport": "InternetService",
+    "StreamingTV": "InternetService",
+    "StreamingMovies": "InternetService",
+}
+COLUMNS = [
+    "customerID", "gender", "SeniorCitizen", "Partner", "Dependents", "tenure", "PhoneService",
+    "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup", "DeviceProtection",
+    "TechSupport", "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling",
+    "PaymentMethod", "MonthlyCharges", "TotalCharges", "Churn",
+]
+CATEGORICAL = [c for c in COLUMNS if c not in ("customerID", "SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges", TARGET)]
+
+class TelcoSynthesizer:
+    def __init__(self, source: pd.DataFrame, cardinality: Optional[Dict[str, int]] = None, tail_mass: float = 0.1):
+        self.churn_rate = float((source[TARGET] == "Yes").mean())
+        self.senior_rate = {c: float(g["SeniorCitizen"].mean()) for c, g in source.groupby(TARGET)}
+        # Per column: the level values and, per conditioning key, a probability vector over them.
+        # Sampling works on integer level codes; values are gathered once at the end.
+        self.levels: Dict[str, np.ndarray] = {TARGET: np.array(["No", "Yes"], dtype=object)}
+        self.probs: Dict[str, Dict[Tuple, np.ndarray]] = {}
+        codes = {TARGET: (source[TARGET] == "Yes").to_numpy(dtype=np.int64)}
+        for col in sorted(CATEGORICAL, key=lambda c: c in PARENTS):
+            levels = np.asarray(sorted(source[col].unique()), dtype=object)
+            self.levels[col] = levels
+            codes[col] = np.searchsorted(levels, source[col].to_numpy(dtype=object))
+            keys = self._keys(codes, col)
+            self.probs[col] = {}
+            for key, idx in pd.DataFrame(keys).T.groupby(list(range(len(keys)))).indices.items():
+                counts = np.bincount(codes[col][idx], minlength=len(levels))
+                self.probs[col][key if isinstance(key, tuple) else (key,)] = counts / counts.sum()
+        self.tenure = {c: source["tenure"].to_numpy()[codes[TARGET] == c] for c in (0, 1)}
+        self.monthly = {}
+        for key, idx in pd.DataFrame({0: codes[TARGET], 1: codes["InternetService"]}).groupby([0, 1]).indices.items():
+            self.monthly[key] = source["MonthlyCharges"].to_numpy()[idx]
+        for col, n_levels in (cardinality or {}).items():
+            self._widen(col, n_levels, tail_mass)
+
+    @staticmethod
+    def from_csv(path: str, **kwargs) -> "TelcoSynthesizer":
+        return TelcoSynthesizer(pd.read_csv(path, dtype={"TotalCharges": str}), **kwargs)
+
+    @staticmethod
+    def _keys(codes: Dict[str, np.ndarray], col: str) -> List[np.ndarray]:
+        return [codes[TARGET]] + ([codes[PARENTS[col]]] if col in PARENTS else [])
+
+    def _widen(self, col: str, n_levels: int, tail_mass: float) -> None:
+        """Add levels up to `n_levels` distinct values, sharing `tail_mass` with Zipf weights."""
+        if col not in self.probs:
+            raise ValueError(f"Cannot widen non-categorical column '{col}'")
+        extra = n_levels - len(self.levels[col])
+        if extra <= 0:
+            return
+        tail = 1.0 / np.arange(1, extra + 1)
+        tail = tail_mass * tail / tail.sum()
+        self.levels[col] = np.concatenate([self.levels[col], np.array([f"{col} {i}" for i in range(extra)], dtype=object)])
+        for key, probs in self.probs[col].items():
+            self.probs[col][key] = np.concatenate([probs * (1 - tail_mass), tail])
+
+    @staticmethod
+    def _groups(keys: List[np.ndarray]) -> Dict[Tuple, np.ndarray]:
+        """Row indices per distinct combination of small non-negative integer keys."""
+        combined = np.zeros(len(keys[0]), dtype=np.int64)
+        radix = [int(k.max()) + 1 if len(k) else 1 for k in keys]
+        for k, r in zip(keys, radix):
+            combined = combined * r + k
+        groups = {}
+        # Only a handful of groups (churn x parent level), so one mask per group beats a sort
+        for u in np.flatnonzero(np.bincount(combined)):
+            idx = np.flatnonzero(combined == u)
+            key, rest = [], int(u)
+            for r in reversed(radix):
+                key.append(rest % r)
+                rest //= r
+            groups[tuple(reversed(key))] = idx
+        return groups
+
+    def generate(self, n_rows: int, seed: int = 0, start_id: int = 0) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        codes = {TARGET: (rng.random(n_rows) < self.churn_rate).astype(np.int64)}
+        # Parents first so children can condition on them
+        for col in sorted(CATEGORICAL, key=lambda c: c in PARENTS):
+            out = np.empty(n_rows, dtype=np.int64)
+            for key, idx in self._groups(self._keys(codes, col)).items():
+                probs = self.probs[col][key]
+                out[idx] = rng.choice(len(probs), size=len(idx), p=probs)
+            codes[col] = out
+        churn = codes[TARGET]
+        tenure = np.empty(n_rows, dtype=np.int64)
+        for (c,), idx in self._groups([churn]).items():
+            tenure[idx] = rng.choice(self.tenure[c], size=len(idx))
+        monthly = np.empty(n_rows, dtype=np.float64)
+        for key, idx in self._groups([churn, codes["InternetService"]]).items():
+            monthly[idx] = rng.choice(self.monthly[key], size=len(idx))
+        monthly = np.round(np.clip(monthly + rng.normal(0, 1.0, n_rows), 18.0, 120.0), 2)
+        # New customers have no TotalCharges yet: NaN here, written as the original " " by write_csv
+        total = np.round(tenure * monthly * rng.uniform(0.95, 1.05, n_rows), 2)
+        total[tenure == 0] = np.nan
+        senior_p = np.where(churn == 1, self.senior_rate["Yes"], self.senior_rate["No"])
+
+        cols = {col: pd.Categorical.from_codes(codes[col], categories=self.levels[col]) for col in codes}
+        cols["customerID"] = np.char.add(np.char.zfill(np.arange(start_id, start_id + n_rows).astype(str), 7), "-SYN")
+        cols["SeniorCitizen"] = (rng.random(n_rows) < senior_p).astype(np.int64)
+        cols["tenure"] = tenure
+        cols["MonthlyCharges"] = monthly
+        cols["TotalCharges"] = total
+        return pd.DataFrame({c: cols[c] for c in COLUMNS})
+
+    def iter_generate(self, n_rows: int, chunk_size: int = 1_000_000, seed: int = 0) -> Iterator[pd.DataFrame]:
+        for i, start in enumerate(range(0, n_rows, chunk_size)):
+            yield self.generate(min(chunk_size, n_rows - start), seed=seed + i, start_id=start)
+
+    def write_csv(self, path: str, n_rows: int, chunk_size: int = 1_000_000, seed: int = 0) -> str:
+        """Stream `n_rows` rows to CSV in chunks, so row counts far beyond memory are fine."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        for i, chunk in enumerate(self.iter_generate(n_rows, chunk_size, seed)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False, na_rep=" ")
+        return path
+
+def parse_cardinality(items: List[str]) -> Dict[str, int]:
+    out = {}
+    for item in items:
+        col, _, n = item.partition("=")
+        out[col] = int(n)
+    return out
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cardinality", nargs="*", default=[], metavar="COLUMN=LEVELS",
+                        help="Widen categorical columns, e.g. PaymentMethod=1000")
+    args = parser.parse_args()
+    synth = TelcoSynthesizer.from_csv(args.source, cardinality=parse_cardinality(args.cardinality))
+    synth.write_csv(args.output, args.rows, args.chunk_size, args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
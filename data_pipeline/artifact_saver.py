@@ -1,8 +1,18 @@
 from __future__ import annotations
+import hashlib
+import json
+import logging
 import os
+import shutil
+import tempfile
+import zipfile
 import numpy as np
 import joblib
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
 
 class ArtifactSaver:
     @staticmethod
@@ -15,12 +25,377 @@ class ArtifactSaver:
         # Save as single-array NPZ for consistency
         np.savez(path, array)
 
+    @staticmethod
+    def save_sparse_npz(path: str, matrix) -> None:
+        ArtifactSaver._ensure_dir(path)
+        # Uncompressed, like np.savez, so loading doesn't pay for inflation
+        sparse.save_npz(path, sparse.csr_matrix(matrix), compressed=False)
+
+    @staticmethod
+    def save_matrix(path: str, matrix) -> None:
+        """Save a feature matrix as CSR (scipy.sparse.save_npz) if sparse, else as single-array NPZ."""
+        if sparse.issparse(matrix):
+            ArtifactSaver.save_sparse_npz(path, matrix)
+        else:
+            ArtifactSaver.save_npz(path, matrix)
+
+    @staticmethod
+    def load_array(path: str) -> np.ndarray:
+        """Load a single-array NPZ (the arr_0 member written by save_npz)."""
+        with np.load(path, allow_pickle=False) as npz:
+            return npz["arr_0"]
+
+    @staticmethod
+    def load_matrix(path: str):
+        """Inverse of save_matrix: returns a CSR matrix or a dense array depending on what was saved."""
+        with np.load(path, allow_pickle=False) as npz:
+            if "format" in npz.files:
+                return sparse.load_npz(path)
+        return ArtifactSaver.load_array(path)
+
+    # ---- appends (incremental mode) ---------------------------------------
+    @staticmethod
+    def _read_npy_header(fh) -> Tuple[Tuple[int, int], Tuple[int, ...], bool, np.dtype]:
+        """(version, shape, fortran_order, dtype) of an .npy stream; leaves fh at the first data byte."""
+        version = np.lib.format.read_magic(fh)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        return (version,) + read(fh)
+
+    @staticmethod
+    def append_npy(path: str, rows) -> None:
+        """
+        Append rows to a C-order .npy file without rewriting it: the rows are written
+        at the end, then the shape in the (padded) header is updated in place. Only
+        if the longer shape does not fit the header padding is the file rewritten.
+        """
+        with open(path, "r+b") as fh:
+            version, shape, fortran_order, dtype = ArtifactSaver._read_npy_header(fh)
+            data_offset = fh.tell()
+            rows = np.ascontiguousarray(rows, dtype=dtype)
+            if fortran_order or tuple(rows.shape[1:]) != tuple(shape[1:]):
+                raise ValueError(f"Cannot append rows of shape {rows.shape} to {path} with shape {shape}")
+            new_shape = (shape[0] + rows.shape[0],) + tuple(shape[1:])
+            header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": new_shape})
+            prefix = 8 + (2 if version == (1, 0) else 4)
+            space = data_offset - prefix
+            if len(header) + 1 <= space:
+                fh.seek(0, os.SEEK_END)
+                fh.write(rows.tobytes())
+                fh.seek(prefix)
+                fh.write((header + " " * (space - len(header) - 1) + "\n").encode("latin1"))
+                return
+        logging.info(f"Header of {path} has no room for shape {new_shape}; rewriting the file.")
+        existing = np.load(path, mmap_mode="r")
+        combined = np.concatenate([existing, rows])
+        del existing
+        np.save(path, combined)
+
+    @staticmethod
+    def append_matrix(path: str, matrix) -> None:
+        """
+        Append rows to an artifact written by save_mmap (layout "npy"): the .npy file,
+        or the CSR .npy triplet, grows in place, so the cost is that of the new rows.
+        NPZ artifacts are zip members that cannot grow without rewriting every stored
+        row, so they are not appendable.
+        """
+        base = ArtifactSaver.npy_base(path)
+        if not sparse.issparse(matrix):
+            ArtifactSaver.append_npy(base + ".npy", matrix)
+            return
+        csr = sparse.csr_matrix(matrix)
+        nnz = int(np.load(base + ".indptr.npy", mmap_mode="r")[-1])
+        ArtifactSaver.append_npy(base + ".data.npy", csr.data)
+        ArtifactSaver.append_npy(base + ".indices.npy", csr.indices)
+        ArtifactSaver.append_npy(base + ".indptr.npy", csr.indptr[1:].astype(np.int64) + nnz)
+
+    @staticmethod
+    def npy_base(path: str) -> str:
+        """Configured artifact path without its .npz suffix; .npy artifacts are written next to it."""
+        return path[:-4] if path.endswith(".npz") else path
+
+    @staticmethod
+    def manifest_path(artifacts: Dict) -> str:
+        return artifacts.get("manifest") or os.path.join(os.path.dirname(artifacts["x_train"]), "manifest.json")
+
+    @staticmethod
+    def config_hash(config: Dict) -> str:
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def save_mmap(path: str, matrix, dtype=None) -> None:
+        """
+        Save as raw .npy so consumers can np.load(..., mmap_mode="r"): `<base>.npy` for
+        dense arrays, `<base>.{data,indices,indptr}.npy` for CSR matrices.
+        """
+        ArtifactSaver._ensure_dir(path)
+        base = ArtifactSaver.npy_base(path)
+        if sparse.issparse(matrix):
+            csr = sparse.csr_matrix(matrix)
+            np.save(base + ".data.npy", csr.data.astype(dtype or csr.dtype, copy=False))
+            np.save(base + ".indices.npy", csr.indices)
+            np.save(base + ".indptr.npy", csr.indptr)
+        else:
+            np.save(base + ".npy", np.asarray(matrix, dtype=dtype))
+
+    @staticmethod
+    def write_manifest(config: Dict, names: List[str], feature_names: List[str]) -> str:
+        """Record shape/dtype of each .npy artifact plus feature names and the config hash."""
+        artifacts = config["artifacts"]
+        manifest_path = ArtifactSaver.manifest_path(artifacts)
+        root = os.path.dirname(os.path.abspath(manifest_path))
+        entries: Dict[str, Dict] = {}
+        for name in names:
+            base = ArtifactSaver.npy_base(artifacts[name])
+            if os.path.exists(base + ".npy"):
+                arr = np.load(base + ".npy", mmap_mode="r")
+                entries[name] = {"kind": "dense", "file": os.path.relpath(base + ".npy", root),
+                                 "shape": list(arr.shape), "dtype": str(arr.dtype)}
+            else:
+                files = {part: os.path.relpath(f"{base}.{part}.npy", root) for part in ("data", "indices", "indptr")}
+                data = np.load(f"{base}.data.npy", mmap_mode="r")
+                indptr = np.load(f"{base}.indptr.npy", mmap_mode="r")
+                entries[name] = {"kind": "csr", "files": files, "shape": [len(indptr) - 1, len(feature_names)],
+                                 "dtype": str(data.dtype)}
+        manifest = {
+            "format_version": 1,
+            "config_hash": ArtifactSaver.config_hash(config),
+            "feature_names": [str(f) for f in feature_names],
+            "arrays": entries,
+        }
+        ArtifactSaver._ensure_dir(manifest_path)
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest_path
+
     @staticmethod
     def save_npy(path: str, array) -> None:
         ArtifactSaver._ensure_dir(path)
         np.save(path, array)
 
+    @staticmethod
+    def fill_values_path(artifacts: Dict) -> str:
+        return artifacts.get("fill_values") or os.path.join(os.path.dirname(artifacts["preprocessor"]), "fill_values.json")
+
+    @staticmethod
+    def class_weights_path(artifacts: Dict) -> str:
+        return artifacts.get("class_weights") or os.path.join(os.path.dirname(artifacts["preprocessor"]), "class_weights.json")
+
+    @staticmethod
+    def train_profile_path(artifacts: Dict) -> str:
+        return artifacts.get("train_profile") or os.path.join(os.path.dirname(artifacts["preprocessor"]), "train_profile.json")
+
+    @staticmethod
+    def incremental_state_path(artifacts: Dict) -> str:
+        return artifacts.get("incremental_state") or os.path.join(os.path.dirname(artifacts["preprocessor"]), "incremental_state.json")
+
+    @staticmethod
+    def save_json(path: str, obj: Any) -> None:
+        ArtifactSaver._ensure_dir(path)
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2, default=float)
+
     @staticmethod
     def save_preprocessor(path: str, preprocessor: Any) -> None:
         ArtifactSaver._ensure_dir(path)
         joblib.dump(preprocessor, path)
+
+
+def _write_npz_member(zf: zipfile.ZipFile, name: str, shape: Tuple[int, ...], dtype, source=None) -> Any:
+    """Open `name`.npy inside zf and write its header; copy `source` (a raw binary file) into it if given."""
+    fh = zf.open(f"{name}.npy", mode="w", force_zip64=True)
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": tuple(shape)}
+    np.lib.format.write_array_header_2_0(fh, header)
+    if source is not None:
+        source.seek(0)
+        shutil.copyfileobj(source, fh, 1 << 20)
+        fh.close()
+    return fh
+
+
+class NpzStreamWriter:
+    """
+    Writes a single-array NPZ chunk by chunk. The file is laid out exactly like
+    np.savez(path, array) ("arr_0" inside an uncompressed zip), so np.load reads it
+    unchanged, but only one chunk has to be in memory at a time.
+    """
+    def __init__(self, path: str, shape: Tuple[int, ...], dtype=np.float64):
+        ArtifactSaver._ensure_dir(path)
+        if not path.endswith(".npz"):
+            path = path + ".npz"
+        self.path = path
+        self.shape = tuple(int(s) for s in shape)
+        self.dtype = np.dtype(dtype)
+        self.rows_written = 0
+        self._zip = zipfile.ZipFile(path, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True)
+        self._fh = _write_npz_member(self._zip, "arr_0", self.shape, self.dtype)
+
+    def write(self, chunk) -> None:
+        chunk = np.ascontiguousarray(chunk, dtype=self.dtype)
+        if chunk.shape[1:] != self.shape[1:]:
+            raise ValueError(f"Chunk shape {chunk.shape} does not match artifact shape {self.shape}")
+        if self.rows_written + len(chunk) > self.shape[0]:
+            raise ValueError(f"Writing {len(chunk)} rows would exceed declared {self.shape[0]} rows in {self.path}")
+        self._fh.write(chunk.tobytes())
+        self.rows_written += len(chunk)
+
+    def close(self) -> None:
+        self._fh.close()
+        self._zip.close()
+        if self.rows_written != self.shape[0]:
+            raise ValueError(f"Expected {self.shape[0]} rows in {self.path}, wrote {self.rows_written}")
+
+    def __enter__(self) -> "NpzStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._fh.close()
+            self._zip.close()
+
+
+class NpyStreamWriter:
+    """Chunked counterpart of ArtifactSaver.save_mmap for dense arrays (rows go straight into an open_memmap)."""
+    def __init__(self, path: str, shape: Tuple[int, ...], dtype=np.float64):
+        ArtifactSaver._ensure_dir(path)
+        self.path = ArtifactSaver.npy_base(path) + ".npy"
+        self.shape = tuple(int(s) for s in shape)
+        self.rows_written = 0
+        self._out = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.dtype(dtype), shape=self.shape)
+
+    def write(self, chunk) -> None:
+        n = len(chunk)
+        if self.rows_written + n > self.shape[0]:
+            raise ValueError(f"Writing {n} rows would exceed declared {self.shape[0]} rows in {self.path}")
+        self._out[self.rows_written:self.rows_written + n] = chunk
+        self.rows_written += n
+
+    def close(self) -> None:
+        self._out.flush()
+        del self._out
+        if self.rows_written != self.shape[0]:
+            raise ValueError(f"Expected {self.shape[0]} rows in {self.path}, wrote {self.rows_written}")
+
+    def __enter__(self) -> "NpyStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+
+class SparseNpzStreamWriter:
+    """
+    Streams CSR row blocks into a file readable by scipy.sparse.load_npz. The nnz
+    is unknown until the last block, so data/indices/indptr are spooled to
+    temporary files next to the artifact and copied into the zip on close.
+    With layout="npy" the three parts are written as separate .npy files
+    instead (the ArtifactSaver.save_mmap layout).
+    """
+    def __init__(self, path: str, n_cols: int, dtype=np.float64, layout: str = "npz"):
+        ArtifactSaver._ensure_dir(path)
+        self.layout = layout
+        if layout == "npz" and not path.endswith(".npz"):
+            path = path + ".npz"
+        self.path = path
+        self.n_cols = int(n_cols)
+        self.dtype = np.dtype(dtype)
+        self.n_rows = 0
+        self.nnz = 0
+        spool_dir = os.path.dirname(os.path.abspath(path))
+        self._data = tempfile.TemporaryFile(dir=spool_dir)
+        self._indices = tempfile.TemporaryFile(dir=spool_dir)
+        self._indptr = tempfile.TemporaryFile(dir=spool_dir)
+        self._indptr.write(np.zeros(1, dtype=np.int64).tobytes())
+
+    def write(self, chunk) -> None:
+        chunk = sparse.csr_matrix(chunk)
+        if chunk.shape[1] != self.n_cols:
+            raise ValueError(f"Chunk has {chunk.shape[1]} columns, expected {self.n_cols} in {self.path}")
+        self._data.write(np.ascontiguousarray(chunk.data, dtype=self.dtype).tobytes())
+        self._indices.write(np.ascontiguousarray(chunk.indices, dtype=np.int32).tobytes())
+        self._indptr.write((chunk.indptr[1:].astype(np.int64) + self.nnz).tobytes())
+        self.n_rows += chunk.shape[0]
+        self.nnz += chunk.nnz
+
+    def _discard(self) -> None:
+        for fh in (self._data, self._indices, self._indptr):
+            fh.close()
+
+    def _close_npy(self) -> None:
+        base = ArtifactSaver.npy_base(self.path)
+        parts = (("data", self._data, self.dtype, self.nnz),
+                 ("indices", self._indices, np.int32, self.nnz),
+                 ("indptr", self._indptr, np.int64, self.n_rows + 1))
+        for part, source, dtype, length in parts:
+            with open(f"{base}.{part}.npy", "wb") as fh:
+                np.lib.format.write_array_header_2_0(
+                    fh, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": (length,)})
+                source.seek(0)
+                shutil.copyfileobj(source, fh, 1 << 20)
+        self._discard()
+
+    def close(self) -> None:
+        if self.layout == "npy":
+            self._close_npy()
+            return
+        with zipfile.ZipFile(self.path, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            _write_npz_member(zf, "indices", (self.nnz,), np.int32, self._indices)
+            _write_npz_member(zf, "indptr", (self.n_rows + 1,), np.int64, self._indptr)
+            for name, value in (("format", np.array(b"csr")), ("shape", np.array([self.n_rows, self.n_cols]))):
+                with zf.open(f"{name}.npy", mode="w") as fh:
+                    np.lib.format.write_array(fh, value, allow_pickle=False)
+            _write_npz_member(zf, "data", (self.nnz,), self.dtype, self._data)
+        self._discard()
+
+    def __enter__(self) -> "SparseNpzStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+class ArtifactLoader:
+    """
+    Reads artifacts written with artifacts.format: "npy" through their manifest.
+    Arrays are opened with mmap_mode="r", so processes loading the same files
+    share the OS page cache instead of each holding a private copy.
+    """
+    def __init__(self, manifest_path: str, mmap_mode: Optional[str] = "r"):
+        self.manifest_path = manifest_path
+        self.root = os.path.dirname(os.path.abspath(manifest_path))
+        self.mmap_mode = mmap_mode
+        with open(manifest_path, "r") as f:
+            self.manifest: Dict = json.load(f)
+
+    @staticmethod
+    def from_config(config: Dict, mmap_mode: Optional[str] = "r") -> "ArtifactLoader":
+        return ArtifactLoader(ArtifactSaver.manifest_path(config["artifacts"]), mmap_mode)
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.manifest["feature_names"]
+
+    @property
+    def config_hash(self) -> str:
+        return self.manifest["config_hash"]
+
+    def matches(self, config: Dict) -> bool:
+        return self.config_hash == ArtifactSaver.config_hash(config)
+
+    def load(self, name: str):
+        entry = self.manifest["arrays"][name]
+        if entry["kind"] == "dense":
+            arr = np.load(os.path.join(self.root, entry["file"]), mmap_mode=self.mmap_mode)
+            if list(arr.shape) != entry["shape"] or str(arr.dtype) != entry["dtype"]:
+                raise ValueError(f"Artifact '{name}' does not match its manifest entry {entry}")
+            return arr
+        parts = {part: np.load(os.path.join(self.root, f), mmap_mode=self.mmap_mode) for part, f in entry["files"].items()}
+        return sparse.csr_matrix((parts["data"], parts["indices"], parts["indptr"]), shape=tuple(entry["shape"]), copy=False)
+
+    def load_all(self) -> Dict[str, Any]:
+        return {name: self.load(name) for name in self.manifest["arrays"]}
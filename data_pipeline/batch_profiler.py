@@ -0,0 +1,204 @@
+from __future__ import annotations
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from data_pipeline.batch_transformer import BatchTransformer
+from data_pipeline.column_sketch import CategoricalSketch, NumericSketch
+from data_pipeline.data_ingestion import DataIngestion
+
+Sketch = Union[NumericSketch, CategoricalSketch]
+
+def _profile_range(config: Dict, path: str, header: bytes, start: int, end: int) -> Dict[str, Any]:
+    """Profile bytes [start, end) of a CSV; the worker returns the (small) serialised profile."""
+    df = BatchTransformer.read_range(path, header, start, end, BatchTransformer.read_kwargs(config))
+    return BatchProfiler.from_config(config).update(df).to_dict()
+
+class BatchProfiler:
+    """
+    Single-pass, mergeable profile of a table: one sketch per column, a
+    NumericSketch (count, nulls, min/max, moments, quantiles, mode) for
+    numeric columns and a CategoricalSketch (frequency table) for the rest.
+
+    Profiles of chunks, files or worker ranges combine with merge() into the
+    profile of their union, and the memory of a profile depends on the number
+    of columns and distinct values, never on the number of rows. A profile
+    yields the imputation values (fill_values) and the population stability
+    index of each column against a reference profile (psi).
+
+    `numeric_columns` (preprocessing.numeric_to_coerce) are parsed with
+    pd.to_numeric(errors="coerce") first, as MissingValueHandler does.
+    """
+    # Proportions are floored at this before the log ratio, so empty bins stay finite
+    PSI_EPSILON = 1e-4
+
+    def __init__(self, numeric_columns: Optional[List[str]] = None, relative_accuracy: float = 0.005,
+                 max_buckets: int = 2048, max_categories: int = 1000, psi_bins: int = 10):
+        self.numeric_columns = list(numeric_columns or [])
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.max_categories = max_categories
+        self.psi_bins = psi_bins
+        self.rows = 0
+        self.columns: Dict[str, Sketch] = {}
+
+    @staticmethod
+    def from_config(config: Dict) -> "BatchProfiler":
+        conf = config.get("profiling", {})
+        return BatchProfiler(
+            numeric_columns=config.get("preprocessing", {}).get("numeric_to_coerce", []),
+            relative_accuracy=float(conf.get("relative_accuracy", 0.005)),
+            max_buckets=int(conf.get("max_buckets", 2048)),
+            max_categories=int(conf.get("max_categories", 1000)),
+            psi_bins=int(conf.get("psi_bins", 10)),
+        )
+
+    # ---- building ---------------------------------------------------------
+    def _new_sketch(self, numeric: bool) -> Sketch:
+        if numeric:
+            return NumericSketch(self.relative_accuracy, self.max_buckets)
+        return CategoricalSketch(self.max_categories)
+
+    def update(self, df: pd.DataFrame) -> "BatchProfiler":
+        self.rows += len(df)
+        for col in df.columns:
+            values = df[col]
+            sketch = self.columns.get(col)
+            if sketch is None:
+                # The first chunk decides the kind; later chunks are read the same way
+                numeric = col in self.numeric_columns or (pd.api.types.is_numeric_dtype(values)
+                                                          and not pd.api.types.is_bool_dtype(values))
+                sketch = self.columns[col] = self._new_sketch(numeric)
+            if sketch.kind == "numeric":
+                sketch.update(pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan))
+            else:
+                sketch.update(values)
+        return self
+
+    def merge(self, other: "BatchProfiler") -> "BatchProfiler":
+        self.rows += other.rows
+        for col, sketch in other.columns.items():
+            mine = self.columns.get(col)
+            if mine is None:
+                self.columns[col] = type(sketch).from_dict(sketch.to_dict())
+            elif mine.kind != sketch.kind:
+                raise ValueError(f"Cannot merge profiles: '{col}' is {mine.kind} in one and {sketch.kind} in the other")
+            else:
+                mine.merge(sketch)
+        return self
+
+    @staticmethod
+    def profile_csv(config: Dict, path: Optional[str] = None, workers: Optional[int] = None,
+                    chunk_size: Optional[int] = None) -> "BatchProfiler":
+        """
+        Profile a CSV (default: the data.file_path files) in one read. With more
+        than one worker, line-aligned byte ranges (BatchTransformer.split) are
+        profiled in parallel and the partial profiles merged in input order.
+        """
+        conf = config.get("execution", {})
+        workers = int(workers or conf.get("transform_workers") or os.cpu_count() or 1)
+        chunk_size = int(chunk_size or conf.get("chunk_size", 100_000))
+        paths = [path] if path else DataIngestion(config).file_paths
+        start_time = time.perf_counter()
+        profile = BatchProfiler.from_config(config)
+        for file_path in paths:
+            if workers == 1:
+                file_config = {**config, "data": {**config["data"], "file_path": file_path}}
+                for chunk in DataIngestion(file_config).iter_chunks(chunk_size):
+                    profile.update(chunk)
+                continue
+            header, ranges = BatchTransformer.split(file_path, chunk_size)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Tasks carry byte offsets only and results are profiles, so all ranges can be queued
+                futures = [pool.submit(_profile_range, config, os.path.abspath(file_path), header, s, e)
+                           for s, e in ranges]
+                for future in futures:
+                    profile.merge(BatchProfiler.from_dict(future.result()))
+        logging.info(f"Profiled {profile.rows} rows x {len(profile.columns)} columns of {', '.join(paths)} "
+                     f"with {workers} workers in {time.perf_counter() - start_time:.2f}s.")
+        return profile
+
+    # ---- queries ----------------------------------------------------------
+    def fill_values(self, strategy: str, columns: Optional[List[str]] = None) -> Dict[str, float]:
+        """Imputation values per numeric column ('median' and 'most_frequent' from the sketches)."""
+        out: Dict[str, float] = {}
+        for col in columns if columns is not None else self.numeric_columns:
+            sketch = self.columns.get(col)
+            if sketch is None or sketch.kind != "numeric" or not sketch.count:
+                logging.warning(f"No non-null values seen for '{col}'; nothing to impute with.")
+                continue
+            if strategy == "mean":
+                out[col] = sketch.mean
+            elif strategy == "median":
+                out[col] = sketch.quantile(0.5)
+            else:
+                out[col] = sketch.mode()
+        return out
+
+    def _proportions(self, sketch: Sketch, reference: Sketch) -> np.ndarray:
+        """Share of sketch's rows in each bin of reference: quantile bins or categories, then missing."""
+        total = sketch.count + sketch.nulls
+        if not total:
+            return np.zeros(0)
+        if reference.kind == "numeric":
+            cuts = sorted({reference.quantile(i / self.psi_bins) for i in range(1, self.psi_bins)})
+            below = np.concatenate([[0.0], sketch.cdf(cuts), [1.0]])
+            shares = np.diff(below) * sketch.count
+        else:
+            known = [sketch.counts.get(key, 0) for key in reference.counts]
+            # Values outside the reference table (unseen, or pruned into its `other`) share one bin
+            shares = np.array(known + [sketch.count - sum(known)], dtype=np.float64)
+        return np.append(shares, sketch.nulls) / total
+
+    def psi(self, reference: "BatchProfiler") -> Dict[str, float]:
+        """Population stability index of every column profiled in both, binned on the reference."""
+        out: Dict[str, float] = {}
+        for col, sketch in self.columns.items():
+            ref = reference.columns.get(col)
+            if ref is None or ref.kind != sketch.kind:
+                continue
+            expected, actual = self._proportions(ref, ref), self._proportions(sketch, ref)
+            if not len(expected) or not len(actual):
+                continue
+            expected = np.maximum(expected, self.PSI_EPSILON)
+            actual = np.maximum(actual, self.PSI_EPSILON)
+            out[col] = float(((actual - expected) * np.log(actual / expected)).sum())
+        return out
+
+    def summary(self) -> pd.DataFrame:
+        """One row per column: kind, count, nulls, mean/std/min/median/max or distinct values/mode."""
+        rows = []
+        for col, sketch in self.columns.items():
+            row: Dict[str, Any] = {"column": col, "kind": sketch.kind, "count": sketch.count, "nulls": sketch.nulls}
+            if sketch.kind == "numeric":
+                row.update(mean=sketch.mean if sketch.count else math.nan, std=sketch.std,
+                           min=sketch.min if sketch.count else math.nan, median=sketch.quantile(0.5),
+                           max=sketch.max if sketch.count else math.nan)
+            else:
+                row.update(distinct=len(sketch.counts), mode=sketch.mode())
+            rows.append(row)
+        order = ["kind", "count", "nulls", "mean", "std", "min", "median", "max", "distinct", "mode"]
+        df = pd.DataFrame(rows, columns=["column"] + order)
+        return df.set_index("column").dropna(axis=1, how="all")
+
+    # ---- storage ----------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rows": self.rows, "numeric_columns": self.numeric_columns,
+                "relative_accuracy": self.relative_accuracy, "max_buckets": self.max_buckets,
+                "max_categories": self.max_categories, "psi_bins": self.psi_bins,
+                "columns": {col: sketch.to_dict() for col, sketch in self.columns.items()}}
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "BatchProfiler":
+        profile = BatchProfiler(d.get("numeric_columns"), d.get("relative_accuracy", 0.005),
+                                d.get("max_buckets", 2048), d.get("max_categories", 1000), d.get("psi_bins", 10))
+        profile.rows = d["rows"]
+        for col, sketch in d["columns"].items():
+            kind = NumericSketch if sketch["kind"] == "numeric" else CategoricalSketch
+            profile.columns[col] = kind.from_dict(sketch)
+        return profile
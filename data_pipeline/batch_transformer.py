@@ -0,0 +1,166 @@
+from __future__ import annotations
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from data_pipeline.artifact_saver import ArtifactSaver, sparse
+from data_pipeline.data_ingestion import DataIngestion
+
+# Per-process state set by _init_worker: the fitted preparer/preprocessor are loaded once per worker
+_worker: Dict[str, Any] = {}
+
+def _init_worker(config: Dict, input_path: str, header: bytes, output_dir: str) -> None:
+    from data_pipeline.scoring_service import ChurnScorer
+
+    _worker.update(preparer=ChurnScorer.load_preparer(config), preprocessor=ChurnScorer.load_preprocessor(config),
+                   input_path=input_path, header=header, output_dir=output_dir,
+                   read_kwargs=BatchTransformer.read_kwargs(config))
+
+def _transform_range(index: int, start: int, end: int) -> Dict[str, Any]:
+    """Parse bytes [start, end) of the input, prepare and transform them, and write shard `index`."""
+    df = BatchTransformer.read_range(_worker["input_path"], _worker["header"], start, end, _worker["read_kwargs"])
+    X_proc = _worker["preprocessor"].transform(_worker["preparer"].features_only(df))
+    fmt = "npz" if sparse.issparse(X_proc) else "npy"
+    path = os.path.join(_worker["output_dir"], f"part-{index:05d}.{fmt}")
+    # Written under a temporary name and renamed, so a listed shard is always complete
+    tmp = os.path.join(_worker["output_dir"], f".part-{index:05d}.tmp.{fmt}")
+    if fmt == "npz":
+        ArtifactSaver.save_sparse_npz(tmp, X_proc)
+    else:
+        ArtifactSaver.save_npy(tmp, X_proc)
+    os.replace(tmp, path)
+    return {"index": index, "path": os.path.basename(path), "rows": int(X_proc.shape[0]), "n_features": int(X_proc.shape[1])}
+
+class BatchTransformer:
+    """
+    Applies the fitted artifacts (FeaturePreparer: cleaning, imputation with the
+    training fill values, binning and derived features; then the preprocessor,
+    compiled if serving.compiled) to a CSV too large to transform in one call.
+
+    The input is cut into byte ranges of about `chunk_size` rows, each ending on
+    a line break, and every range is parsed, prepared and transformed by a
+    worker process that writes its own shard (part-00000.npy, or .npz when the
+    output is sparse). Workers load the artifacts once and read their range
+    straight from the file, so the parent only schedules: parsing scales with
+    the workers too. Shards are numbered in input order and written as they
+    finish; manifest.json lists them in order once all are done. At most
+    2 x workers ranges are in flight, so memory is bounded by the chunk size.
+
+    Byte-range splitting assumes records contain no line breaks inside quoted
+    fields (true for the telco extracts). `workers=1` runs in-process.
+    """
+    def __init__(self, config: Dict, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        conf = config.get("execution", {})
+        self.config = config
+        self.workers = int(workers or conf.get("transform_workers") or os.cpu_count() or 1)
+        self.chunk_size = int(chunk_size or conf.get("chunk_size", 100_000))
+
+    @staticmethod
+    def from_config(config: Dict) -> "BatchTransformer":
+        return BatchTransformer(config)
+
+    @staticmethod
+    def read_kwargs(config: Dict) -> Dict[str, Any]:
+        """data.schema read_csv arguments for one byte range, tolerating absent columns."""
+        kwargs = DataIngestion(config).read_csv_kwargs(chunked=True)
+        if "usecols" in kwargs:
+            # Scoring files may lack the target (and other training-only) columns
+            usecols = set(kwargs["usecols"])
+            kwargs["usecols"] = lambda column: column in usecols
+        return kwargs
+
+    @staticmethod
+    def read_range(path: str, header: bytes, start: int, end: int, read_kwargs: Dict[str, Any]) -> pd.DataFrame:
+        """Parse bytes [start, end) of a CSV (a range from split()) under its header line."""
+        with open(path, "rb") as f:
+            f.seek(start)
+            block = f.read(end - start)
+        return pd.read_csv(io.BytesIO(header + block), **read_kwargs)
+
+    @staticmethod
+    def split(path: str, chunk_size: int, sample_rows: int = 1000) -> Tuple[bytes, List[Tuple[int, int]]]:
+        """Header line and line-aligned (start, end) byte ranges of about chunk_size rows each."""
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            header = f.readline()
+            data_start = f.tell()
+            sample = [line for line in (f.readline() for _ in range(sample_rows)) if line]
+            row_bytes = sum(map(len, sample)) / len(sample) if sample else 1
+            target = max(1, int(chunk_size * row_bytes))
+            ranges = []
+            start = data_start
+            while start < size:
+                f.seek(min(start + target, size))
+                f.readline()  # finish the line the seek landed in
+                end = f.tell()
+                ranges.append((start, end))
+                start = end
+        if not header.endswith(b"\n"):
+            header += b"\n"
+        return header, ranges
+
+    def run(self, input_path: str, output_dir: str) -> Dict[str, Any]:
+        """Transform input_path into ordered shards under output_dir; returns (and writes) the manifest."""
+        start_time = time.perf_counter()
+        os.makedirs(output_dir, exist_ok=True)
+        header, ranges = self.split(input_path, self.chunk_size)
+        init_args = (self.config, os.path.abspath(input_path), header, os.path.abspath(output_dir))
+        logging.info(f"Batch transform of {input_path}: {len(ranges)} chunks of ~{self.chunk_size} rows, {self.workers} workers.")
+
+        shards: List[Dict[str, Any]] = []
+        if self.workers == 1 or len(ranges) == 1:
+            _init_worker(*init_args)
+            shards = [_transform_range(i, s, e) for i, (s, e) in enumerate(ranges)]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=init_args) as pool:
+                pending = iter(enumerate(ranges))
+                running: Dict[Future, int] = {}
+                while True:
+                    while len(running) < 2 * self.workers:
+                        item = next(pending, None)
+                        if item is None:
+                            break
+                        i, (s, e) = item
+                        running[pool.submit(_transform_range, i, s, e)] = i
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = running.pop(future)
+                        error = future.exception()
+                        if error is not None:
+                            for other in running:
+                                other.cancel()
+                            logging.error(f"Chunk {index} of {input_path} failed; cancelling the remaining chunks.")
+                            raise error
+                        shards.append(future.result())
+        shards.sort(key=lambda shard: shard["index"])
+
+        manifest = {
+            "input": os.path.abspath(input_path),
+            "rows": sum(shard["rows"] for shard in shards),
+            "n_features": shards[0]["n_features"] if shards else 0,
+            "chunk_size": self.chunk_size,
+            "workers": self.workers,
+            "wall_s": round(time.perf_counter() - start_time, 3),
+            "shards": [{"path": shard["path"], "rows": shard["rows"]} for shard in shards],
+        }
+        ArtifactSaver.save_json(os.path.join(output_dir, "manifest.json"), manifest)
+        logging.info(f"Batch transform done: {manifest['rows']} rows in {len(shards)} shards, {manifest['wall_s']:.2f}s.")
+        return manifest
+
+    @staticmethod
+    def load(output_dir: str):
+        """All shards of a run concatenated in input order (CSR if the shards are sparse)."""
+        with open(os.path.join(output_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        parts = [os.path.join(output_dir, shard["path"]) for shard in manifest["shards"]]
+        if parts and parts[0].endswith(".npz"):
+            return sparse.vstack([sparse.load_npz(p) for p in parts], format="csr")
+        return np.concatenate([np.load(p) for p in parts]) if parts else np.empty((0, manifest["n_features"]))
@@ -0,0 +1,31 @@
+from __future__ import annotations
+import zlib
+from typing import Any
+import numpy as np
+import pandas as pd
+
+class CategoryHasher:
+    """
+    The hashing trick for categorical columns: the token "<column>=<value>" goes
+    to bucket crc32(token) % n_features. crc32 is stable across processes and
+    Python versions (unlike hash()), so the bucket of a category never depends
+    on what was seen at fit time, and unseen categories need no vocabulary.
+    Missing values hash as "<column>=nan". Shared by HashingEncoder and
+    CompiledPreprocessor, so it only needs numpy/pandas.
+    """
+    @staticmethod
+    def token(column: str, value: Any) -> str:
+        if value is None or (isinstance(value, float) and value != value):
+            value = "nan"
+        return f"{column}={value}"
+
+    @staticmethod
+    def bucket(column: str, value: Any, n_features: int) -> int:
+        return zlib.crc32(CategoryHasher.token(column, value).encode("utf-8")) % n_features
+
+    @staticmethod
+    def buckets(column: str, values, n_features: int) -> np.ndarray:
+        """Bucket per row; each distinct value is hashed once."""
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+        table = np.fromiter((CategoryHasher.bucket(column, v, n_features) for v in uniques), dtype=np.int64, count=len(uniques))
+        return table[codes]
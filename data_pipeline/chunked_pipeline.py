@@ -0,0 +1,196 @@
+from __future__ import annotations
+import logging
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from data_pipeline.data_ingestion import DataIngestion
+from data_pipeline.batch_profiler import BatchProfiler
+from data_pipeline.feature_preparer import FeaturePreparer
+from data_pipeline.config_validator import ConfigValidator
+from data_pipeline.data_splitter import DataSplitter
+from data_pipeline.feature_encoding import PreprocessorFactory, TopKOneHotEncoder
+from data_pipeline.compiled_transformer import CompiledPreprocessor
+from data_pipeline.imbalance_handler import ImbalanceHandler
+from data_pipeline.drift_monitor import DriftMonitor
+from data_pipeline.artifact_saver import ArtifactSaver, NpzStreamWriter, NpyStreamWriter, SparseNpzStreamWriter
+from data_pipeline.stage_profiler import StageProfiler
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
+
+class ChunkedDataPipeline:
+    """
+    Out-of-core variant of DataPipeline.run. The CSV is streamed three times in
+    batches of `execution.chunk_size` rows:
+
+      1. imputation statistics for `numeric_to_coerce` columns (one pass),
+      2. scaler partial_fit and category vocabularies on the train split,
+      3. transform and append each batch to the train/test artifacts.
+
+    Peak memory is bounded by the chunk size, not the file size. Each chunk is
+    split with its own stratified train/test split, seeded from the chunk index,
+    so passes 2 and 3 see identical splits. Chunks below
+    ConfigValidator.MIN_CHUNK_SIZE rows are refused, as their rounding would
+    skew the overall test_size.
+    """
+    def __init__(self, config: Dict, profiler: Optional[StageProfiler] = None):
+        self.config = config
+        self.profiler = profiler or StageProfiler.from_config(config)
+        self.chunk_size: int = int(config.get("execution", {}).get("chunk_size", 100_000))
+        if self.chunk_size < ConfigValidator.MIN_CHUNK_SIZE:
+            raise ValueError(f"execution.chunk_size must be at least {ConfigValidator.MIN_CHUNK_SIZE} rows, "
+                             f"got {self.chunk_size}: per-chunk splits would skew test_size")
+        self.target: str = config["data"]["target_column"]
+        self.ingestion = DataIngestion(config)
+
+    def _chunks(self):
+        return self.ingestion.iter_chunks(self.chunk_size)
+
+
+    def _split(self, df: pd.DataFrame, chunk_idx: int) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+        prep = self.config["preprocessing"]
+        X = df.drop(columns=[self.target])
+        y = df[self.target]
+        # Chunks too small (or single-class) for a stratified split fall back to simpler splits
+        return DataSplitter.split_or_fallback(X, y, test_size=prep["test_size"], random_state=prep["random_state"] + chunk_idx)
+
+    def _fit_imputation(self) -> Dict[str, float]:
+        prep = self.config["preprocessing"]
+        columns = prep.get("numeric_to_coerce", [])
+        # Only the imputed columns are sketched; medians come from the quantile sketch
+        profile = BatchProfiler.from_config(self.config)
+        for chunk in self._chunks():
+            profile.update(chunk[[c for c in columns if c in chunk.columns]])
+        fill_values = profile.fill_values(prep["missing_value_strategy"], columns)
+        logging.info(f"Streaming imputation values ({prep['missing_value_strategy']}): {fill_values}")
+        return fill_values
+
+    @staticmethod
+    def _vocabulary(values: set, has_nan: bool) -> List:
+        vocab = sorted(values)
+        if has_nan:
+            # sklearn requires the missing-value category to come last
+            vocab.append(np.nan)
+        return vocab
+
+    def run(self) -> None:
+        strategy = ImbalanceHandler.strategy_for(self.config)
+        if strategy in ("smote", "random_oversample"):
+            raise ValueError(
+                f"Resampling strategy '{strategy}' needs the full training matrix in memory and is not available "
+                "in chunked mode; use preprocessing.resampling.strategy 'class_weight', set preprocessing.smote "
+                "to false or set execution.mode to 'in_memory'."
+            )
+        with self.profiler.stage("imputation_pass", chunk_size=self.chunk_size) as record:
+            fill_values = self._fit_imputation()
+            record["outputs"] = StageProfiler.shapes({"fill_values": fill_values})
+        preparer = FeaturePreparer(self.config, fill_values)
+
+        # Pass 2: partial fits over the train split of every chunk
+        numeric_features: List[str] = []
+        categorical_features: List[str] = []
+        scaler = PreprocessorFactory._scaler(self.config["preprocessing"]["scaling"])
+        seen: Dict[str, set] = {}
+        seen_nan: Dict[str, bool] = {}
+        # onehot_topk keeps the most frequent categories over all chunks, so it needs counts
+        topk = self.config["preprocessing"]["encoding"] == "onehot_topk"
+        counts: Dict[str, Dict] = {}
+        sample = None
+        n_train = n_test = 0
+        class_counts: Dict = {}
+        train_profile = None
+        with self.profiler.stage("fit_pass", chunk_size=self.chunk_size) as record:
+            for idx, chunk in enumerate(self._chunks()):
+                X_train, X_test, y_train, _ = self._split(preparer.transform(chunk), idx)
+                for cls, count in y_train.value_counts().items():
+                    class_counts[cls] = class_counts.get(cls, 0) + int(count)
+                if sample is None:
+                    numeric_features = list(X_train.select_dtypes(include=["int64", "float64"]).columns)
+                    categorical_features = list(X_train.select_dtypes(include=["object", "category"]).columns)
+                    seen = {c: set() for c in categorical_features}
+                    seen_nan = {c: False for c in categorical_features}
+                    counts = {c: {} for c in categorical_features}
+                    sample = X_train
+                n_train += len(X_train)
+                n_test += len(X_test)
+                if len(X_train):
+                    scaler.partial_fit(X_train[numeric_features])
+                    train_profile = DriftMonitor.merge(train_profile, DriftMonitor.profile(X_train))
+                for col in categorical_features:
+                    values = X_train[col]
+                    seen_nan[col] = seen_nan[col] or bool(values.isna().any())
+                    seen[col].update(values.dropna().unique().tolist())
+                    if topk:
+                        for value, count in values.value_counts(dropna=False).items():
+                            # np.nan is one object, so every chunk's missing values share a key
+                            key = np.nan if pd.isna(value) else value
+                            counts[col][key] = counts[col].get(key, 0) + int(count)
+            if sample is None:
+                raise ValueError(f"No rows read from {self.ingestion.file_path}")
+            logging.info(f"Chunked fit pass complete: {n_train} train rows, {n_test} test rows.")
+
+            if topk:
+                # Ranked by frequency (min_frequency applied); the encoder keeps the first max_categories - 1
+                min_frequency = PreprocessorFactory.encoding_options(self.config).get("min_frequency")
+                categories = [TopKOneHotEncoder.top_categories(counts[c], len(counts[c]) + 1, min_frequency)
+                              for c in categorical_features]
+            else:
+                categories = [self._vocabulary(seen[c], seen_nan[c]) for c in categorical_features]
+            preprocessor = PreprocessorFactory.create(numeric_features, categorical_features, self.config, categories=categories)
+            # Fit on one chunk to get a fitted ColumnTransformer, then swap in the scaler fitted on all chunks
+            preprocessor.fit(sample)
+            preprocessor.named_transformers_["num"].steps[-1] = ("scaler", scaler)
+            feature_names = PreprocessorFactory.get_feature_names(preprocessor, numeric_features, categorical_features)
+            n_features = len(feature_names)
+            record["outputs"] = {"X_train": [n_train, len(sample.columns)], "X_test": [n_test, len(sample.columns)],
+                                 "feature_names": [n_features]}
+
+        # Pass 3: transform and write chunk by chunk
+        art = self.config["artifacts"]
+        sparse_mode = self.config["preprocessing"].get("sparse", False) and self.config["preprocessing"]["encoding"] in ("onehot", "onehot_topk", "hashing")
+        layout = art.get("format", "npz")
+        x_dtype = np.float32 if art.get("float32", False) else np.float64
+        dense_writer = NpyStreamWriter if layout == "npy" else NpzStreamWriter
+
+        def matrix_writer(path: str, n_rows: int):
+            if sparse_mode:
+                return SparseNpzStreamWriter(path, n_features, x_dtype, layout=layout)
+            return dense_writer(path, (n_rows, n_features), x_dtype)
+
+        with self.profiler.stage("transform_pass", chunk_size=self.chunk_size) as record, ExitStack() as stack:
+            record["outputs"] = {"X_train_proc": [n_train, n_features], "X_test_proc": [n_test, n_features]}
+            writers = {
+                "x_train": stack.enter_context(matrix_writer(art["x_train"], n_train)),
+                "y_train": stack.enter_context(dense_writer(art["y_train"], (n_train,), np.int64)),
+                "x_test": stack.enter_context(matrix_writer(art["x_test"], n_test)),
+                "y_test": stack.enter_context(dense_writer(art["y_test"], (n_test,), np.int64)),
+            }
+            for idx, chunk in enumerate(self._chunks()):
+                X_train, X_test, y_train, y_test = self._split(preparer.transform(chunk), idx)
+                for key, X, y in (("train", X_train, y_train), ("test", X_test, y_test)):
+                    if not len(X):
+                        continue
+                    X_proc = preprocessor.transform(X)
+                    if sparse.issparse(X_proc) and not sparse_mode:
+                        # Densify per batch, never the whole matrix
+                        X_proc = X_proc.toarray()
+                    writers[f"x_{key}"].write(X_proc)
+                    writers[f"y_{key}"].write(y.to_numpy())
+
+        with self.profiler.stage("save"):
+            if layout == "npy":
+                ArtifactSaver.write_manifest(self.config, ["x_train", "y_train", "x_test", "y_test"], feature_names)
+            ArtifactSaver.save_npy(art["feature_names"], np.array(feature_names, dtype=object))
+            ArtifactSaver.save_preprocessor(art["preprocessor"], preprocessor)
+            if art.get("compiled_preprocessor"):
+                CompiledPreprocessor.from_fitted(preprocessor).save(art["compiled_preprocessor"])
+            ArtifactSaver.save_json(ArtifactSaver.fill_values_path(art), fill_values)
+            ArtifactSaver.save_json(ArtifactSaver.train_profile_path(art), train_profile)
+            if strategy == "class_weight":
+                # Same "balanced" weights as ImbalanceHandler, from the streamed train-split counts
+                total = sum(class_counts.values())
+                weights = {str(c): total / (len(class_counts) * n) for c, n in sorted(class_counts.items())}
+                ArtifactSaver.save_json(ArtifactSaver.class_weights_path(art), weights)
+        logging.info("Chunked data pipeline completed successfully.")
@@ -0,0 +1,293 @@
+"""
+Command-line entry point (python main.py <command>, or python -m data_pipeline.cli).
+
+    run        full pipeline, or --append / --stage / --sweep / --evaluate
+    transform  raw customer CSV -> preprocessed feature matrix (or ordered shards, in parallel)
+    score      raw customer CSV -> churn probabilities
+    profile    one-pass column statistics of a CSV, and its drift (PSI) against training
+    registry   register a model with the current preprocessor, or list registered versions
+    validate   check a config file without running anything
+    bench      run one of the benchmarks/ modules
+
+Only argparse and yaml are imported up front; each command imports what it
+needs when it runs, so `validate` never loads pandas and `transform`/`score`
+never load imblearn (nor sklearn, with a compiled preprocessor and a .npz or
+non-sklearn model). `python main.py --sweep` and the other pre-subcommand
+flags still work and mean `run --sweep`.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+import yaml
+
+COMMANDS = ("run", "transform", "score", "profile", "registry", "validate", "bench")
+
+def _load_config(path: str) -> Dict:
+    with open(path, "r") as f:
+        return yaml.safe_load(f)
+
+def _setup_logging(log_file: Optional[str] = None) -> None:
+    # Logs go to stderr (and the pipeline log for `run`) so `score` can write CSV to stdout
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", handlers=handlers)
+
+# ---- commands -------------------------------------------------------------
+def _run(args: argparse.Namespace) -> int:
+    _setup_logging("logs/pipeline.log")
+    config = _load_config(args.config)
+    if args.append:
+        from data_pipeline.incremental_pipeline import IncrementalDataPipeline
+        for path in args.append:
+            result = IncrementalDataPipeline(config).append(path)
+            print(f"✅ {path}: {result['action']}")
+    elif args.stage:
+        from data_pipeline.data_pipeline import DataPipeline
+        outputs = DataPipeline(config).run_stage(args.stage)
+        print(f"✅ Stage '{args.stage}' done: {', '.join(outputs)}")
+    elif args.sweep:
+        from data_pipeline.sweep_runner import SweepRunner
+        summary = SweepRunner.from_config(config).run()
+        print(f"✅ Sweep of {len(summary['variants'])} variants done in {summary['wall_s']:.1f}s "
+              f"({summary['stage_runs']} stage runs instead of {summary['stage_runs_without_sharing']}).")
+    elif args.evaluate:
+        from data_pipeline.cross_validator import CrossValidator
+        per_fold = CrossValidator.from_config(config).run()
+        print(CrossValidator.summarize(per_fold).to_string(index=False))
+    else:
+        from data_pipeline.data_pipeline import DataPipeline
+        DataPipeline(config).run()
+        print("✅ Data pipeline executed successfully. Artifacts saved to 'artifacts_pipeline/'.")
+    return 0
+
+def _transform(args: argparse.Namespace) -> int:
+    _setup_logging()
+    import numpy as np
+    import pandas as pd
+    from data_pipeline.artifact_saver import ArtifactSaver, sparse
+    from data_pipeline.scoring_service import ChurnScorer
+
+    config = _load_config(args.config)
+    if not os.path.splitext(args.output)[1]:
+        # A directory: chunks are transformed in worker processes and written as ordered shards
+        from data_pipeline.batch_transformer import BatchTransformer
+        manifest = BatchTransformer(config, args.workers, args.chunk_size).run(args.input, args.output)
+        print(f"✅ {manifest['rows']} rows x {manifest['n_features']} features -> "
+              f"{len(manifest['shards'])} shards in {args.output}")
+        return 0
+    X = ChurnScorer.load_preparer(config).features_only(pd.read_csv(args.input))
+    X_proc = ChurnScorer.load_preprocessor(config).transform(X)
+    if args.output.endswith(".csv"):
+        names = config["artifacts"]["feature_names"]
+        columns = [str(n) for n in np.load(names, allow_pickle=True)] if os.path.exists(names) else None
+        dense = X_proc.toarray() if sparse.issparse(X_proc) else X_proc
+        pd.DataFrame(dense, columns=columns).to_csv(args.output, index=False)
+    elif args.output.endswith(".npz"):
+        ArtifactSaver.save_matrix(args.output, X_proc)
+    else:
+        ArtifactSaver.save_npy(args.output, X_proc.toarray() if sparse.issparse(X_proc) else X_proc)
+    print(f"✅ {X_proc.shape[0]} rows x {X_proc.shape[1]} features -> {args.output}")
+    return 0
+
+def _score(args: argparse.Namespace) -> int:
+    _setup_logging()
+    import pandas as pd
+    from data_pipeline.scoring_service import ChurnScorer
+
+    config = _load_config(args.config)
+    threshold = args.threshold if args.threshold is not None else config.get("evaluation", {}).get("threshold", 0.5)
+    records = pd.read_csv(args.input)
+    # Identifier columns (e.g. customerID) are dropped during preparation; keep them for the output
+    ids = [c for c in config["data"].get("drop_columns", []) if c in records.columns]
+    out = records[ids].copy()
+    scorer = ChurnScorer(config, args.model)
+    out["churn_probability"] = scorer.score(records)
+    if scorer.cache is not None:
+        logging.info(f"Score cache: {scorer.cache.stats()}")
+    out["churn_prediction"] = (out["churn_probability"] >= threshold).astype(int)
+    out.to_csv(args.output or sys.stdout, index=False)
+    if args.output:
+        print(f"✅ Scored {len(out)} rows -> {args.output}")
+    return 0
+
+def _profile(args: argparse.Namespace) -> int:
+    _setup_logging()
+    import json
+    import pandas as pd
+    from data_pipeline.artifact_saver import ArtifactSaver
+    from data_pipeline.batch_profiler import BatchProfiler
+
+    config = _load_config(args.config)
+    profile = None
+    for path in args.input or [None]:
+        part = BatchProfiler.profile_csv(config, path, args.workers, args.chunk_size)
+        profile = part if profile is None else profile.merge(part)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(profile.summary().to_string(float_format=lambda v: f"{v:.4g}"))
+    if args.output:
+        ArtifactSaver.save_json(args.output, profile.to_dict())
+        print(f"✅ Profile of {profile.rows} rows -> {args.output}")
+
+    against = args.against or ArtifactSaver.train_profile_path(config["artifacts"])
+    if not os.path.exists(against):
+        if args.against:
+            print(f"❌ No profile at {against}")
+            return 1
+        return 0
+    with open(against, "r") as f:
+        reference = json.load(f)
+    # A DriftMonitor training profile keeps its sketches under "sketches"
+    reference = reference.get("sketches", reference)
+    if "columns" not in reference:
+        print(f"{'❌' if args.against else 'ℹ️ '} {against} has no sketches (written before profiling); rerun the pipeline to get one.")
+        return 1 if args.against else 0
+    reference = BatchProfiler.from_dict(reference)
+    limit = float(config.get("incremental", {}).get("max_psi", 0.25))
+    psi = profile.psi(reference)
+    print(f"\nPSI against {against} (columns in both; drift above {limit}):")
+    for col, value in sorted(psi.items(), key=lambda kv: -kv[1]):
+        print(f"{'❌' if value > limit else '  '} {col:<24} {value:.4f}")
+    return 0
+
+def _registry(args: argparse.Namespace) -> int:
+    _setup_logging()
+    import json
+    import time
+    from data_pipeline.model_registry import ModelRegistry
+
+    config = _load_config(args.config)
+    registry = ModelRegistry.from_config(config)
+    if args.action == "register":
+        if not args.name:
+            print("❌ register needs a model name")
+            return 1
+        model_path = args.model or config["serving"]["model_path"]
+        metrics = json.loads(args.metrics) if args.metrics else None
+        version = registry.register_artifacts(args.name, model_path, config, metrics)
+        print(f"✅ Registered {model_path} as registry:{args.name}:{version}")
+        return 0
+    names = [args.name] if args.name else registry.names()
+    if not any(registry.versions(name) for name in names):
+        print(f"No models registered in {registry.root}")
+    for name in names:
+        for version in registry.versions(name):
+            meta = registry.meta(name, version)
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(meta["created_at"]))
+            metrics = " ".join(f"{k}={v:.4g}" if isinstance(v, (int, float)) else f"{k}={v}" for k, v in meta["metrics"].items())
+            print(f"registry:{name}:{version}  {created}  {meta['model_class']}  {len(meta['feature_names'])} features "
+                  f"(signature {meta['feature_signature']})  config {meta['config_hash'][:12]}  {metrics}".rstrip())
+    return 0
+
+def _validate(args: argparse.Namespace) -> int:
+    from data_pipeline.config_validator import ConfigValidator
+
+    try:
+        config = _load_config(args.config)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"❌ Cannot read {args.config}: {e}")
+        return 1
+    problems = ConfigValidator.validate(config, check_paths=not args.no_paths)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print(f"✅ {args.config} is valid.")
+    return 1 if problems else 0
+
+def _bench(args: argparse.Namespace) -> int:
+    import pkgutil
+    import runpy
+    import benchmarks
+
+    names = sorted(m.name[len("bench_"):] for m in pkgutil.iter_modules(benchmarks.__path__) if m.name.startswith("bench_"))
+    if not args.name:
+        print("Benchmarks: " + ", ".join(names))
+        return 0
+    name = args.name[len("bench_"):] if args.name.startswith("bench_") else args.name
+    if name not in names:
+        print(f"❌ Unknown benchmark '{args.name}'. Benchmarks: {', '.join(names)}")
+        return 1
+    module = f"benchmarks.bench_{name}"
+    sys.argv = [module] + args.bench_args
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+    return 0
+
+# ---- parser ---------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default="config/config.yaml")
+
+    parser = argparse.ArgumentParser(description="Telco churn data pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", parents=[common], help="Run the pipeline (default command)")
+    group = run.add_mutually_exclusive_group()
+    # Incremental mode: python main.py run --append data/raw/new_customers.csv
+    group.add_argument("--append", nargs="+", metavar="CSV", help="Append new extracts to the existing artifacts")
+    # One stage and whatever it needs that is not cached: python main.py run --stage encode
+    group.add_argument("--stage", help="Run a single stage and its dependencies")
+    # Every combination of sweep.grid, sharing common stages: python main.py run --sweep
+    group.add_argument("--sweep", action="store_true", help="Run the preprocessing grid in config sweep.grid")
+    # Cross-validated comparison of the models in evaluation.models: python main.py run --evaluate
+    group.add_argument("--evaluate", action="store_true", help="Cross-validate and compare the configured models")
+    run.set_defaults(fn=_run)
+
+    transform = commands.add_parser("transform", parents=[common], help="Preprocess raw records with the fitted artifacts")
+    transform.add_argument("input", help="CSV of raw customer records (target column optional)")
+    transform.add_argument("-o", "--output", required=True,
+                           help="Output .npy, .npz (CSR kept sparse), .csv (with feature names), or a directory for "
+                                "shards transformed in parallel (part-00000.npy, ... plus manifest.json)")
+    transform.add_argument("--workers", type=int, default=None,
+                           help="Worker processes for directory output (default execution.transform_workers or all cores)")
+    transform.add_argument("--chunk-size", type=int, default=None,
+                           help="Rows per shard for directory output (default execution.chunk_size)")
+    transform.set_defaults(fn=_transform)
+
+    score = commands.add_parser("score", parents=[common], help="Churn probabilities for raw records")
+    score.add_argument("input", help="CSV of raw customer records")
+    score.add_argument("--model", default=None, help="Model path (default serving.model_path; .npz = exported tree ensemble; "
+                                                     "registry:<name>[:<version>] = a registered version)")
+    score.add_argument("--threshold", type=float, default=None, help="Decision threshold (default evaluation.threshold or 0.5)")
+    score.add_argument("-o", "--output", default=None, help="Output CSV (default: stdout)")
+    score.set_defaults(fn=_score)
+
+    profile = commands.add_parser("profile", parents=[common], help="Column statistics of raw records and drift against training")
+    profile.add_argument("input", nargs="*", help="CSV file(s) of raw records (default data.file_path)")
+    profile.add_argument("-o", "--output", default=None, help="Write the (mergeable) profile as JSON")
+    profile.add_argument("--against", default=None,
+                         help="Reference profile JSON for the PSI report (default the training profile, if present)")
+    profile.add_argument("--workers", type=int, default=None,
+                         help="Worker processes (default execution.transform_workers or all cores)")
+    profile.add_argument("--chunk-size", type=int, default=None, help="Rows per chunk (default execution.chunk_size)")
+    profile.set_defaults(fn=_profile)
+
+    registry = commands.add_parser("registry", parents=[common], help="Register models or list the registered versions")
+    registry.add_argument("action", choices=["list", "register"])
+    registry.add_argument("name", nargs="?", help="Model name (register: required; list: only this model)")
+    registry.add_argument("--model", default=None, help="Model file to register (default serving.model_path)")
+    registry.add_argument("--metrics", default=None, help='Metrics to store with the version, as JSON, e.g. \'{"auc": 0.84}\'')
+    registry.set_defaults(fn=_registry)
+
+    validate = commands.add_parser("validate", parents=[common], help="Check a config file")
+    validate.add_argument("--no-paths", action="store_true", help="Do not check that the input files exist")
+    validate.set_defaults(fn=_validate)
+
+    bench = commands.add_parser("bench", help="Run a benchmark from benchmarks/ (no name: list them)")
+    bench.add_argument("name", nargs="?", help="e.g. scoring_service for benchmarks/bench_scoring_service.py")
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER, help="Arguments passed to the benchmark")
+    bench.set_defaults(fn=_bench)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Pre-subcommand invocations (python main.py, python main.py --sweep, ...) mean `run`
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv.insert(0, "run")
+    args = build_parser().parse_args(argv)
+    return args.fn(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
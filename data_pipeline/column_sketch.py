@@ -0,0 +1,246 @@
+from __future__ import annotations
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+class CategoricalSketch:
+    """
+    Frequency table of one column, bounded to `capacity` values: when it grows
+    past 2 x capacity the least frequent values are folded into `other`, so
+    counts stay exact for columns with at most 2 x capacity distinct values.
+    Values are kept as strings (the JSON keys of the stored profile); `count`
+    excludes missing values, which are counted in `nulls`.
+    """
+    kind = "categorical"
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.count = 0
+        self.nulls = 0
+        self.other = 0
+        self.counts: Dict[str, int] = {}
+
+    def update(self, values: pd.Series) -> "CategoricalSketch":
+        # One hash pass that also counts the missing values (several times faster than dropna=True)
+        counts = values.value_counts(dropna=False, sort=False)
+        missing = counts.index.isna()
+        nulls = int(counts[missing].sum())
+        counts = counts[~missing & (counts.to_numpy() > 0)]
+        self.count += len(values) - nulls
+        self.nulls += nulls
+        if len(counts) > 2 * self.capacity:
+            # Only a chunk's heavy hitters reach the table (near-unique columns would otherwise dominate)
+            kept = counts.nlargest(2 * self.capacity)
+            self.other += int(counts.sum() - kept.sum())
+            counts = kept
+        for value, count in counts.items():
+            key = str(value)
+            self.counts[key] = self.counts.get(key, 0) + int(count)
+        return self._prune()
+
+    def merge(self, other: "CategoricalSketch") -> "CategoricalSketch":
+        self.count += other.count
+        self.nulls += other.nulls
+        self.other += other.other
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        return self._prune()
+
+    def _prune(self) -> "CategoricalSketch":
+        if len(self.counts) > 2 * self.capacity:
+            ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+            self.other += sum(count for _, count in ranked[self.capacity:])
+            self.counts = dict(ranked[:self.capacity])
+        return self
+
+    def mode(self) -> Optional[str]:
+        """Most frequent value; ties go to the smallest, like Series.mode().iloc[0]."""
+        return min(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[0] if self.counts else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "capacity": self.capacity, "count": self.count, "nulls": self.nulls,
+                "other": self.other, "counts": self.counts}
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "CategoricalSketch":
+        sketch = CategoricalSketch(d["capacity"])
+        sketch.count, sketch.nulls, sketch.other, sketch.counts = d["count"], d["nulls"], d["other"], dict(d["counts"])
+        return sketch
+
+
+class NumericSketch:
+    """
+    One numeric column: count, nulls, min/max, mean and sum of squared
+    deviations (merged with Chan et al.), a quantile sketch and a small
+    frequency table for the mode (and exact quantiles while it holds every
+    value).
+
+    The quantile sketch is DDSketch-style: |x| goes to bucket
+    ceil(log_gamma |x|) with gamma = (1 + a) / (1 - a), one bucket store for
+    positive and one for negative values, so every quantile is within relative
+    error `a` of a true value and two sketches merge by adding bucket counts.
+    Past `max_buckets` per store the smallest-magnitude buckets are collapsed;
+    memory never depends on the number of rows.
+    """
+    kind = "numeric"
+    # |x| below this counts as zero (log buckets cannot reach it)
+    MIN_MAGNITUDE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.005, max_buckets: int = 2048, frequent_capacity: int = 256):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.nulls = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.zeros = 0
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.frequent = CategoricalSketch(frequent_capacity)
+
+    # ---- updates ----------------------------------------------------------
+    def update(self, values: np.ndarray) -> "NumericSketch":
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        self.nulls += int(missing.sum())
+        values = values[~missing]
+        if not len(values):
+            return self
+        n = len(values)
+        mean = float(values.mean())
+        self._merge_moments(n, mean, float(((values - mean) ** 2).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        magnitude = np.abs(values)
+        small = magnitude < self.MIN_MAGNITUDE
+        self.zeros += int(small.sum())
+        for store, selected in ((self.positive, (values > 0) & ~small), (self.negative, (values < 0) & ~small)):
+            if selected.any():
+                self._add_keys(store, self._keys(magnitude[selected]))
+        self._collapse()
+        self.frequent.update(pd.Series(values))
+        return self
+
+    def _keys(self, magnitude: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitude) / self._log_gamma).astype(np.int64)
+
+    @staticmethod
+    def _add_keys(store: Dict[int, int], keys: np.ndarray) -> None:
+        # bincount over the (small) key range instead of hashing every row
+        low = int(keys.min())
+        counts = np.bincount(keys - low)
+        for offset in np.flatnonzero(counts):
+            key = low + int(offset)
+            store[key] = store.get(key, 0) + int(counts[offset])
+
+    def _merge_moments(self, n: int, mean: float, m2: float) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def _collapse(self) -> None:
+        for store in (self.positive, self.negative):
+            if len(store) > self.max_buckets:
+                keys = sorted(store)
+                floor = keys[len(keys) - self.max_buckets]
+                folded = sum(store.pop(k) for k in keys[:len(keys) - self.max_buckets])
+                store[floor] += folded
+
+    def merge(self, other: "NumericSketch") -> "NumericSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge numeric sketches with different relative accuracy")
+        self.nulls += other.nulls
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.zeros += other.zeros
+        for store, incoming in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in incoming.items():
+                store[key] = store.get(key, 0) + count
+        self._collapse()
+        self.frequent.merge(other.frequent)
+        return self
+
+    # ---- queries ----------------------------------------------------------
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _buckets(self) -> List[tuple]:
+        """(representative value, count) in ascending order of value."""
+        buckets = [(-self._value(k), self.negative[k]) for k in sorted(self.negative, reverse=True)]
+        if self.zeros:
+            buckets.append((0.0, self.zeros))
+        return buckets + [(self._value(k), self.positive[k]) for k in sorted(self.positive)]
+
+    @property
+    def exact(self) -> bool:
+        """True while the frequency table holds every value (few distinct values): quantiles are then exact."""
+        return self.frequent.other == 0 and sum(self.frequent.counts.values()) == self.count
+
+    def _table(self) -> List[tuple]:
+        """(value, count) ascending: the exact values when available, else the buckets."""
+        if self.exact:
+            return sorted((float(k), c) for k, c in self.frequent.counts.items())
+        return self._buckets()
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        if self.exact:
+            # Linear interpolation between order statistics, like Series.quantile / median
+            table = self._table()
+            values = np.array([v for v, _ in table])
+            cumulative = np.cumsum([c for _, c in table])
+            lower, upper = values[np.searchsorted(cumulative, [math.floor(rank), math.ceil(rank)], side="right")]
+            return float(lower + (upper - lower) * (rank - math.floor(rank)))
+        seen = 0
+        for value, count in self._buckets():
+            seen += count
+            if seen > rank:
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def cdf(self, cuts: List[float]) -> np.ndarray:
+        """Fraction of non-missing values <= each cut (at bucket granularity unless exact)."""
+        if not self.count:
+            return np.zeros(len(cuts))
+        buckets = self._table()
+        values = np.array([v for v, _ in buckets])
+        cumulative = np.cumsum([c for _, c in buckets])
+        positions = np.searchsorted(values, np.asarray(cuts, dtype=np.float64), side="right")
+        return np.where(positions > 0, cumulative[np.maximum(positions - 1, 0)], 0) / self.count
+
+    def mode(self) -> float:
+        key = self.frequent.mode()
+        return float(key) if key is not None else math.nan
+
+    # ---- storage ----------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "relative_accuracy": self.relative_accuracy, "max_buckets": self.max_buckets,
+                "count": self.count, "nulls": self.nulls, "min": self.min if self.count else None,
+                "max": self.max if self.count else None, "mean": self.mean, "m2": self.m2, "zeros": self.zeros,
+                "positive": {str(k): v for k, v in self.positive.items()},
+                "negative": {str(k): v for k, v in self.negative.items()}, "frequent": self.frequent.to_dict()}
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "NumericSketch":
+        sketch = NumericSketch(d["relative_accuracy"], d["max_buckets"], d["frequent"]["capacity"])
+        sketch.count, sketch.nulls, sketch.mean, sketch.m2, sketch.zeros = d["count"], d["nulls"], d["mean"], d["m2"], d["zeros"]
+        sketch.min = d["min"] if d["min"] is not None else math.inf
+        sketch.max = d["max"] if d["max"] is not None else -math.inf
+        sketch.positive = {int(k): v for k, v in d["positive"].items()}
+        sketch.negative = {int(k): v for k, v in d["negative"].items()}
+        sketch.frequent = CategoricalSketch.from_dict(d["frequent"])
+        return sketch
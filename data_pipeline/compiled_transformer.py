@@ -0,0 +1,194 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+import pandas as pd
+import joblib
+
+from data_pipeline.category_hasher import CategoryHasher
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
+
+class CompiledPreprocessor:
+    """
+    A fitted PreprocessorFactory ColumnTransformer flattened into NumPy state:
+    scale/offset vectors for the numeric block and a category -> index dict per
+    categorical column (kept categories for onehot_topk, nothing but the width
+    for hashing). transform() skips sklearn's DataFrame validation and
+    column dispatch and reproduces preprocessor.transform bit for bit (same
+    float64 operations in the same order).
+
+    Only numpy/pandas/scipy are needed to load and run it, so save()/load()
+    give scoring processes a preprocessor that never imports sklearn.
+    """
+    # Batches at least this large factorize each column once instead of one dict lookup per row
+    VECTORIZE_ROWS = 64
+
+    def __init__(self, numeric_features: List[str], categorical_features: List[str], numeric_ops: List[Tuple[str, np.ndarray]],
+                 encoding: str, lookups: List[Dict[Any, int]], categories: List[List[Any]], nan_index: List[int],
+                 n_outputs: int, sparse_output: bool, numeric_clip: Optional[Tuple[float, float]] = None,
+                 missing_code: float = np.nan, hash_features: int = 0):
+        self.numeric_features = numeric_features
+        self.categorical_features = categorical_features
+        self.numeric_ops = numeric_ops
+        self.numeric_clip = numeric_clip
+        self.encoding = encoding
+        self.lookups = lookups
+        self.categories = categories
+        self.nan_index = nan_index
+        self.missing_code = missing_code
+        self.n_outputs = n_outputs
+        self.sparse_output = sparse_output
+        self.hash_features = hash_features
+        # onehot_topk: each column's kept categories are followed by its "other" output
+        extra = 1 if encoding == "onehot_topk" else 0
+        self._offsets = np.cumsum([0] + [len(c) + extra for c in categories])[:-1] if encoding in ("onehot", "onehot_topk") else None
+
+    # ---- compilation ------------------------------------------------------
+    @staticmethod
+    def _numeric_ops(scaler) -> Tuple[List[Tuple[str, np.ndarray]], Optional[Tuple[float, float]]]:
+        name = type(scaler).__name__
+        if name == "StandardScaler":
+            ops = []
+            if scaler.with_mean:
+                ops.append(("sub", np.asarray(scaler.mean_, dtype=np.float64)))
+            if scaler.with_std:
+                ops.append(("div", np.asarray(scaler.scale_, dtype=np.float64)))
+            return ops, None
+        if name == "MinMaxScaler":
+            clip = tuple(scaler.feature_range) if scaler.clip else None
+            return [("mul", np.asarray(scaler.scale_, dtype=np.float64)), ("add", np.asarray(scaler.min_, dtype=np.float64))], clip
+        raise ValueError(f"Cannot compile scaler {name}")
+
+    @staticmethod
+    def _split_categories(cats) -> Tuple[List[Any], bool]:
+        values = list(cats)
+        has_nan = bool(values) and isinstance(values[-1], float) and np.isnan(values[-1])
+        return (values[:-1] if has_nan else values), has_nan
+
+    @staticmethod
+    def from_fitted(preprocessor) -> "CompiledPreprocessor":
+        numeric_features: List[str] = []
+        categorical_features: List[str] = []
+        numeric_ops: List[Tuple[str, np.ndarray]] = []
+        numeric_clip = None
+        encoding = "onehot"
+        missing_code = np.nan
+        hash_features = 0
+        categories: List[List[Any]] = []
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder" or transformer == "drop" or len(columns) == 0:
+                continue
+            step = transformer.steps[-1][1] if hasattr(transformer, "steps") else transformer
+            if name == "num":
+                numeric_features = list(columns)
+                numeric_ops, numeric_clip = CompiledPreprocessor._numeric_ops(step)
+            elif name == "cat":
+                categorical_features = list(columns)
+                if type(step).__name__ == "OneHotEncoder":
+                    if step.drop_idx_ is not None or getattr(step, "_infrequent_enabled", False):
+                        raise ValueError("Cannot compile OneHotEncoder with drop or infrequent categories")
+                    categories = [list(c) for c in step.categories_]
+                elif type(step).__name__ == "TopKOneHotEncoder":
+                    encoding = "onehot_topk"
+                    categories = [list(c) for c in step.categories_]
+                elif type(step).__name__ == "HashingEncoder":
+                    encoding = "hashing"
+                    hash_features = int(step.n_features)
+                elif type(step).__name__ == "LabelEncodingTransformer":
+                    encoding = "label"
+                    categories = [list(c) for c in step.encoder.categories_]
+                    missing_code = float(step.encoder.encoded_missing_value)
+                else:
+                    raise ValueError(f"Cannot compile categorical encoder {type(step).__name__}")
+            else:
+                raise ValueError(f"Unexpected transformer '{name}' in preprocessor")
+        lookups, nan_index = [], []
+        # onehot_topk matches through a pandas Index like the encoder itself (NaN may be a kept category anywhere)
+        for cats in (categories if encoding in ("onehot", "label") else []):
+            values, has_nan = CompiledPreprocessor._split_categories(cats)
+            lookups.append({v: i for i, v in enumerate(values)})
+            nan_index.append(len(values) if has_nan else -1)
+        n_cat_outputs = {"onehot": sum(len(c) for c in categories), "onehot_topk": sum(len(c) + 1 for c in categories),
+                         "hashing": hash_features}.get(encoding, len(categories))
+        return CompiledPreprocessor(numeric_features, categorical_features, numeric_ops, encoding, lookups,
+                                    categories, nan_index, len(numeric_features) + n_cat_outputs,
+                                    bool(preprocessor.sparse_output_), numeric_clip, missing_code, hash_features)
+
+    def save(self, path: str) -> None:
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "CompiledPreprocessor":
+        return joblib.load(path)
+
+    # ---- transform --------------------------------------------------------
+    @staticmethod
+    def _column(X, col: str) -> np.ndarray:
+        values = X[col]
+        return values.to_numpy() if hasattr(values, "to_numpy") else np.asarray(values)
+
+    @staticmethod
+    def _is_nan(value) -> bool:
+        # sklearn treats float NaN as the missing category; None is an ordinary value
+        return isinstance(value, float) and value != value
+
+    def _lookup(self, values: np.ndarray, j: int) -> np.ndarray:
+        lookup, nan_idx = self.lookups[j], self.nan_index[j]
+        return np.fromiter((nan_idx if self._is_nan(v) else lookup.get(v, -1) for v in values),
+                           dtype=np.int64, count=len(values))
+
+    def _codes(self, values: np.ndarray, j: int) -> np.ndarray:
+        """Category index per row; -1 for unknown values, nan_index[j] for NaN."""
+        if len(values) < self.VECTORIZE_ROWS:
+            return self._lookup(values, j)
+        # Hash once per distinct value, then gather
+        fcodes, uniques = pd.factorize(values, use_na_sentinel=True)
+        codes = self._lookup(np.asarray(uniques, dtype=object), j)[np.maximum(fcodes, 0)] if len(uniques) else np.full(len(values), -1, dtype=np.int64)
+        missing = fcodes < 0
+        if missing.any():
+            # factorize folds None and NaN together; resolve those rows exactly
+            codes[missing] = self._lookup(values[missing], j)
+        return codes
+
+    def transform(self, X: pd.DataFrame | Mapping[str, Any]):
+        n_rows = len(X) if isinstance(X, pd.DataFrame) else len(self._column(X, (self.numeric_features + self.categorical_features)[0]))
+        out = np.zeros((n_rows, self.n_outputs), dtype=np.float64)
+        n_num = len(self.numeric_features)
+        if n_num:
+            num = np.empty((n_rows, n_num), dtype=np.float64)
+            for i, col in enumerate(self.numeric_features):
+                num[:, i] = self._column(X, col)
+            for op, vec in self.numeric_ops:
+                if op == "sub":
+                    num -= vec
+                elif op == "div":
+                    num /= vec
+                elif op == "mul":
+                    num *= vec
+                else:
+                    num += vec
+            if self.numeric_clip is not None:
+                np.clip(num, self.numeric_clip[0], self.numeric_clip[1], out=num)
+            out[:, :n_num] = num
+        rows = np.arange(n_rows)
+        for j, col in enumerate(self.categorical_features):
+            if self.encoding == "onehot_topk":
+                codes = pd.Index(self.categories[j], dtype=object).get_indexer(self._column(X, col).astype(object))
+                codes[codes < 0] = len(self.categories[j])
+                out[rows, n_num + self._offsets[j] + codes] = 1.0
+                continue
+            if self.encoding == "hashing":
+                np.add.at(out, (rows, n_num + CategoryHasher.buckets(col, self._column(X, col), self.hash_features)), 1.0)
+                continue
+            codes = self._codes(self._column(X, col), j)
+            if self.encoding == "onehot":
+                hit = codes >= 0
+                out[rows[hit], n_num + self._offsets[j] + codes[hit]] = 1.0
+            else:
+                # OrdinalEncoder: unknown -> -1, NaN -> encoded_missing_value when NaN was seen in fit
+                encoded = codes.astype(np.float64)
+                if self.nan_index[j] >= 0:
+                    encoded[codes == self.nan_index[j]] = self.missing_code
+                out[:, n_num + j] = encoded
+        return sparse.csr_matrix(out) if self.sparse_output else out
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import importlib
+import inspect
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.data_splitter import DataSplitter
+from data_pipeline.evaluation_metrics import BinaryMetrics
+from data_pipeline.shared_dataset import SharedDataset
+from data_pipeline.stage_cache import StageCache
+
+METRICS = ["Precision", "Recall", "F1", "ROC_AUC", "PR_AUC"]
+FOLD_ARRAYS = ("X_train", "y_train", "X_val", "y_val")
+
+def _build_fold(config: Dict, X_train: pd.DataFrame, y_train, X_val: pd.DataFrame, y_val) -> Dict[str, Any]:
+    """Encode and resample one fold with the pipeline's own stage functions (fit on the fold's train rows only)."""
+    pipeline = DataPipeline(config)
+    encoded = pipeline._encode(X_train)
+    X_val_proc = pipeline._encode_test(encoded["preprocessor"], X_val)["X_test_proc"]
+    resampled = pipeline._resample(encoded["X_train_proc"], y_train)
+    return {"X_train": resampled["X_train_final"], "y_train": np.asarray(resampled["y_train_final"]),
+            "X_val": X_val_proc, "y_val": np.asarray(y_val), "class_weights": resampled["class_weights"]}
+
+def _fit_and_score(model_name: str, model, fold_name: str, folds_spec: Dict[str, Any], class_weights: Optional[Dict],
+                   threshold: float) -> Dict[str, Any]:
+    # Read-only views of the published fold matrices; nothing is copied into the worker
+    shared = SharedDataset.attached(folds_spec)
+    fold = {part: shared[f"{fold_name}/{part}"] for part in FOLD_ARRAYS}
+    fold["class_weights"] = class_weights
+    model = clone(model)
+    fit_kwargs = {}
+    if fold["class_weights"] is not None and "sample_weight" in inspect.signature(model.fit).parameters:
+        weights = fold["class_weights"]
+        fit_kwargs["sample_weight"] = np.array([weights[c] for c in fold["y_train"].tolist()])
+    start = time.perf_counter()
+    model.fit(fold["X_train"], fold["y_train"], **fit_kwargs)
+    fit_s = time.perf_counter() - start
+    start = time.perf_counter()
+    if hasattr(model, "predict_proba"):
+        scores = model.predict_proba(fold["X_val"])[:, 1]
+    else:
+        scores = model.decision_function(fold["X_val"])
+    score_s = time.perf_counter() - start
+    return {"Model": model_name, "fold": fold_name, **BinaryMetrics.evaluate(fold["y_val"], scores, threshold),
+            "fit_s": fit_s, "score_s": score_s}
+
+class CrossValidator:
+    """
+    Stratified k-fold comparison of several models on the pipeline's training split.
+
+    Folds come from DataSplitter.folds over X_train/y_train (the test split stays
+    untouched, except as the optional "holdout" fold: fit on all of X_train,
+    score on X_test). Per fold the preprocessor and resampler are fitted once,
+    with the same stage functions as DataPipeline, and the resulting matrices
+    are stored in the stage cache under a key derived from the resample stage's
+    key, so reruns with other models skip straight to training. Every (model,
+    fold) pair is then trained and scored in parallel with joblib; the fold
+    matrices are published once to shared memory (SharedDataset) and the
+    workers attach to them read-only instead of receiving copies.
+    """
+    def __init__(self, config: Dict, models: Dict[str, Any], n_splits: int = 5, n_jobs: Optional[int] = -1,
+                 threshold: float = 0.5, holdout: bool = True, output_dir: Optional[str] = None):
+        if not models:
+            raise ValueError("No models to evaluate.")
+        self.config = config
+        self.models = models
+        self.n_splits = n_splits
+        self.n_jobs = n_jobs
+        self.threshold = threshold
+        self.holdout = holdout
+        self.output_dir = output_dir or os.path.join(os.path.dirname(config["artifacts"]["preprocessor"]), "evaluation")
+
+    @staticmethod
+    def from_config(config: Dict) -> "CrossValidator":
+        conf = config.get("evaluation", {})
+        return CrossValidator(
+            config,
+            CrossValidator.load_models(conf.get("models", [])),
+            n_splits=int(conf.get("n_splits", 5)),
+            n_jobs=conf.get("n_jobs", -1),
+            threshold=float(conf.get("threshold", 0.5)),
+            holdout=bool(conf.get("holdout", True)),
+            output_dir=conf.get("output_dir"),
+        )
+
+    @staticmethod
+    def load_models(specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Unfitted estimators from config entries: {"name", "estimator": dotted class path, "params"} or
+        {"name", "pickle": path}, whose hyperparameters are cloned from a saved model. Entries whose
+        library is not installed (e.g. xgboost, catboost) are skipped with a warning.
+        """
+        models = {}
+        for spec in specs:
+            try:
+                if "pickle" in spec:
+                    models[spec["name"]] = clone(joblib.load(spec["pickle"]))
+                else:
+                    module, _, cls = spec["estimator"].rpartition(".")
+                    models[spec["name"]] = getattr(importlib.import_module(module), cls)(**spec.get("params", {}))
+            except ImportError as e:
+                logging.warning(f"Skipping model '{spec['name']}': {e}")
+        return models
+
+    # ---- folds ------------------------------------------------------------
+    def folds(self) -> Dict[str, Dict[str, Any]]:
+        """Encoded (and resampled) matrices per fold, from the stage cache where available."""
+        pipeline = DataPipeline(self.config)
+        split = pipeline._resolve(["X_train", "y_train", "X_test", "y_test"])
+        cache = StageCache.from_config(self.config)
+        keys = {}
+        if cache is not None:
+            # The resample stage key covers the input file and the split, encode and resampling config
+            resample_key = pipeline.stage_keys(cache.file_digest)["resample"]
+            keys = {name: StageCache.key("cv_fold", {"fold": name, "n_splits": self.n_splits}, [resample_key])
+                    for name in self._fold_names()}
+
+        folds: Dict[str, Dict[str, Any]] = {}
+        todo = []
+        for name in self._fold_names():
+            hit = cache.load("cv_fold", keys[name]) if cache is not None else None
+            if hit is not None:
+                folds[name] = hit
+            else:
+                todo.append(name)
+        if todo:
+            X, y = split["X_train"], split["y_train"]
+            positions = dict(zip(self._fold_names(), DataSplitter.folds(y, self.n_splits,
+                                                                       self.config["preprocessing"]["random_state"])))
+            args = {name: (X.iloc[positions[name][0]], y.iloc[positions[name][0]],
+                           X.iloc[positions[name][1]], y.iloc[positions[name][1]]) for name in todo if name in positions}
+            if "holdout" in todo:
+                args["holdout"] = (X, y, split["X_test"], split["y_test"])
+            start = time.perf_counter()
+            built = Parallel(n_jobs=self.n_jobs)(delayed(_build_fold)(self.config, *args[name]) for name in todo)
+            logging.info(f"Built {len(todo)} folds in {time.perf_counter() - start:.2f}s.")
+            for name, fold in zip(todo, built):
+                folds[name] = fold
+                if cache is not None:
+                    cache.save("cv_fold", keys[name], fold)
+        logging.info(f"{len(self._fold_names()) - len(todo)} folds loaded from cache.")
+        return {name: folds[name] for name in self._fold_names()}
+
+    def _fold_names(self) -> List[str]:
+        return [f"fold{i}" for i in range(self.n_splits)] + (["holdout"] if self.holdout else [])
+
+    # ---- evaluation -------------------------------------------------------
+    def run(self) -> pd.DataFrame:
+        """Per-fold metrics for every model; also writes cv_folds.csv and the cv_results.csv summary."""
+        folds = self.folds()
+        start = time.perf_counter()
+        # Every fold matrix is copied into shared memory once; workers attach to it by name
+        with SharedDataset.publish({f"{fold_name}/{part}": fold[part]
+                                    for fold_name, fold in folds.items() for part in FOLD_ARRAYS}) as shared:
+            rows = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_and_score)(model_name, model, fold_name, shared.spec, fold["class_weights"], self.threshold)
+                for model_name, model in self.models.items() for fold_name, fold in folds.items())
+        logging.info(f"Trained and scored {len(rows)} model/fold pairs in {time.perf_counter() - start:.2f}s.")
+        per_fold = pd.DataFrame(rows)
+        summary = self.summarize(per_fold)
+        os.makedirs(self.output_dir, exist_ok=True)
+        per_fold.to_csv(os.path.join(self.output_dir, "cv_folds.csv"), index=False)
+        summary.to_csv(os.path.join(self.output_dir, "cv_results.csv"), index=False)
+        logging.info(f"Evaluation results written to {self.output_dir}")
+        return per_fold
+
+    @staticmethod
+    def summarize(per_fold: pd.DataFrame) -> pd.DataFrame:
+        """One row per model: CV mean and std of each metric, plus the holdout scores when present."""
+        cv = per_fold[per_fold["fold"] != "holdout"].groupby("Model", sort=False)
+        summary = cv[METRICS].mean()
+        summary = summary.join(cv[METRICS].std(ddof=0).add_suffix("_std"))
+        holdout = per_fold[per_fold["fold"] == "holdout"].set_index("Model")
+        if len(holdout):
+            summary = summary.join(holdout[METRICS].add_prefix("holdout_"))
+        return summary.reset_index()
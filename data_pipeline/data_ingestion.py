@@ -1,26 +1,72 @@
 from __future__ import annotations
+import importlib.util
 import logging
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Iterator, List, Union
 
 class DataIngestion:
     def __init__(self, config: Dict):
-        self.file_path: str = config["data"]["file_path"]
+        # A single CSV, or a list of CSVs with the same columns read as one table (e.g. a base
+        # extract plus the monthly extracts appended in incremental mode)
+        self.file_path: Union[str, List[str]] = config["data"]["file_path"]
         self.drop_columns: List[str] = config["data"].get("drop_columns", [])
         self.target_column: str = config["data"]["target_column"]
         self.target_mapping: Dict = config["data"].get("target_mapping", {})
+        self.schema: Dict = config["data"].get("schema", {})
+
+    def read_csv_kwargs(self, chunked: bool = False) -> Dict:
+        """
+        pd.read_csv arguments from `data.schema`: explicit dtypes (e.g. "category" for
+        low-cardinality strings), usecols and na_values, so nothing is type-inferred.
+        engine "pyarrow" is used when installed and not reading in chunks.
+        """
+        kwargs: Dict = {}
+        if self.schema.get("dtypes"):
+            kwargs["dtype"] = dict(self.schema["dtypes"])
+        if self.schema.get("usecols"):
+            kwargs["usecols"] = list(self.schema["usecols"])
+        if self.schema.get("na_values"):
+            kwargs["na_values"] = list(self.schema["na_values"])
+        engine = self.schema.get("engine", "c")
+        if engine == "pyarrow":
+            if chunked:
+                logging.info("pyarrow CSV engine does not support chunksize; using the C engine for chunked reads.")
+            elif importlib.util.find_spec("pyarrow") is None:
+                logging.warning("data.schema.engine is 'pyarrow' but pyarrow is not installed; using the C engine.")
+            else:
+                kwargs["engine"] = "pyarrow"
+        return kwargs
+
+    @property
+    def file_paths(self) -> List[str]:
+        return list(self.file_path) if isinstance(self.file_path, (list, tuple)) else [self.file_path]
 
     def load_data(self) -> pd.DataFrame:
-        try:
-            df = pd.read_csv(self.file_path)
-            logging.info(f"Loaded data from {self.file_path} with shape {df.shape}")
-            return df
-        except Exception as e:
-            logging.exception(f"Failed to load data from {self.file_path}")
-            raise
-
-    def basic_clean(self, df: pd.DataFrame) -> pd.DataFrame:
-        
+        frames = []
+        for path in self.file_paths:
+            try:
+                frames.append(pd.read_csv(path, **self.read_csv_kwargs()))
+            except Exception as e:
+                logging.exception(f"Failed to load data from {path}")
+                raise
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        logging.info(f"Loaded data from {self.file_path} with shape {df.shape}")
+        return df
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Stream the CSV in bounded-size batches instead of one read of the whole file."""
+        for path in self.file_paths:
+            try:
+                reader = pd.read_csv(path, chunksize=chunk_size, **self.read_csv_kwargs(chunked=True))
+            except Exception:
+                logging.exception(f"Failed to open {path} for chunked reading")
+                raise
+            with reader:
+                for chunk in reader:
+                    yield chunk
+
+    def basic_clean(self, df: pd.DataFrame, require_target: bool = True) -> pd.DataFrame:
+        """require_target=False lets unlabeled rows (e.g. scoring requests) through without a target column."""
         for col in self.drop_columns:
             if col in df.columns:
                 df.drop(col, axis=1, inplace=True)
@@ -40,7 +86,7 @@ class DataIngestion:
                         f"First few problematic values: {nan_examples}"
                     )
                 logging.info(f"Mapped target column '{self.target_column}' using provided mapping.")
-            else:
+            elif require_target:
                 raise KeyError(f"Target column '{self.target_column}' not found in data.")
         return df
 
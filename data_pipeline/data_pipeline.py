@@ -1,84 +1,383 @@
 from __future__ import annotations
 import logging
-from typing import Dict
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 import pandas as pd
-from scipy import sparse
 
 from data_pipeline.data_ingestion import DataIngestion
 from data_pipeline.handle_missing_values import MissingValueHandler
-from data_pipeline.feature_binning import FeatureBinning
-from data_pipeline.feature_engineering import FeatureEngineering
+from data_pipeline.feature_engine import FeatureEngine
 from data_pipeline.data_splitter import DataSplitter
-from data_pipeline.feature_encoding import PreprocessorFactory
 from data_pipeline.imbalance_handler import ImbalanceHandler
 from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.compiled_transformer import CompiledPreprocessor
+from data_pipeline.stage_cache import StageCache
+from data_pipeline.stage_profiler import StageProfiler
+from data_pipeline.stage_scheduler import StageScheduler
+from data_pipeline.drift_monitor import DriftMonitor
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
+
+class Stage:
+    def __init__(self, name: str, inputs: List[str], outputs: List[str],
+                 config_slice: Callable[[], Any], fn: Callable[..., Dict[str, Any]], cacheable: bool = True):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.config_slice = config_slice
+        self.fn = fn
+        self.cacheable = cacheable
 
 class DataPipeline:
     def __init__(self, config: Dict):
         self.config = config
+        self.profiler = StageProfiler(enabled=False)
 
-    def run(self) -> None:
-      
+    def _backend(self) -> str:
+        """execution.backend, falling back to pandas when polars is not installed."""
+        backend = self.config.get("execution", {}).get("backend", "pandas")
+        if backend == "polars":
+            from data_pipeline.polars_backend import PolarsFeaturePlan
+            if not PolarsFeaturePlan.available():
+                logging.warning("execution.backend is 'polars' but polars is not installed; using pandas.")
+                return "pandas"
+        return backend
+
+    # ---- stages -----------------------------------------------------------
+    def _clean(self) -> Dict[str, Any]:
+        if self._backend() == "polars":
+            # One lazy query for load, clean, impute and the derived features; `features` passes it through
+            from data_pipeline.polars_backend import PolarsFeaturePlan
+            df, fill_values = PolarsFeaturePlan(self.config).run()
+            return {"clean_df": df, "fill_values": fill_values}
         ingestion = DataIngestion(self.config)
         df = ingestion.load_data()
         df = ingestion.basic_clean(df)
 
-        
         mv = MissingValueHandler(
             strategy=self.config["preprocessing"]["missing_value_strategy"],
             numeric_to_coerce=self.config["preprocessing"].get("numeric_to_coerce", []),
         )
         df = mv.coerce_and_impute(df)
+        # Training imputation values, persisted so scoring fills gaps the same way
+        return {"clean_df": df, "fill_values": {c: float(v) for c, v in mv.fill_values_.items()}}
 
-     
-        bin_conf = self.config["preprocessing"]["binning"]
-        df = FeatureBinning(bin_conf["tenure_bins"], bin_conf["tenure_labels"]).add_tenure_category(df)
-
-        fe = FeatureEngineering(
-            service_cols=self.config["preprocessing"]["service_columns"],
-            autopay_keywords=self.config["preprocessing"]["autopay_keywords"],
-        )
-        df = fe.add_features(df)
-
+    def _features(self, clean_df: pd.DataFrame) -> Dict[str, Any]:
+        if self._backend() == "polars":
+            return {"features_df": clean_df}
+        # Tenure binning + derived features (legacy classes or the declarative FeatureEngine)
+        return {"features_df": FeatureEngine.stage_for(self.config)(clean_df)}
 
+    def _split(self, features_df: pd.DataFrame) -> Dict[str, Any]:
         target = self.config["data"]["target_column"]
-        X = df.drop(columns=[target])
-        y = df[target]
+        X = features_df.drop(columns=[target])
+        y = features_df[target]
         X_train, X_test, y_train, y_test = DataSplitter.split(
             X, y,
             test_size=self.config["preprocessing"]["test_size"],
             random_state=self.config["preprocessing"]["random_state"],
         )
+        return {"X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test}
 
-      
-        numeric_features = list(X.select_dtypes(include=["int64", "float64"]).columns)
-        categorical_features = list(X.select_dtypes(include=["object", "category"]).columns)
+    def _encode(self, X_train: pd.DataFrame) -> Dict[str, Any]:
+        numeric_features = list(X_train.select_dtypes(include=["int64", "float64"]).columns)
+        categorical_features = list(X_train.select_dtypes(include=["object", "category"]).columns)
+        # sklearn is imported by the first encode, not with the pipeline module
+        from data_pipeline.feature_encoding import PreprocessorFactory
         preprocessor = PreprocessorFactory.create(numeric_features, categorical_features, self.config)
+        X_train_proc = self._output_layout(preprocessor.fit_transform(X_train))
+        feature_names = PreprocessorFactory.get_feature_names(preprocessor, numeric_features, categorical_features)
+        return {"X_train_proc": X_train_proc, "preprocessor": preprocessor, "feature_names": feature_names}
 
-        X_train_proc = preprocessor.fit_transform(X_train)
-        X_test_proc = preprocessor.transform(X_test)
+    def _encode_test(self, preprocessor, X_test: pd.DataFrame) -> Dict[str, Any]:
+        # Separate stage so the test transform can overlap with resampling the train set
+        if self.config["preprocessing"].get("sparse", False):
+            return {"X_test_proc": self._output_layout(preprocessor.transform(X_test))}
+        # Dense: CompiledPreprocessor writes every block into one preallocated matrix (same values),
+        # where ColumnTransformer allocates each block and then a stacked copy of them
+        return {"X_test_proc": self._output_layout(CompiledPreprocessor.from_fitted(preprocessor).transform(X_test))}
 
+    def _output_layout(self, X_proc):
+        if self.config["preprocessing"].get("sparse", False):
+            # Keep CSR end to end; only encoders that are inherently dense (label) return arrays
+            return sparse.csr_matrix(X_proc) if sparse.issparse(X_proc) else X_proc
+        return X_proc.toarray() if sparse.issparse(X_proc) else X_proc
 
-        if sparse.issparse(X_train_proc):
-            X_train_proc = X_train_proc.toarray()
-        if sparse.issparse(X_test_proc):
-            X_test_proc = X_test_proc.toarray()
+    def _resample(self, X_train_proc, y_train) -> Dict[str, Any]:
+        class_weights = None
+        if ImbalanceHandler.strategy_for(self.config) != "none":
+            handler = ImbalanceHandler.from_config(self.config)
+            X_train_proc, y_train = handler.fit_resample(X_train_proc, y_train)
+            class_weights = handler.class_weights_
+        return {"X_train_final": X_train_proc, "y_train_final": y_train, "class_weights": class_weights}
 
-        
-        if self.config["preprocessing"].get("smote", False):
-            smote = ImbalanceHandler(random_state=self.config["preprocessing"]["random_state"])
-            X_train_proc, y_train = smote.fit_resample(X_train_proc, y_train)
+    # ---- save stages (side effects only; each returns the paths it wrote) -
+    def _x_dtype(self):
+        return np.float32 if self.config["artifacts"].get("float32", False) else None
 
-   
-        feature_names = PreprocessorFactory.get_feature_names(preprocessor, numeric_features, categorical_features)
+    def _save_pair(self, x_key: str, y_key: str, X, y) -> List[str]:
+        art = self.config["artifacts"]
+        x_dtype = self._x_dtype()
+        y = y.values if hasattr(y, "values") else y
+        if art.get("format", "npz") == "npy":
+            ArtifactSaver.save_mmap(art[x_key], X, x_dtype)
+            ArtifactSaver.save_mmap(art[y_key], y)
+        else:
+            ArtifactSaver.save_matrix(art[x_key], X.astype(x_dtype) if x_dtype is not None else X)
+            ArtifactSaver.save_npz(art[y_key], y)
+        return [art[x_key], art[y_key]]
+
+    def _save_train(self, X_train_final, y_train_final) -> Dict[str, Any]:
+        return {"saved_train": self._save_pair("x_train", "y_train", X_train_final, y_train_final)}
+
+    def _save_test(self, X_test_proc, y_test) -> Dict[str, Any]:
+        return {"saved_test": self._save_pair("x_test", "y_test", X_test_proc, y_test)}
+
+    def _save_preprocessor(self, preprocessor, feature_names: List[str]) -> Dict[str, Any]:
+        art = self.config["artifacts"]
+        ArtifactSaver.save_npy(art["feature_names"], np.array(feature_names, dtype=object))
+        ArtifactSaver.save_preprocessor(art["preprocessor"], preprocessor)
+        written = [art["feature_names"], art["preprocessor"]]
+        if art.get("compiled_preprocessor"):
+            CompiledPreprocessor.from_fitted(preprocessor).save(art["compiled_preprocessor"])
+            written.append(art["compiled_preprocessor"])
+        return {"saved_preprocessor": written}
+
+    def _save_metadata(self, fill_values: Dict[str, float], class_weights, X_train: pd.DataFrame) -> Dict[str, Any]:
+        art = self.config["artifacts"]
+        written = [ArtifactSaver.fill_values_path(art), ArtifactSaver.train_profile_path(art)]
+        ArtifactSaver.save_json(written[0], fill_values)
+        # Reference statistics for incremental-mode drift checks
+        ArtifactSaver.save_json(written[1], DriftMonitor.profile(X_train))
+        if class_weights is not None:
+            written.append(ArtifactSaver.class_weights_path(art))
+            ArtifactSaver.save_json(written[-1], {str(c): w for c, w in class_weights.items()})
+        return {"saved_metadata": written}
+
+    def _save_manifest(self, saved_train: List[str], saved_test: List[str], feature_names: List[str]) -> Dict[str, Any]:
+        if self.config["artifacts"].get("format", "npz") != "npy":
+            return {"saved_manifest": []}
+        path = ArtifactSaver.write_manifest(self.config, ["x_train", "y_train", "x_test", "y_test"], feature_names)
+        return {"saved_manifest": [path]}
+
+    def _stages(self) -> List[Stage]:
+        data = self.config["data"]
+        prep = self.config["preprocessing"]
+        features_slice = lambda: {"features": self.config.get("features", {}), "binning": prep["binning"],
+                                  "service_columns": prep["service_columns"], "autopay_keywords": prep["autopay_keywords"]}
+        return [
+            # With the polars backend clean_df already carries the features, so they are part of its key
+            Stage("clean", [], ["clean_df", "fill_values"],
+                  lambda: {"data": {k: v for k, v in data.items() if k != "file_path"},
+                           "missing_value_strategy": prep["missing_value_strategy"],
+                           "numeric_to_coerce": prep.get("numeric_to_coerce", []),
+                           **({"backend": "polars", **features_slice()} if self._backend() == "polars" else {})},
+                  self._clean),
+            Stage("features", ["clean_df"], ["features_df"], features_slice, self._features),
+            Stage("split", ["features_df"], ["X_train", "X_test", "y_train", "y_test"],
+                  lambda: {"target": data["target_column"], "test_size": prep["test_size"],
+                           "random_state": prep["random_state"]},
+                  self._split),
+            Stage("encode", ["X_train"], ["X_train_proc", "preprocessor", "feature_names"],
+                  lambda: {"encoding": prep["encoding"], "scaling": prep["scaling"], "sparse": prep.get("sparse", False),
+                           # onehot_topk/hashing options live in the section named after the encoding
+                           **({"options": prep[prep["encoding"]]} if isinstance(prep.get(prep["encoding"]), dict) else {})},
+                  self._encode),
+            Stage("encode_test", ["preprocessor", "X_test"], ["X_test_proc"], lambda: {}, self._encode_test),
+            # Without resampling the stage is a passthrough, so caching it would only duplicate the encode entry
+            Stage("resample", ["X_train_proc", "y_train"], ["X_train_final", "y_train_final", "class_weights"],
+                  lambda: {"strategy": ImbalanceHandler.strategy_for(self.config), "random_state": prep["random_state"],
+                           "resampling": prep.get("resampling", {})},
+                  self._resample,
+                  cacheable=ImbalanceHandler.strategy_for(self.config) in ("smote", "random_oversample")),
+            Stage("save_train", ["X_train_final", "y_train_final"], ["saved_train"], lambda: {}, self._save_train,
+                  cacheable=False),
+            Stage("save_test", ["X_test_proc", "y_test"], ["saved_test"], lambda: {}, self._save_test, cacheable=False),
+            Stage("save_preprocessor", ["preprocessor", "feature_names"], ["saved_preprocessor"], lambda: {},
+                  self._save_preprocessor, cacheable=False),
+            Stage("save_metadata", ["fill_values", "class_weights", "X_train"], ["saved_metadata"], lambda: {},
+                  self._save_metadata, cacheable=False),
+            Stage("save_manifest", ["saved_train", "saved_test", "feature_names"], ["saved_manifest"], lambda: {},
+                  self._save_manifest, cacheable=False),
+        ]
+
+    SAVE_OUTPUTS = ["saved_train", "saved_test", "saved_preprocessor", "saved_metadata", "saved_manifest"]
+
+    def stage_names(self) -> List[str]:
+        return [s.name for s in self._stages()]
+
+    def stage_keys(self, file_digest: Callable[[str], str]) -> Dict[str, str]:
+        """Content key of every stage: its config slice plus the keys of the stages it reads from."""
+        stages = self._stages()
+        producer = {out: s for s in stages for out in s.outputs}
+        keys: Dict[str, str] = {}
+
+        def key_of(stage: Stage) -> str:
+            if stage.name not in keys:
+                upstream = sorted({key_of(producer[i]) for i in stage.inputs})
+                if not stage.inputs:
+                    upstream = [file_digest(path) for path in DataIngestion(self.config).file_paths]
+                keys[stage.name] = StageCache.key(stage.name, stage.config_slice(), upstream)
+            return keys[stage.name]
+
+        for stage in stages:
+            key_of(stage)
+        return keys
+
+    # ---- execution --------------------------------------------------------
+    def _resolve(self, names: List[str], scheduler: Optional[StageScheduler] = None,
+                 values: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Materialise the named values, computing or loading only the stages they depend on.
+        Stages whose inputs are ready run concurrently on the scheduler's pool; a stage with
+        a cache entry is loaded without visiting anything upstream of it (unless use_cache is
+        False, which also skips writing entries). `values` holds already computed stage
+        outputs (e.g. shared by a sweep); stages they cover are skipped.
+        """
+        own_scheduler = scheduler is None
+        scheduler = scheduler or StageScheduler.from_config(self.config)
+        stages = {s.name: s for s in self._stages()}
+        producer = {out: s for s in stages.values() for out in s.outputs}
+        cache: Optional[StageCache] = StageCache.from_config(self.config) if use_cache else None
+        keys = self.stage_keys(cache.file_digest) if cache is not None else {}
+        values = dict(values or {})
+        lock = threading.Lock()
+        # Planned stages still to read each value; intermediates are dropped once the count reaches 0
+        readers: Dict[str, int] = {}
+        planned: set = set()
+
+        def key_of(stage: Stage) -> str:
+            return keys[stage.name]
+
+        def plan(targets: List[str]) -> Dict[str, List[str]]:
+            """Stage -> stages it waits for, pruned above stages that will come from the cache."""
+            graph: Dict[str, List[str]] = {}
+
+            def visit(stage: Stage) -> None:
+                if stage.name in graph or all(out in values for out in stage.outputs):
+                    return
+                if cache is not None and stage.cacheable and cache.contains(stage.name, key_of(stage)):
+                    graph[stage.name] = []
+                    return
+                deps = sorted({producer[i].name for i in stage.inputs if i not in values})
+                graph[stage.name] = deps
+                for dep in deps:
+                    visit(stages[dep])
+
+            for name in targets:
+                visit(producer[name])
+            return graph
+
+        def run_stage(name: str) -> None:
+            stage = stages[name]
+            use_cache = cache is not None and stage.cacheable
+            if use_cache:
+                with self.profiler.stage(stage.name, cache="hit") as record:
+                    hit = cache.load(stage.name, key_of(stage))
+                    record["outputs"] = StageProfiler.shapes(hit)
+                    record["discard"] = hit is None
+                if hit is not None:
+                    logging.info(f"Stage '{stage.name}' loaded from cache.")
+                    with lock:
+                        values.update(hit)
+                    return
+            missing = [i for i in stage.inputs if i not in values]
+            if missing:
+                # Planned as a cache hit but the entry was evicted or unreadable: compute upstream now
+                execute(missing)
+            inputs = {i: values[i] for i in stage.inputs}
+            with self.profiler.stage(stage.name, inputs, cache="miss" if use_cache else "off") as record:
+                outputs = scheduler.call(stage.fn, **inputs)
+                record["outputs"] = StageProfiler.shapes(outputs)
+                if use_cache:
+                    start = time.perf_counter()
+                    cache.save(stage.name, key_of(stage), outputs)
+                    record["cache_save_s"] = time.perf_counter() - start
+            with lock:
+                values.update(outputs)
+
+        def release(stage: Stage) -> None:
+            if stage.name not in planned:
+                return
+            with lock:
+                for i in stage.inputs:
+                    readers[i] -= 1
+                    if readers[i] == 0 and i not in names:
+                        values.pop(i, None)
+
+        def execute(targets: List[str]) -> None:
+            scheduler.run(plan(targets), run_stage)
+
+        def run_and_release(name: str) -> None:
+            run_stage(name)
+            release(stages[name])
+
+        try:
+            graph = plan(names)
+            planned.update(graph)
+            for name in graph:
+                for i in stages[name].inputs:
+                    readers[i] = readers.get(i, 0) + 1
+            scheduler.run(graph, run_and_release)
+        finally:
+            if own_scheduler:
+                scheduler.shutdown()
+        return {name: values[name] for name in names}
+
+    def run_stage(self, name: str) -> Dict[str, Any]:
+        """Run one stage (plus whatever it needs that is not cached) and return its outputs."""
+        stages = {s.name: s for s in self._stages()}
+        if name not in stages:
+            raise ValueError(f"Unknown stage '{name}'. Stages: {list(stages)}")
+        self.profiler = StageProfiler.from_config(self.config)
+        out = self._resolve(stages[name].outputs)
+        self.profiler.write(mode="stage", stage=name, config_hash=ArtifactSaver.config_hash(self.config))
+        return out
 
-        ArtifactSaver.save_npz(self.config["artifacts"]["x_train"], X_train_proc)
-        ArtifactSaver.save_npz(self.config["artifacts"]["y_train"], y_train.values if hasattr(y_train, 'values') else y_train)
-        ArtifactSaver.save_npz(self.config["artifacts"]["x_test"], X_test_proc)
-        ArtifactSaver.save_npz(self.config["artifacts"]["y_test"], y_test.values if hasattr(y_test, 'values') else y_test)
+    def run_in_memory(self, use_cache: bool = False, write_report: bool = False) -> Dict[str, Any]:
+        """
+        The in-memory pipeline without the save stages: the processed (and
+        resampled) train matrix, the test matrix, labels as arrays, feature
+        names, the fitted preprocessor, fill values and class weights, as
+        run() would write them (before the float32 cast). Intermediate frames
+        are released as soon as the last stage reading them has run.
 
-        ArtifactSaver.save_npy(self.config["artifacts"]["feature_names"], np.array(feature_names, dtype=object))
-        ArtifactSaver.save_preprocessor(self.config["artifacts"]["preprocessor"], preprocessor)
+        Nothing is written to disk unless asked for: use_cache reads and writes
+        the stage cache (`cache` section), write_report writes the
+        instrumentation run report when it is enabled.
+        """
+        self.profiler = StageProfiler.from_config(self.config) if write_report else StageProfiler(enabled=False)
+        out = self._resolve(["X_train_final", "y_train_final", "X_test_proc", "y_test", "feature_names",
+                             "preprocessor", "fill_values", "class_weights"], use_cache=use_cache)
+        self.profiler.write(mode="in_memory_api", config_hash=ArtifactSaver.config_hash(self.config))
+        return {
+            "X_train": out["X_train_final"],
+            # Views of the label Series' buffers, not copies
+            "y_train": np.asarray(out["y_train_final"]),
+            "X_test": out["X_test_proc"],
+            "y_test": np.asarray(out["y_test"]),
+            "feature_names": out["feature_names"],
+            "preprocessor": out["preprocessor"],
+            "fill_values": out["fill_values"],
+            "class_weights": out["class_weights"],
+        }
 
-        logging.info("Data pipeline completed successfully.")
+    def run(self, values: Optional[Dict[str, Any]] = None) -> None:
+        # Fresh per-run measurements; written to instrumentation.report when enabled
+        self.profiler = StageProfiler.from_config(self.config)
+        mode = self.config.get("execution", {}).get("mode", "in_memory")
+        if mode == "chunked":
+            from data_pipeline.chunked_pipeline import ChunkedDataPipeline
+            ChunkedDataPipeline(self.config, self.profiler).run()
+        else:
+            self._resolve(self.SAVE_OUTPUTS, values=values)
+            logging.info("Data pipeline completed successfully.")
+        # Fresh artifacts: extracts appended to the previous ones no longer apply
+        state_path = ArtifactSaver.incremental_state_path(self.config["artifacts"])
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        self.profiler.write(mode=mode, config_hash=ArtifactSaver.config_hash(self.config))
@@ -1,10 +1,32 @@
 from __future__ import annotations
-from typing import Tuple
-from sklearn.model_selection import train_test_split
+from typing import List, Tuple
+import numpy as np
 import pandas as pd
 
+from data_pipeline.lazy_module import LazyModule
+
+model_selection = LazyModule("sklearn.model_selection")
+
 class DataSplitter:
     @staticmethod
-    def split(X: pd.DataFrame, y, test_size: float, random_state: int):
-        return train_test_split(
-            X, y, test_size=test_size, stratify=y, random_state=random_state)
+    def split(X: pd.DataFrame, y, test_size: float, random_state: int, stratify: bool = True):
+        return model_selection.train_test_split(
+            X, y, test_size=test_size, stratify=y if stratify else None, random_state=random_state)
+
+    @staticmethod
+    def split_or_fallback(X: pd.DataFrame, y, test_size: float, random_state: int):
+        """Stratified split, falling back to unstratified and then to all-train for small or single-class batches."""
+        try:
+            return DataSplitter.split(X, y, test_size=test_size, random_state=random_state)
+        except ValueError:
+            pass
+        try:
+            return DataSplitter.split(X, y, test_size=test_size, random_state=random_state, stratify=False)
+        except ValueError:
+            return X, X.iloc[:0], y, y.iloc[:0]
+
+    @staticmethod
+    def folds(y, n_splits: int, random_state: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Stratified (train_idx, val_idx) positions for cross-validation, shuffled with the split seed."""
+        skf = model_selection.StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        return list(skf.split(np.zeros(len(y)), y))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from data_pipeline.batch_profiler import BatchProfiler
+
+class DriftMonitor:
+    """
+    Compares a new batch of feature rows with the training data the preprocessor
+    was fitted on.
+
+    The training side is a small JSON profile (count, mean and sum of squared
+    deviations per numeric feature, so profiles of chunks can be merged) written
+    next to the preprocessor at fit time. A batch is scored by its largest
+    standardised mean shift |mean_new - mean_train| / std_train and by the
+    share of rows holding a category the fitted encoder has never seen.
+
+    Profiles also carry a BatchProfiler ("sketches": quantile sketches and
+    frequency tables, mergeable like the moments); when the training profile
+    has one, every column's population stability index is reported and the
+    largest is checked against max_psi.
+    """
+    def __init__(self, max_mean_shift: float = 0.5, max_new_category_rate: float = 0.01, max_psi: float = 0.25):
+        self.max_mean_shift = max_mean_shift
+        self.max_new_category_rate = max_new_category_rate
+        self.max_psi = max_psi
+
+    @staticmethod
+    def from_config(config: Dict) -> "DriftMonitor":
+        conf = config.get("incremental", {})
+        return DriftMonitor(
+            max_mean_shift=float(conf.get("max_mean_shift", 0.5)),
+            max_new_category_rate=float(conf.get("max_new_category_rate", 0.01)),
+            max_psi=float(conf.get("max_psi", 0.25)),
+        )
+
+    # ---- training profile -------------------------------------------------
+    @staticmethod
+    def profile(X: pd.DataFrame) -> Dict[str, Any]:
+        numeric = X.select_dtypes(include=["int64", "float64"])
+        stats = {}
+        for col in numeric.columns:
+            values = numeric[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            stats[col] = {"count": int(len(values)), "mean": float(values.mean()) if len(values) else 0.0,
+                          "m2": float(((values - values.mean()) ** 2).sum()) if len(values) else 0.0}
+        return {"rows": int(len(X)), "numeric": stats, "sketches": BatchProfiler().update(X).to_dict()}
+
+    @staticmethod
+    def merge(a: Optional[Dict[str, Any]], b: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine two profiles (Chan et al. parallel mean/variance), e.g. across chunks."""
+        if a is None:
+            return b
+        numeric = {}
+        for col in a["numeric"].keys() | b["numeric"].keys():
+            x, y = a["numeric"].get(col), b["numeric"].get(col)
+            if x is None or y is None:
+                numeric[col] = x or y
+                continue
+            n = x["count"] + y["count"]
+            delta = y["mean"] - x["mean"]
+            mean = x["mean"] + delta * y["count"] / n if n else 0.0
+            m2 = x["m2"] + y["m2"] + delta ** 2 * x["count"] * y["count"] / n if n else 0.0
+            numeric[col] = {"count": n, "mean": mean, "m2": m2}
+        merged = {"rows": a["rows"] + b["rows"], "numeric": numeric}
+        if "sketches" in a and "sketches" in b:
+            merged["sketches"] = BatchProfiler.from_dict(a["sketches"]).merge(BatchProfiler.from_dict(b["sketches"])).to_dict()
+        return merged
+
+    @staticmethod
+    def std(stats: Dict[str, float]) -> float:
+        return float(np.sqrt(stats["m2"] / stats["count"])) if stats["count"] else 0.0
+
+    @staticmethod
+    def load(path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    # ---- checks -----------------------------------------------------------
+    @staticmethod
+    def encoder_categories(preprocessor) -> Dict[str, List[Any]]:
+        """Categories seen at fit time per categorical column of a fitted PreprocessorFactory transformer."""
+        for name, transformer, columns in preprocessor.transformers_:
+            if name != "cat":
+                continue
+            step = transformer.steps[-1][1] if hasattr(transformer, "steps") else transformer
+            encoder = getattr(step, "encoder", step)
+            # onehot_topk: every category seen in fit, not only the kept ones; hashing has no vocabulary
+            categories = getattr(encoder, "seen_categories_", getattr(encoder, "categories_", None))
+            if categories is None:
+                return {}
+            return {col: list(cats) for col, cats in zip(columns, categories)}
+        return {}
+
+    def check(self, X: pd.DataFrame, profile: Optional[Dict[str, Any]], categories: Dict[str, List[Any]]) -> Dict[str, Any]:
+        shifts: Dict[str, float] = {}
+        psi: Dict[str, float] = {}
+        if profile is None:
+            logging.warning("No training profile found; skipping the numeric drift check.")
+        else:
+            for col, stats in profile["numeric"].items():
+                if col not in X.columns or not len(X):
+                    continue
+                std = self.std(stats)
+                mean = float(pd.to_numeric(X[col], errors="coerce").mean())
+                shifts[col] = abs(mean - stats["mean"]) / std if std > 0 else (0.0 if mean == stats["mean"] else float("inf"))
+            if "sketches" in profile and len(X):
+                psi = BatchProfiler().update(X).psi(BatchProfiler.from_dict(profile["sketches"]))
+
+        unseen = np.zeros(len(X), dtype=bool)
+        unseen_by_col: Dict[str, int] = {}
+        for col, cats in categories.items():
+            if col not in X.columns:
+                continue
+            known = pd.Index([c for c in cats if not (isinstance(c, float) and np.isnan(c))])
+            values = X[col]
+            mask = ~values.isin(known).to_numpy() & values.notna().to_numpy()
+            if mask.any():
+                unseen_by_col[col] = int(mask.sum())
+            unseen |= mask
+
+        max_shift = max(shifts.values(), default=0.0)
+        new_rate = float(unseen.mean()) if len(X) else 0.0
+        max_psi = max(psi.values(), default=0.0)
+        return {
+            "rows": int(len(X)),
+            "max_mean_shift": max_shift,
+            "mean_shift": shifts,
+            "new_category_rate": new_rate,
+            "new_category_rows": unseen_by_col,
+            "max_psi": max_psi,
+            "psi": psi,
+            "exceeded": bool(max_shift > self.max_mean_shift or new_rate > self.max_new_category_rate
+                             or max_psi > self.max_psi),
+        }
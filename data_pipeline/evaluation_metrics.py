@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Dict
+import numpy as np
+
+# np.trapz was renamed np.trapezoid in NumPy 2.0 (and deprecated under its old name)
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+class BinaryMetrics:
+    """
+    Precision/Recall/F1 at every threshold, ROC-AUC and PR-AUC from one sort of
+    the scores.
+
+    Scores are sorted once, and true/false positive counts at each distinct
+    score come from cumulative sums, so all thresholds cost O(n log n) together
+    instead of one confusion matrix per threshold. ROC-AUC (trapezoidal, ties
+    counted half) and PR-AUC (average precision, step-wise) follow the
+    definitions of sklearn's roc_auc_score and average_precision_score. A row is
+    predicted positive when score >= threshold.
+    """
+    @staticmethod
+    def sweep(y_true, scores) -> Dict[str, np.ndarray]:
+        """Counts and rates at each distinct score, highest threshold first."""
+        y = np.asarray(y_true).astype(bool)
+        s = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(s, kind="mergesort")[::-1]
+        s, y = s[order], y[order]
+        # Last index of each run of equal scores: everything up to it is predicted positive
+        last = np.r_[np.flatnonzero(np.diff(s)), len(s) - 1]
+        tp = np.cumsum(y)[last]
+        fp = (last + 1) - tp
+        positives = int(y.sum())
+        precision = tp / (tp + fp)
+        recall = tp / positives if positives else np.zeros_like(tp, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        return {"thresholds": s[last], "tp": tp, "fp": fp, "positives": positives, "negatives": len(s) - positives,
+                "precision": precision, "recall": recall, "f1": f1}
+
+    @staticmethod
+    def roc_auc(curve: Dict[str, np.ndarray]) -> float:
+        if curve["positives"] == 0 or curve["negatives"] == 0:
+            return float("nan")
+        tpr = np.r_[0.0, curve["tp"] / curve["positives"]]
+        fpr = np.r_[0.0, curve["fp"] / curve["negatives"]]
+        return float(_trapezoid(tpr, fpr))
+
+    @staticmethod
+    def pr_auc(curve: Dict[str, np.ndarray]) -> float:
+        if curve["positives"] == 0:
+            return float("nan")
+        recall_steps = np.diff(np.r_[0.0, curve["recall"]])
+        return float(np.sum(recall_steps * curve["precision"]))
+
+    @staticmethod
+    def evaluate(y_true, scores, threshold: float = 0.5) -> Dict[str, float]:
+        curve = BinaryMetrics.sweep(y_true, scores)
+        # Thresholds are descending; the operating point is the lowest one still >= threshold
+        idx = np.searchsorted(-curve["thresholds"], -threshold, side="right") - 1
+        if idx >= 0:
+            precision, recall, f1 = (float(curve[m][idx]) for m in ("precision", "recall", "f1"))
+        else:
+            # No score reaches the threshold: nothing predicted positive
+            precision, recall, f1 = 0.0, 0.0, 0.0
+        best = int(np.argmax(curve["f1"]))
+        return {
+            "Precision": precision,
+            "Recall": recall,
+            "F1": f1,
+            "ROC_AUC": BinaryMetrics.roc_auc(curve),
+            "PR_AUC": BinaryMetrics.pr_auc(curve),
+            "best_F1": float(curve["f1"][best]),
+            "best_threshold": float(curve["thresholds"][best]),
+        }
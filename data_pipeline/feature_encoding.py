@@ -1,19 +1,25 @@
 from __future__ import annotations
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler, MinMaxScaler
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from data_pipeline.category_hasher import CategoryHasher
+
 class LabelEncodingTransformer(BaseEstimator, TransformerMixin):
     """
     A safe label/ordinal encoder for multiple categorical columns.
-    Uses OrdinalEncoder under the hood with unknowns -> -1, which emulates label encoding.
+    Uses OrdinalEncoder under the hood with unknowns and missing values -> -1, which
+    emulates label encoding (and keeps NaN out of the output, which SMOTE rejects).
     """
-    def __init__(self):
-        self.encoder = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)
+    def __init__(self, categories="auto"):
+        self.categories = categories
+        self.encoder = OrdinalEncoder(categories=categories, handle_unknown="use_encoded_value", unknown_value=-1,
+                                      encoded_missing_value=-1)
         self.columns_: List[str] = []
 
     def fit(self, X: pd.DataFrame, y=None):
@@ -25,6 +31,115 @@ class LabelEncodingTransformer(BaseEstimator, TransformerMixin):
         enc = self.encoder.transform(X[self.columns_])
         return enc
 
+def _one_per_row(n_rows: int, columns: np.ndarray, width: int, sparse_output: bool):
+    """Matrix with a 1 at (row, columns[row]), summed where several encoded columns share an output."""
+    rows = np.repeat(np.arange(n_rows), columns.shape[1]) if columns.ndim == 2 else np.arange(n_rows)
+    matrix = sparse.csr_matrix((np.ones(columns.size), (rows, columns.ravel())), shape=(n_rows, width))
+    matrix.sum_duplicates()
+    return matrix if sparse_output else matrix.toarray()
+
+class TopKOneHotEncoder(BaseEstimator, TransformerMixin):
+    """
+    One-hot encoding of each column's most frequent categories plus one "<column>_other"
+    output for everything else (rare categories, categories unseen at fit time and
+    missing values unless NaN is itself frequent). A column never takes more than
+    `max_categories` outputs, "other" included, whatever its cardinality.
+
+    Categories below `min_frequency` (a count, or a fraction of the rows when < 1)
+    go to "other" even when fewer than max_categories - 1 are kept. With explicit
+    `categories` (one list per column, e.g. chosen from counts streamed over chunks
+    with top_categories), those are the kept categories and fit only records columns.
+    """
+    def __init__(self, max_categories: int = 16, min_frequency: Optional[float] = None,
+                 categories: Union[str, List[List[Any]]] = "auto", sparse_output: bool = False):
+        self.max_categories = max_categories
+        self.min_frequency = min_frequency
+        self.categories = categories
+        self.sparse_output = sparse_output
+
+    @staticmethod
+    def top_categories(counts: Dict[Any, int], max_categories: int, min_frequency: Optional[float] = None,
+                       n_rows: Optional[int] = None) -> List[Any]:
+        """Most frequent categories, ties broken by value, keeping max_categories - 1 of them."""
+        if max_categories < 2:
+            raise ValueError("max_categories must be at least 2 (one kept category plus 'other')")
+        n_rows = n_rows if n_rows is not None else sum(counts.values())
+        floor = 0 if min_frequency is None else (min_frequency * n_rows if min_frequency < 1 else min_frequency)
+        ranked = sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0])))
+        return [value for value, count in ranked if count >= floor][:max_categories - 1]
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.columns_ = list(X.columns)
+        if isinstance(self.categories, str):
+            counts = [X[col].value_counts(dropna=False) for col in self.columns_]
+            # All categories seen at fit time (e.g. for drift checks), not only the kept ones
+            self.seen_categories_ = [list(c.index) for c in counts]
+            self.categories_ = [self.top_categories(dict(zip(c.index, c.to_numpy())), self.max_categories,
+                                                    self.min_frequency, len(X)) for c in counts]
+        else:
+            self.categories_ = [list(c)[:self.max_categories - 1] for c in self.categories]
+            self.seen_categories_ = [list(c) for c in self.categories]
+        self._offsets = np.cumsum([0] + [len(c) + 1 for c in self.categories_])
+        return self
+
+    def transform(self, X: pd.DataFrame):
+        columns = np.empty((len(X), len(self.columns_)), dtype=np.int64)
+        for j, col in enumerate(self.columns_):
+            codes = pd.Index(self.categories_[j], dtype=object).get_indexer(X[col].to_numpy(dtype=object))
+            # Not a kept category -> the column's "other" output, which follows the kept ones
+            columns[:, j] = self._offsets[j] + np.where(codes >= 0, codes, len(self.categories_[j]))
+        return _one_per_row(len(X), columns, int(self._offsets[-1]), self.sparse_output)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        names = []
+        for col, cats in zip(input_features if input_features is not None else self.columns_, self.categories_):
+            names += [f"{col}_{c}" for c in cats] + [f"{col}_other"]
+        return np.array(names, dtype=object)
+
+class HashingEncoder(BaseEstimator, TransformerMixin):
+    """
+    Hashing-trick encoder: every categorical column adds 1 to bucket
+    crc32("<column>=<value>") % n_features (CategoryHasher), so the output width is
+    `n_features` however many columns and categories there are, memory is fixed
+    up front and unseen categories need no vocabulary (collisions share a bucket).
+
+    fit only records, per bucket, the training tokens that land in it, which
+    get_feature_names_out uses to name the buckets, e.g. "hash_07(Contract=Two year,+2)".
+    """
+    def __init__(self, n_features: int = 64, sparse_output: bool = False):
+        self.n_features = n_features
+        self.sparse_output = sparse_output
+
+    def fit(self, X: pd.DataFrame, y=None):
+        if self.n_features < 1:
+            raise ValueError("n_features must be positive")
+        self.columns_ = list(X.columns)
+        tokens: List[Dict[str, int]] = [{} for _ in range(self.n_features)]
+        for col in self.columns_:
+            for value, count in X[col].value_counts(dropna=False).items():
+                bucket = CategoryHasher.bucket(col, value, self.n_features)
+                token = CategoryHasher.token(col, value)
+                tokens[bucket][token] = tokens[bucket].get(token, 0) + int(count)
+        # Most frequent first
+        self.bucket_tokens_ = [sorted(t, key=lambda k: (-t[k], k)) for t in tokens]
+        return self
+
+    def transform(self, X: pd.DataFrame):
+        columns = np.empty((len(X), len(self.columns_)), dtype=np.int64)
+        for j, col in enumerate(self.columns_):
+            columns[:, j] = CategoryHasher.buckets(col, X[col].to_numpy(dtype=object), self.n_features)
+        return _one_per_row(len(X), columns, self.n_features, self.sparse_output)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        width = len(str(self.n_features - 1))
+        names = []
+        for i, tokens in enumerate(self.bucket_tokens_):
+            name = f"hash_{i:0{width}d}"
+            if tokens:
+                name += f"({tokens[0]}" + (f",+{len(tokens) - 1}" if len(tokens) > 1 else "") + ")"
+            names.append(name)
+        return np.array(names, dtype=object)
+
 class PreprocessorFactory:
     @staticmethod
     def _scaler(kind: str):
@@ -33,22 +148,42 @@ class PreprocessorFactory:
         return StandardScaler()
 
     @staticmethod
-    def _categorical_transformer(kind: str):
+    def _categorical_transformer(kind: str, categories="auto", sparse_output: bool = False, options: Optional[Dict] = None):
+        options = options or {}
         if kind == "onehot":
-            # Return dense to make it compatible with later SMOTE
-            return Pipeline([("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=False))])
+            # Dense unless preprocessing.sparse is set (SMOTE accepts CSR as well)
+            return Pipeline([("encoder", OneHotEncoder(categories=categories, handle_unknown="ignore", sparse_output=sparse_output))])
+        elif kind == "onehot_topk":
+            return Pipeline([("encoder", TopKOneHotEncoder(max_categories=int(options.get("max_categories", 16)),
+                                                           min_frequency=options.get("min_frequency"),
+                                                           categories=categories, sparse_output=sparse_output))])
+        elif kind == "hashing":
+            # No vocabulary: explicit categories (chunked mode) are not needed
+            return Pipeline([("encoder", HashingEncoder(n_features=int(options.get("n_features", 64)), sparse_output=sparse_output))])
         elif kind in ("label", "ordinal"):
-            return Pipeline([("encoder", LabelEncodingTransformer())])
+            return Pipeline([("encoder", LabelEncodingTransformer(categories=categories))])
         else:
             raise ValueError(f"Unknown encoding kind: {kind}")
 
     @staticmethod
-    def create(numeric_features: List[str], categorical_features: List[str], config: Dict) -> ColumnTransformer:
+    def encoding_options(config: Dict) -> Dict:
+        """Options of the selected encoding, from the preprocessing section named after it (e.g. preprocessing.hashing)."""
+        prep = config["preprocessing"]
+        return dict(prep.get(prep["encoding"]) or {}) if prep["encoding"] in ("onehot_topk", "hashing") else {}
+
+    @staticmethod
+    def create(numeric_features: List[str], categorical_features: List[str], config: Dict, categories="auto") -> ColumnTransformer:
+        """
+        categories: "auto" to learn vocabularies in fit, or one list per categorical
+        feature when they were collected up front (e.g. in a chunked first pass).
+        """
         enc_kind = config["preprocessing"]["encoding"]
         sc_kind = config["preprocessing"]["scaling"]
+        sparse_output = bool(config["preprocessing"].get("sparse", False))
 
         numeric_transformer = Pipeline([("scaler", PreprocessorFactory._scaler(sc_kind))])
-        categorical_transformer = PreprocessorFactory._categorical_transformer(enc_kind)
+        categorical_transformer = PreprocessorFactory._categorical_transformer(
+            enc_kind, categories, sparse_output, PreprocessorFactory.encoding_options(config))
 
         preprocessor = ColumnTransformer(
             transformers=[
@@ -56,6 +191,8 @@ class PreprocessorFactory:
                 ("cat", categorical_transformer, categorical_features),
             ],
             remainder="drop",
+            # In sparse mode keep the stacked output CSR whatever its density
+            sparse_threshold=1.0 if sparse_output else 0.3,
         )
         return preprocessor
 
@@ -63,7 +200,7 @@ class PreprocessorFactory:
     def get_feature_names(preprocessor: ColumnTransformer, numeric_features: List[str], categorical_features: List[str]) -> List[str]:
         """Return output feature names depending on the encoder used."""
         cat_transformer = preprocessor.named_transformers_["cat"].named_steps["encoder"]
-        if isinstance(cat_transformer, OneHotEncoder):
+        if isinstance(cat_transformer, (OneHotEncoder, TopKOneHotEncoder, HashingEncoder)):
             cat_names = list(cat_transformer.get_feature_names_out(categorical_features))
         else:
             cat_names = list(categorical_features)
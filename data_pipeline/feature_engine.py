@@ -0,0 +1,121 @@
+from __future__ import annotations
+import re
+from typing import Any, Callable, Dict, List
+import numpy as np
+import pandas as pd
+
+from data_pipeline.feature_binning import FeatureBinning
+from data_pipeline.feature_engineering import FeatureEngineering
+
+class FeatureEngine:
+    """
+    Declarative, column-wise feature derivation. Each spec in `features.derived`
+    is a dict with a `name` (output column) and a `kind`:
+
+      count_matches: columns, value[, fill_missing]  -> number of columns equal to value
+      ratio:         numerator, denominator[, zero_denominator]
+      flag:          column, equals | contains_any[, case]
+      binning:       column, bins, labels[, right]
+
+    String predicates are evaluated once per distinct value (via the categorical
+    codes or pd.factorize) and broadcast back with NumPy, so cost per row is a
+    gather rather than a Python call. Specs whose source column is absent are
+    skipped, like the hard-coded FeatureBinning/FeatureEngineering stages.
+    """
+    KINDS = ("count_matches", "ratio", "flag", "binning")
+
+    def __init__(self, specs: List[Dict[str, Any]]):
+        for spec in specs:
+            if spec.get("kind") not in self.KINDS:
+                raise ValueError(f"Unknown feature kind '{spec.get('kind')}' for feature '{spec.get('name')}'")
+        self.specs = specs
+
+    @staticmethod
+    def default_specs(prep: Dict) -> List[Dict[str, Any]]:
+        """Specs equivalent to FeatureBinning.add_tenure_category + FeatureEngineering.add_features."""
+        return [
+            {"name": "TenureCategory", "kind": "binning", "column": "tenure",
+             "bins": prep["binning"]["tenure_bins"], "labels": prep["binning"]["tenure_labels"]},
+            {"name": "ServiceAdoptionScore", "kind": "count_matches",
+             "columns": prep["service_columns"], "value": "Yes", "fill_missing": "No"},
+            {"name": "AvgChargesPerService", "kind": "ratio",
+             "numerator": "MonthlyCharges", "denominator": "ServiceAdoptionScore", "zero_denominator": 1},
+            {"name": "IsElectronicCheck", "kind": "flag", "column": "PaymentMethod", "equals": "Electronic check"},
+            {"name": "IsAutoPay", "kind": "flag", "column": "PaymentMethod",
+             "contains_any": prep["autopay_keywords"], "case": False},
+        ]
+
+    @staticmethod
+    def from_config(config: Dict) -> "FeatureEngine":
+        specs = config.get("features", {}).get("derived")
+        return FeatureEngine(specs if specs else FeatureEngine.default_specs(config["preprocessing"]))
+
+    @staticmethod
+    def stage_for(config: Dict) -> Callable[[pd.DataFrame], pd.DataFrame]:
+        """Return the binning + feature-engineering step selected by `features.engine`."""
+        if config.get("features", {}).get("engine", "legacy") == "vectorized":
+            return FeatureEngine.from_config(config).transform
+        prep = config["preprocessing"]
+        binning = FeatureBinning(prep["binning"]["tenure_bins"], prep["binning"]["tenure_labels"])
+        fe = FeatureEngineering(service_cols=prep["service_columns"], autopay_keywords=prep["autopay_keywords"])
+        return lambda df: fe.add_features(binning.add_tenure_category(df))
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        for spec in self.specs:
+            getattr(self, f"_{spec['kind']}")(df, spec)
+        return df
+
+    @staticmethod
+    def _per_unique(series: pd.Series, predicate: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Evaluate a vectorised predicate on the distinct values and gather it back per row."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = np.asarray(series.cat.categories, dtype=object)
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            uniques = np.asarray(uniques, dtype=object)
+        # Extra trailing slot for missing values (code -1), which never match
+        lookup = np.append(predicate(uniques).astype(bool), False)
+        return lookup[codes]
+
+    def _count_matches(self, df: pd.DataFrame, spec: Dict) -> None:
+        value = spec["value"]
+        counts = np.zeros(len(df), dtype=np.int64)
+        for col in spec["columns"]:
+            if col not in df.columns:
+                if "fill_missing" not in spec:
+                    continue
+                df[col] = spec["fill_missing"]
+            counts += self._per_unique(df[col], lambda u: u == value)
+        df[spec["name"]] = counts
+
+    def _ratio(self, df: pd.DataFrame, spec: Dict) -> None:
+        if spec["numerator"] not in df.columns or spec["denominator"] not in df.columns:
+            return
+        denominator = df[spec["denominator"]].to_numpy(dtype=np.float64)
+        if "zero_denominator" in spec:
+            denominator = np.where(denominator == 0, spec["zero_denominator"], denominator)
+        df[spec["name"]] = df[spec["numerator"]].to_numpy(dtype=np.float64) / denominator
+
+    def _flag(self, df: pd.DataFrame, spec: Dict) -> None:
+        if spec["column"] not in df.columns:
+            return
+        if "equals" in spec:
+            target = spec["equals"]
+            predicate = lambda u: u == target
+        else:
+            flags = 0 if spec.get("case", True) else re.IGNORECASE
+            pattern = re.compile("|".join(spec["contains_any"]), flags)
+            predicate = lambda u: np.fromiter((pattern.search(str(v)) is not None for v in u), dtype=bool, count=len(u))
+        df[spec["name"]] = self._per_unique(df[spec["column"]], predicate).astype(np.int64)
+
+    def _binning(self, df: pd.DataFrame, spec: Dict) -> None:
+        if spec["column"] not in df.columns:
+            return
+        bins = np.asarray(spec["bins"], dtype=np.float64)
+        values = df[spec["column"]].to_numpy(dtype=np.float64, na_value=np.nan)
+        right = spec.get("right", False)
+        # right=False: bins[i] <= x < bins[i+1]; right=True: bins[i] < x <= bins[i+1]
+        codes = np.searchsorted(bins, values, side="left" if right else "right") - 1
+        codes[(codes < 0) | (codes >= len(bins) - 1) | np.isnan(values)] = -1
+        df[spec["name"]] = pd.Categorical.from_codes(codes, categories=spec["labels"], ordered=True)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+import logging
+from typing import Dict, Optional
+import pandas as pd
+
+from data_pipeline.data_ingestion import DataIngestion
+from data_pipeline.handle_missing_values import MissingValueHandler
+from data_pipeline.feature_engine import FeatureEngine
+
+class FeaturePreparer:
+    """
+    The row-wise stages of DataPipeline (basic_clean, numeric coercion, imputation
+    with fixed fill values, tenure binning and derived features) for data that
+    is not the full training set: chunks in chunked mode and scoring requests.
+    """
+    def __init__(self, config: Dict, fill_values: Optional[Dict[str, float]] = None):
+        prep = config["preprocessing"]
+        self.target: str = config["data"]["target_column"]
+        self.ingestion = DataIngestion(config)
+        self.mv = MissingValueHandler(
+            strategy=prep["missing_value_strategy"],
+            numeric_to_coerce=prep.get("numeric_to_coerce", []),
+        )
+        self.fill_values = fill_values
+        self.features = FeatureEngine.stage_for(config)
+
+    def transform(self, df: pd.DataFrame, require_target: bool = True) -> pd.DataFrame:
+        df = self.ingestion.basic_clean(df, require_target=require_target)
+        df = self.mv.coerce(df)
+        if self.fill_values is None:
+            logging.warning("No training fill values available; imputing from the batch itself.")
+            df = self.mv.coerce_and_impute(df)
+        else:
+            df = self.mv.impute(df, self.fill_values)
+        return self.features(df)
+
+    def features_only(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Prepare unlabeled rows and return just the model input columns."""
+        df = self.transform(df, require_target=False)
+        return df.drop(columns=[self.target]) if self.target in df.columns else df
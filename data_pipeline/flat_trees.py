@@ -0,0 +1,153 @@
+from __future__ import annotations
+from typing import Dict, Optional
+import numpy as np
+
+class FlatTreeEnsemble:
+    """
+    A tree ensemble as flat NumPy arrays, evaluated for a whole batch at once.
+
+    All trees share one node table: `feature` (-1 at leaves), `threshold`, `left`,
+    `right`, `missing_left` and the leaf `value`, with `roots` holding each tree's
+    first node. A row goes left when x <= threshold, or when x is NaN and
+    missing_left is set. Features are compared as float32 and thresholds are
+    stored as the largest float32 that keeps every original split decision
+    (sklearn's float64 `<=`, XGBoost's float32 `<`, CatBoost's `>` border).
+    Leaves point at themselves, so evaluation is `max_depth` rounds of one
+    gather over a (rows x trees) index matrix, with no per-row Python loop.
+
+    The margin is `base + scale * combine(leaf values)`, where combine is a sum
+    (boosting) or a mean (forests, single trees); link "logistic" turns the
+    margin into a probability. save()/load() use a plain .npz, so scoring needs
+    only numpy, not sklearn/xgboost/catboost.
+    """
+    FIELDS = ("feature", "threshold", "left", "right", "missing_left", "value", "roots")
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 missing_left: np.ndarray, value: np.ndarray, roots: np.ndarray, n_features: int,
+                 combine: str = "sum", base: float = 0.0, scale: float = 1.0, link: str = "identity",
+                 source: str = ""):
+        if combine not in ("sum", "mean") or link not in ("identity", "logistic"):
+            raise ValueError(f"Unsupported combine '{combine}' / link '{link}'")
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.n_features = int(n_features)
+        self.combine = combine
+        self.base = float(base)
+        self.scale = float(scale)
+        self.link = link
+        self.source = source
+        self.max_depth = self._max_depth()
+        # Evaluation tables: child of node i is children[2i + went_right]; leaves read feature 0
+        # (their children are themselves, so the extra rounds past a leaf are no-ops)
+        self._children = np.stack([self.left, self.right], axis=1).ravel()
+        self._feature = np.maximum(self.feature, 0)
+
+    def _max_depth(self) -> int:
+        depth, frontier = 0, self.roots.copy()
+        while True:
+            internal = frontier[self.feature[frontier] >= 0]
+            if not len(internal):
+                return depth
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+            depth += 1
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    # ---- evaluation -------------------------------------------------------
+    def leaves(self, X) -> np.ndarray:
+        """Leaf node reached in every tree, shape (n_rows, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        # One flat take() per array and round instead of 2-D fancy indexing
+        cells = X.ravel()
+        row_start = (np.arange(len(X), dtype=np.int64) * X.shape[1])[:, None]
+        has_nan = bool(np.isnan(cells).any())
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = cells.take(row_start + self._feature.take(node))
+            went_right = x > self.threshold.take(node)
+            if has_nan:
+                went_right = np.where(np.isnan(x), ~self.missing_left.take(node), went_right)
+            node = self._children.take(2 * node + went_right)
+        return node
+
+    def predict_margin(self, X, batch_size: int = 1 << 20) -> np.ndarray:
+        """Raw ensemble output; rows are processed in blocks of about `batch_size` (row x tree) cells."""
+        X = np.asarray(X)
+        step = max(1, batch_size // max(1, self.n_trees))
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), step):
+            values = self.value[self.leaves(X[start:start + step])]
+            combined = values.sum(axis=1) if self.combine == "sum" else values.mean(axis=1)
+            out[start:start + step] = self.base + self.scale * combined
+        return out
+
+    def predict_proba(self, X) -> np.ndarray:
+        margin = self.predict_margin(X)
+        p = 1.0 / (1.0 + np.exp(-margin)) if self.link == "logistic" else margin
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X, threshold: float = 0.5) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= threshold).astype(np.int64)
+
+    # ---- persistence ------------------------------------------------------
+    def save(self, path: str) -> None:
+        meta = np.array([self.combine, self.link, self.source])
+        np.savez(path, **{f: getattr(self, f) for f in self.FIELDS}, meta=meta,
+                 params=np.array([self.n_features, self.base, self.scale], dtype=np.float64))
+
+    @staticmethod
+    def load(path: str) -> "FlatTreeEnsemble":
+        with np.load(path, allow_pickle=False) as npz:
+            arrays: Dict[str, np.ndarray] = {f: npz[f] for f in FlatTreeEnsemble.FIELDS}
+            combine, link, source = (str(v) for v in npz["meta"])
+            n_features, base, scale = npz["params"]
+        return FlatTreeEnsemble(**arrays, n_features=int(n_features), combine=combine, base=float(base),
+                                scale=float(scale), link=link, source=source)
+
+    @staticmethod
+    def from_nodes(trees, n_features: int, **kwargs) -> "FlatTreeEnsemble":
+        """
+        Build from per-tree node arrays: an iterable of dicts with feature, threshold,
+        left, right, missing_left, value (tree-local child indices, -1 feature at leaves).
+        """
+        parts: Dict[str, list] = {f: [] for f in FlatTreeEnsemble.FIELDS}
+        offset = 0
+        for tree in trees:
+            n = len(tree["feature"])
+            leaf = np.asarray(tree["feature"]) < 0
+            own = np.arange(offset, offset + n)
+            parts["roots"].append(np.array([offset]))
+            for side in ("left", "right"):
+                parts[side].append(np.where(leaf, own, np.asarray(tree[side]) + offset))
+            for f in ("feature", "threshold", "missing_left", "value"):
+                parts[f].append(np.asarray(tree[f]))
+            offset += n
+        arrays = {f: np.concatenate(v) if v else np.empty(0) for f, v in parts.items()}
+        return FlatTreeEnsemble(**arrays, n_features=n_features, **kwargs)
+
+    @staticmethod
+    def float32_at_most(threshold, strict: bool = False) -> np.ndarray:
+        """
+        Largest float32 t with (x <= t) == (x <= threshold) for every float32 x, or with
+        (x <= t) == (x < threshold) when `strict`.
+        """
+        threshold = np.asarray(threshold, dtype=np.float64)
+        t = threshold.astype(np.float32)
+        # Rounding to float32 may have gone up past the original value
+        t = np.where(t.astype(np.float64) > threshold, np.nextafter(t, np.float32(-np.inf)), t)
+        if strict:
+            t = np.where(t.astype(np.float64) == threshold, np.nextafter(t, np.float32(-np.inf)), t)
+        return t.astype(np.float32)
+
+    def info(self) -> Dict[str, Optional[object]]:
+        return {"source": self.source, "n_trees": self.n_trees, "n_nodes": len(self.feature),
+                "max_depth": self.max_depth, "n_features": self.n_features, "combine": self.combine, "link": self.link}
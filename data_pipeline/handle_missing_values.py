@@ -1,12 +1,13 @@
 from __future__ import annotations
 import logging
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 class MissingValueHandler:
     def __init__(self, strategy: str, numeric_to_coerce: List[str]):
         self.strategy = strategy
         self.numeric_to_coerce = numeric_to_coerce
+        self.fill_values_: Dict[str, float] = {}
 
     def coerce_and_impute(self, df: pd.DataFrame) -> pd.DataFrame:
         
@@ -21,7 +22,24 @@ class MissingValueHandler:
                 fill_val = df[col].mean()
             else:
                 fill_val = df[col].mode().iloc[0]
+            self.fill_values_[col] = fill_val
             na_before = df[col].isna().sum()
             df[col] = df[col].fillna(fill_val)
             logging.info(f"Imputed {na_before} NaNs in '{col}' using {self.strategy}.")
         return df
+
+    def coerce(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Coerce the configured columns to numeric without imputing."""
+        for col in self.numeric_to_coerce:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        return df
+
+    def impute(self, df: pd.DataFrame, fill_values: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Fill NaNs with precomputed values (e.g. BatchProfiler.fill_values of a chunked pass)."""
+        fill_values = self.fill_values_ if fill_values is None else fill_values
+        for col, fill_val in fill_values.items():
+            if col in df.columns:
+                df[col] = df[col].fillna(fill_val)
+        return df
+
@@ -1,10 +1,111 @@
 from __future__ import annotations
-from typing import Tuple
-from imblearn.over_sampling import SMOTE
+import logging
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
+over_sampling = LazyModule("imblearn.over_sampling")
+class_weight = LazyModule("sklearn.utils.class_weight")
 
 class ImbalanceHandler:
-    def __init__(self, random_state: int = 42):
-        self.smote = SMOTE(random_state=random_state)
+    """
+    Class-imbalance treatment for the training split, selected by `strategy`:
+
+      smote:             SMOTE with a configurable NeighborSearch backend
+      random_oversample: duplicate minority rows (no neighbour search)
+      class_weight:      leave the data untouched and expose balanced
+                         `class_weights_` for the model to consume
+      none:              passthrough
+
+    `max_minority_samples` caps how many rows of each oversampled class SMOTE
+    uses as seeds and neighbour pool; the full original rows are still kept
+    and the same number of synthetic rows is generated.
+    """
+    STRATEGIES = ("smote", "random_oversample", "class_weight", "none")
+
+    def __init__(self, random_state: int = 42, strategy: str = "smote", k_neighbors: int = 5,
+                 knn_backend: str = "exact", n_jobs: Optional[int] = None, batch_size: int = 10_000,
+                 n_components: int = 16, max_minority_samples: Optional[int] = None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown resampling strategy '{strategy}'. Use one of {self.STRATEGIES}.")
+        self.random_state = random_state
+        self.strategy = strategy
+        self.max_minority_samples = max_minority_samples
+        self.class_weights_: Optional[Dict] = None
+        # sklearn estimator: imported with the first handler, not with this module
+        from data_pipeline.neighbor_search import NeighborSearch
+        self.neighbors = NeighborSearch(n_neighbors=k_neighbors + 1, backend=knn_backend, n_jobs=n_jobs,
+                                        batch_size=batch_size, n_components=n_components, random_state=random_state)
+        self.smote = over_sampling.SMOTE(random_state=random_state, k_neighbors=self.neighbors)
+
+    @staticmethod
+    def from_config(config: Dict) -> "ImbalanceHandler":
+        prep = config["preprocessing"]
+        conf = prep.get("resampling", {})
+        return ImbalanceHandler(
+            random_state=prep["random_state"],
+            strategy=conf.get("strategy", "smote"),
+            k_neighbors=int(conf.get("k_neighbors", 5)),
+            knn_backend=conf.get("knn_backend", "exact"),
+            n_jobs=conf.get("n_jobs"),
+            batch_size=int(conf.get("batch_size", 10_000)),
+            n_components=int(conf.get("n_components", 16)),
+            max_minority_samples=conf.get("max_minority_samples"),
+        )
+
+    @staticmethod
+    def strategy_for(config: Dict) -> str:
+        """Effective strategy: `preprocessing.smote` is the master switch, `resampling.strategy` the method."""
+        prep = config["preprocessing"]
+        if not prep.get("smote", False):
+            return "none"
+        return prep.get("resampling", {}).get("strategy", "smote")
+
+    @staticmethod
+    def balanced_weights(y) -> Dict:
+        classes = np.unique(y)
+        weights = class_weight.compute_class_weight("balanced", classes=classes, y=y)
+        return {c.item() if hasattr(c, "item") else c: float(w) for c, w in zip(classes, weights)}
 
     def fit_resample(self, X, y):
+        y_arr = np.asarray(y)
+        if self.strategy == "none":
+            return X, y
+        if self.strategy == "class_weight":
+            self.class_weights_ = self.balanced_weights(y_arr)
+            logging.info(f"Class weights (no resampling): {self.class_weights_}")
+            return X, y
+        if self.strategy == "random_oversample":
+            return over_sampling.RandomOverSampler(random_state=self.random_state).fit_resample(X, y)
+        if self.max_minority_samples is not None:
+            return self._capped_smote(X, y_arr)
         return self.smote.fit_resample(X, y)
+
+    def _capped_smote(self, X, y: np.ndarray) -> Tuple:
+        classes, counts = np.unique(y, return_counts=True)
+        target = counts.max()
+        rng = np.random.default_rng(self.random_state)
+        cap = int(self.max_minority_samples)
+        keep = np.ones(len(y), dtype=bool)
+        sampling: Dict = {}
+        for cls, count in zip(classes, counts):
+            if count == target:
+                continue
+            idx = np.flatnonzero(y == cls)
+            if count > cap:
+                keep[rng.choice(idx, size=count - cap, replace=False)] = False
+            # Ask for the synthetic rows the full class needs, seeded from the capped subset
+            sampling[cls] = min(count, cap) + (target - count)
+        if not sampling:
+            return X, y
+        X_fit = X[np.flatnonzero(keep)]
+        y_fit = y[keep]
+        smote = over_sampling.SMOTE(random_state=self.random_state, k_neighbors=self.neighbors, sampling_strategy=sampling)
+        X_res, y_res = smote.fit_resample(X_fit, y_fit)
+        # imblearn returns the input rows first, then the synthetic ones
+        X_new, y_new = X_res[len(y_fit):], y_res[len(y_fit):]
+        if sparse.issparse(X):
+            return sparse.vstack([X, X_new], format=X.format), np.concatenate([y, y_new])
+        return np.vstack([X, X_new]), np.concatenate([y, y_new])
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import copy
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+import joblib
+import numpy as np
+
+from data_pipeline.data_ingestion import DataIngestion
+from data_pipeline.feature_preparer import FeaturePreparer
+from data_pipeline.data_splitter import DataSplitter
+from data_pipeline.imbalance_handler import ImbalanceHandler
+from data_pipeline.drift_monitor import DriftMonitor
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.stage_cache import StageCache
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
+
+class IncrementalDataPipeline:
+    """
+    Adds a new customer extract to existing artifacts without refitting.
+
+    The extract goes through the same row-wise preparation as training (with the
+    saved fill values), is split with the configured test_size, transformed by the
+    persisted preprocessor and appended to X/y train/test. Appending needs
+    artifacts.format "npy", whose files grow in place, so the work per run scales
+    with the extract, not with the history (NPZ artifacts would be rewritten whole).
+    Before appending, the batch is checked against the training profile
+    (DriftMonitor); above the `incremental` thresholds, or with force_refit, the
+    full pipeline is rerun over every file seen so far instead. So is it when
+    training rows are resampled (SMOTE, random oversampling): raw rows appended
+    to a resampled train matrix would mix two class ratios. Processed extracts
+    are recorded by SHA-256 in incremental_state.json and skipped when offered again.
+    """
+    def __init__(self, config: Dict):
+        self.config = config
+        self.art = config["artifacts"]
+        if self.art.get("format", "npz") != "npy":
+            raise ValueError("Incremental appends need artifacts.format 'npy' (NPZ artifacts cannot grow without "
+                             "rewriting every stored row); set it and rerun the full pipeline once.")
+        self.monitor = DriftMonitor.from_config(config)
+        self.force_refit = bool(config.get("incremental", {}).get("force_refit", False))
+        self.resampled = ImbalanceHandler.strategy_for(config) in ("smote", "random_oversample")
+
+    # ---- state ------------------------------------------------------------
+    def _load_state(self) -> Dict[str, Any]:
+        path = ArtifactSaver.incremental_state_path(self.art)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                return json.load(f)
+        # First append after a full run: the configured input is what the preprocessor was fitted on
+        fitted_on = [{"path": os.path.abspath(p), "sha256": StageCache.sha256(p)}
+                     for p in DataIngestion(self.config).file_paths]
+        return {"fitted_on": fitted_on, "appended": [], "refits": []}
+
+    @staticmethod
+    def _files(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return state["fitted_on"] + state["appended"]
+
+    # ---- append -----------------------------------------------------------
+    def append(self, path: str) -> Dict[str, Any]:
+        """Append (or refit with) the extract at `path`; returns what was done and the drift check."""
+        state = self._load_state()
+        entry = {"path": os.path.abspath(path), "sha256": StageCache.sha256(path)}
+        if any(f["sha256"] == entry["sha256"] for f in self._files(state)):
+            logging.info(f"{path} was already processed; skipping.")
+            return {"action": "skipped", "path": path}
+
+        preprocessor = joblib.load(self.art["preprocessor"])
+        fill_path = ArtifactSaver.fill_values_path(self.art)
+        fill_values = None
+        if os.path.exists(fill_path):
+            with open(fill_path, "r") as f:
+                fill_values = json.load(f)
+
+        batch_config = {**self.config, "data": {**self.config["data"], "file_path": path}}
+        df = FeaturePreparer(self.config, fill_values).transform(DataIngestion(batch_config).load_data())
+        target = self.config["data"]["target_column"]
+        X, y = df.drop(columns=[target]), df[target]
+
+        drift = self.monitor.check(X, DriftMonitor.load(ArtifactSaver.train_profile_path(self.art)),
+                                   DriftMonitor.encoder_categories(preprocessor))
+        logging.info(f"Drift check for {path}: max mean shift {drift['max_mean_shift']:.3f}, "
+                     f"new-category rate {drift['new_category_rate']:.4f}")
+        if drift["exceeded"] or self.force_refit or self.resampled:
+            return self._refit(state, entry, drift)
+
+        prep = self.config["preprocessing"]
+        X_train, X_test, y_train, y_test = DataSplitter.split_or_fallback(
+            X, y, test_size=prep["test_size"], random_state=prep["random_state"] + len(state["appended"]) + 1)
+        for name, X_part, y_part in (("train", X_train, y_train), ("test", X_test, y_test)):
+            if not len(X_part):
+                continue
+            ArtifactSaver.append_matrix(self.art[f"x_{name}"], self._encode(preprocessor, X_part))
+            ArtifactSaver.append_matrix(self.art[f"y_{name}"], y_part.to_numpy())
+
+        feature_names = list(np.load(self.art["feature_names"], allow_pickle=True))
+        ArtifactSaver.write_manifest(self.config, ["x_train", "y_train", "x_test", "y_test"], feature_names)
+        weights_path = ArtifactSaver.class_weights_path(self.art)
+        if os.path.exists(weights_path):
+            y_train_all = np.load(ArtifactSaver.npy_base(self.art["y_train"]) + ".npy", mmap_mode="r")
+            weights = ImbalanceHandler.balanced_weights(y_train_all)
+            ArtifactSaver.save_json(weights_path, {str(c): w for c, w in weights.items()})
+
+        state["appended"].append({**entry, "rows": int(len(X)), "train_rows": int(len(X_train)),
+                                  "test_rows": int(len(X_test)), "appended_at": time.time(),
+                                  "max_mean_shift": drift["max_mean_shift"],
+                                  "new_category_rate": drift["new_category_rate"]})
+        ArtifactSaver.save_json(ArtifactSaver.incremental_state_path(self.art), state)
+        logging.info(f"Appended {len(X_train)} train / {len(X_test)} test rows from {path}.")
+        return {"action": "appended", "path": path, "train_rows": int(len(X_train)),
+                "test_rows": int(len(X_test)), "drift": drift}
+
+    def _encode(self, preprocessor, X):
+        # Same output layout as DataPipeline._output_layout: CSR only in sparse mode
+        X_proc = preprocessor.transform(X)
+        if self.config["preprocessing"].get("sparse", False):
+            return sparse.csr_matrix(X_proc) if sparse.issparse(X_proc) else X_proc
+        X_proc = X_proc.toarray() if sparse.issparse(X_proc) else X_proc
+        return X_proc.astype(np.float32) if self.art.get("float32", False) else X_proc
+
+    def _refit(self, state: Dict[str, Any], entry: Dict[str, Any], drift: Dict[str, Any]) -> Dict[str, Any]:
+        files = self._files(state) + [entry]
+        if drift["exceeded"]:
+            reason = "drift"
+        else:
+            reason = "force_refit" if self.force_refit else "resampling"
+        logging.info(f"Refitting on {len(files)} files ({reason}).")
+        conf = copy.deepcopy(self.config)
+        conf["data"]["file_path"] = [f["path"] for f in files]
+        DataPipeline(conf).run()
+        state = {"fitted_on": files, "appended": [],
+                 "refits": state.get("refits", []) + [{"path": entry["path"], "reason": reason, "refit_at": time.time(),
+                                                       "max_mean_shift": drift["max_mean_shift"],
+                                                       "new_category_rate": drift["new_category_rate"]}]}
+        ArtifactSaver.save_json(ArtifactSaver.incremental_state_path(self.art), state)
+        return {"action": "refit", "path": entry["path"], "reason": reason, "drift": drift}
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+class LazyModule:
+    """
+    Module-level stand-in for a heavy dependency, imported on first attribute access.
+
+        sparse = LazyModule("scipy.sparse")   # nothing imported yet
+        sparse.issparse(X)                    # scipy.sparse imported here, once
+
+    Importing a data_pipeline module therefore does not pay for scipy/sklearn/
+    imblearn until a code path actually uses them, which keeps short CLI
+    commands (validate, transform, score) fast. Classes that must subclass a
+    dependency at definition time (sklearn estimators) cannot be deferred this
+    way; their modules are imported inside the functions that need them.
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule '{self._name}' ({state})>"
@@ -0,0 +1,252 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import joblib
+
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.compiled_transformer import CompiledPreprocessor
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux /proc; None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RegisteredModel:
+    """One loaded registry version: preprocessor, model, metadata and what loading it cost."""
+    def __init__(self, meta: Dict[str, Any], preprocessor, model, load_s: float, rss_delta: Optional[int]):
+        self.meta = meta
+        self.name: str = meta["name"]
+        self.version: int = meta["version"]
+        self.preprocessor = preprocessor
+        self.model = model
+        self.fill_values: Optional[Dict[str, float]] = meta.get("fill_values")
+        self.feature_names: List[str] = meta["feature_names"]
+        self.load_s = load_s
+        self.rss_delta = rss_delta
+
+    @property
+    def uri(self) -> str:
+        return f"registry:{self.name}:{self.version}"
+
+class ModelRegistry:
+    """
+    Local, versioned store of preprocessor + model pairs under `root`:
+
+        <root>/<name>/<version>/preprocessor.joblib   fitted PreprocessorFactory transformer
+                               preprocessor_compiled.joblib
+                               model.joblib
+                               meta.json   config hash, feature names and their signature,
+                                           training fill values, metrics, source files
+
+    Objects are written with joblib uncompressed, so numpy state (tree tables
+    of an exported FlatTreeEnsemble, coefficient matrices) is memory-mapped
+    on load: nothing is copied until it is read and the pages are shared with
+    every process scoring the same version. A version directory is written
+    under a temporary name and renamed, so it is complete once listed.
+
+    load() keeps the last `max_loaded` versions deserialized in an in-process
+    LRU, so switching between models (or A/B-scoring several) only pays the
+    load once; stats() reports hits, misses, evictions and per-version load
+    time and resident-memory growth. shared() returns one registry per root
+    per process, so every ChurnScorer of a process shares the cache.
+    """
+    _shared: Dict[Tuple[str, int, bool], "ModelRegistry"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root: str, max_loaded: int = 4, mmap: bool = True):
+        self.root = root
+        self.max_loaded = max_loaded
+        self.mmap = mmap
+        self._loaded: "OrderedDict[Tuple[str, int, bool], RegisteredModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def from_config(config: Dict) -> "ModelRegistry":
+        conf = config.get("registry", {})
+        return ModelRegistry(conf.get("path", "registry"), int(conf.get("max_loaded", 4)), bool(conf.get("mmap", True)))
+
+    @staticmethod
+    def shared(config: Dict) -> "ModelRegistry":
+        """The process-wide registry for config's registry section (one LRU per root)."""
+        registry = ModelRegistry.from_config(config)
+        key = (os.path.abspath(registry.root), registry.max_loaded, registry.mmap)
+        with ModelRegistry._shared_lock:
+            return ModelRegistry._shared.setdefault(key, registry)
+
+    # ---- layout -----------------------------------------------------------
+    def _dir(self, name: str, version: int) -> str:
+        return os.path.join(self.root, name, str(version))
+
+    def names(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root) if self.versions(n))
+
+    def versions(self, name: str) -> List[int]:
+        folder = os.path.join(self.root, name)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(int(v) for v in os.listdir(folder) if v.isdigit())
+
+    def latest(self, name: str) -> int:
+        versions = self.versions(name)
+        if not versions:
+            raise KeyError(f"No model '{name}' in registry {self.root}")
+        return versions[-1]
+
+    def path(self, name: str, version: int, filename: str = "meta.json") -> str:
+        return os.path.join(self._dir(name, version), filename)
+
+    def meta(self, name: str, version: Optional[int] = None) -> Dict[str, Any]:
+        version = version or self.latest(name)
+        path = self.path(name, version)
+        if not os.path.exists(path):
+            raise KeyError(f"No version {version} of model '{name}' in registry {self.root}")
+        with open(path, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def parse(spec: str) -> Tuple[str, Optional[int]]:
+        """'registry:<name>[:<version>]' -> (name, version or None for the latest)."""
+        _, _, rest = spec.partition(":")
+        name, _, version = rest.partition(":")
+        if not name:
+            raise ValueError(f"Expected registry:<name>[:<version>], got '{spec}'")
+        return name, int(version) if version else None
+
+    @staticmethod
+    def feature_signature(feature_names: List[str]) -> str:
+        return hashlib.sha256("\n".join(map(str, feature_names)).encode("utf-8")).hexdigest()[:16]
+
+    # ---- registration -----------------------------------------------------
+    def register(self, name: str, model, preprocessor, feature_names: List[str], config: Dict,
+                 fill_values: Optional[Dict[str, float]] = None, metrics: Optional[Dict[str, float]] = None,
+                 source: Optional[Dict[str, str]] = None) -> int:
+        """Store a new version of `name`; returns its version number."""
+        if os.sep in name or name.startswith(".") or ":" in name:
+            raise ValueError(f"Invalid model name '{name}'")
+        feature_names = [str(f) for f in feature_names]
+        n_features = getattr(model, "n_features_in_", getattr(model, "n_features", None))
+        if n_features is not None and int(n_features) != len(feature_names):
+            raise ValueError(f"Model '{name}' expects {n_features} features; the preprocessor produces {len(feature_names)}")
+        folder = os.path.join(self.root, name)
+        tmp = os.path.join(folder, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        try:
+            joblib.dump(preprocessor, os.path.join(tmp, "preprocessor.joblib"))
+            try:
+                CompiledPreprocessor.from_fitted(preprocessor).save(os.path.join(tmp, "preprocessor_compiled.joblib"))
+            except ValueError as e:
+                logging.warning(f"Preprocessor of '{name}' cannot be compiled ({e}); scorers will use the sklearn one.")
+            joblib.dump(model, os.path.join(tmp, "model.joblib"))
+            meta = {
+                "name": name,
+                "created_at": time.time(),
+                "config_hash": ArtifactSaver.config_hash(config),
+                "feature_signature": self.feature_signature(feature_names),
+                "feature_names": feature_names,
+                "model_class": f"{type(model).__module__}.{type(model).__name__}",
+                "fill_values": fill_values,
+                "metrics": metrics or {},
+                "source": source or {},
+            }
+            while True:
+                version = (self.versions(name) or [0])[-1] + 1
+                ArtifactSaver.save_json(os.path.join(tmp, "meta.json"), {**meta, "version": version})
+                try:
+                    # Fails if a concurrent register took this version first; then try the next one
+                    os.rename(tmp, self._dir(name, version))
+                    break
+                except OSError:
+                    if not os.path.isdir(self._dir(name, version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logging.info(f"Registered {name} version {version} ({meta['model_class']}, "
+                     f"{len(feature_names)} features, signature {meta['feature_signature']})")
+        return version
+
+    def register_artifacts(self, name: str, model_path: str, config: Dict,
+                           metrics: Optional[Dict[str, float]] = None) -> int:
+        """Register a model file together with the pipeline's current preprocessor, feature names and fill values."""
+        import numpy as np
+        from data_pipeline.flat_trees import FlatTreeEnsemble
+
+        art = config["artifacts"]
+        model = FlatTreeEnsemble.load(model_path) if model_path.endswith(".npz") else joblib.load(model_path)
+        fill_path = ArtifactSaver.fill_values_path(art)
+        fill_values = None
+        if os.path.exists(fill_path):
+            with open(fill_path, "r") as f:
+                fill_values = json.load(f)
+        feature_names = list(np.load(art["feature_names"], allow_pickle=True))
+        return self.register(name, model, joblib.load(art["preprocessor"]), feature_names, config,
+                             fill_values=fill_values, metrics=metrics,
+                             source={"model": os.path.abspath(model_path), "preprocessor": os.path.abspath(art["preprocessor"])})
+
+    # ---- loading ----------------------------------------------------------
+    def load(self, name: str, version: Optional[int] = None, compiled: bool = False) -> RegisteredModel:
+        """A deserialized version (default the latest), from the LRU when it was loaded recently."""
+        version = version or self.latest(name)
+        key = (name, version, compiled)
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is not None:
+                self._loaded.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        meta = self.meta(name, version)
+        folder = self._dir(name, version)
+        mmap_mode = "r" if self.mmap else None
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        compiled_path = os.path.join(folder, "preprocessor_compiled.joblib")
+        if compiled and os.path.exists(compiled_path):
+            # NumPy-only preprocessor: loading it never imports sklearn
+            preprocessor = joblib.load(compiled_path, mmap_mode=mmap_mode)
+        else:
+            preprocessor = joblib.load(os.path.join(folder, "preprocessor.joblib"), mmap_mode=mmap_mode)
+        model = joblib.load(os.path.join(folder, "model.joblib"), mmap_mode=mmap_mode)
+        load_s = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        entry = RegisteredModel(meta, preprocessor, model, load_s,
+                                rss_after - rss_before if rss_before is not None and rss_after is not None else None)
+        logging.info(f"Loaded {entry.uri} in {load_s * 1000:.1f} ms")
+        with self._lock:
+            # A concurrent load of the same version may have won; keep one copy
+            entry = self._loaded.setdefault(key, entry)
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.max_loaded:
+                evicted, _ = self._loaded.popitem(last=False)
+                self.evictions += 1
+                logging.info(f"Evicted registry:{evicted[0]}:{evicted[1]} from the loaded-model cache")
+        return entry
+
+    def evict(self) -> None:
+        with self._lock:
+            self._loaded.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = [{"model": e.uri, "compiled": key[2], "load_ms": round(e.load_s * 1000, 3),
+                       "rss_delta_bytes": e.rss_delta} for key, e in self._loaded.items()]
+            lookups = self.hits + self.misses
+            return {"loaded": loaded, "max_loaded": self.max_loaded, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions,
+                    "rss_bytes": _rss_bytes()}
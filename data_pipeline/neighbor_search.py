@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+from sklearn.base import BaseEstimator
+from sklearn.neighbors import NearestNeighbors
+from sklearn.random_projection import SparseRandomProjection
+
+class NeighborSearch(BaseEstimator):
+    """
+    k-nearest-neighbour search that SMOTE can use in place of its default
+    single-threaded NearestNeighbors (it only needs fit/kneighbors).
+
+      exact:       sklearn NearestNeighbors, queries spread over n_jobs workers
+      batched:     brute force, queried `batch_size` rows at a time so the
+                   distance matrix never exceeds batch_size x n_fit floats
+      approximate: neighbours found in a `n_components`-dim sparse random
+                   projection with a KD-tree (O(n log n) instead of O(n^2));
+                   SMOTE still interpolates in the original feature space
+    """
+    BACKENDS = ("exact", "batched", "approximate")
+
+    def __init__(self, n_neighbors: int = 6, backend: str = "exact", n_jobs: Optional[int] = None,
+                 batch_size: int = 10_000, n_components: int = 16, random_state: Optional[int] = None):
+        self.n_neighbors = n_neighbors
+        self.backend = backend
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.n_components = n_components
+        self.random_state = random_state
+
+    def _project(self, X):
+        return self.projection_.transform(X) if self.projection_ is not None else X
+
+    def fit(self, X, y=None) -> "NeighborSearch":
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown kNN backend '{self.backend}'. Use one of {self.BACKENDS}.")
+        self.projection_ = None
+        algorithm = {"exact": "auto", "batched": "brute", "approximate": "kd_tree"}[self.backend]
+        if self.backend == "approximate" and X.shape[1] > self.n_components:
+            self.projection_ = SparseRandomProjection(
+                n_components=self.n_components, dense_output=True, random_state=self.random_state
+            ).fit(X)
+        self.nn_ = NearestNeighbors(n_neighbors=self.n_neighbors, algorithm=algorithm, n_jobs=self.n_jobs)
+        self.nn_.fit(self._project(X))
+        return self
+
+    def kneighbors(self, X=None, n_neighbors: Optional[int] = None, return_distance: bool = True):
+        if X is None:
+            return self.nn_.kneighbors(None, n_neighbors, return_distance)
+        Xp = self._project(X)
+        if self.backend != "batched" or Xp.shape[0] <= self.batch_size:
+            return self.nn_.kneighbors(Xp, n_neighbors, return_distance)
+        parts = [self.nn_.kneighbors(Xp[i:i + self.batch_size], n_neighbors, return_distance)
+                 for i in range(0, Xp.shape[0], self.batch_size)]
+        if return_distance:
+            return np.vstack([d for d, _ in parts]), np.vstack([i for _, i in parts])
+        return np.vstack(parts)
+
+    def kneighbors_graph(self, X=None, n_neighbors: Optional[int] = None, mode: str = "connectivity"):
+        return self.nn_.kneighbors_graph(None if X is None else self._project(X), n_neighbors, mode)
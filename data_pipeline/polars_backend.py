@@ -0,0 +1,189 @@
+from __future__ import annotations
+import importlib.util
+import logging
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+from data_pipeline.data_ingestion import DataIngestion
+from data_pipeline.feature_engine import FeatureEngine
+from data_pipeline.lazy_module import LazyModule
+
+pl = LazyModule("polars")
+
+class PolarsFeaturePlan:
+    """
+    The pandas `clean` + `features` stages (DataIngestion.load_data/basic_clean,
+    MissingValueHandler.coerce_and_impute, then the FeatureEngine specs, which
+    default to the FeatureBinning/FeatureEngineering features) expressed as
+    one lazy Polars query: scan the CSV(s), drop columns, map the target,
+    coerce and impute, bin tenure, count service adoption, derive the payment
+    flags. Polars prunes unread columns at the scan and runs the plan on all
+    cores; the imputation statistics are a second query that shares the scan.
+
+    The result is handed to pandas column by column: numeric columns without
+    missing values are wrapped without a copy, strings become the same `str`
+    (or, per data.schema.dtypes, `category`) columns the pandas path produces,
+    so PreprocessorFactory sees identical frames. Selected with
+    execution.backend: "polars"; polars is optional (see available()).
+    """
+    # data.schema.dtypes -> polars dtype read from the CSV; strings are converted to category afterwards
+    DTYPES = {"int64": "Int64", "float64": "Float64", "category": "String", "object": "String", "str": "String",
+              "string": "String", "bool": "Boolean"}
+
+    def __init__(self, config: Dict):
+        prep = config["preprocessing"]
+        self.ingestion = DataIngestion(config)
+        self.strategy: str = prep["missing_value_strategy"]
+        self.numeric_to_coerce: List[str] = prep.get("numeric_to_coerce", [])
+        self.specs = FeatureEngine.from_config(config).specs
+        dtypes = self.ingestion.schema.get("dtypes") or {}
+        self.categorical = [c for c, t in dtypes.items() if str(t) == "category"]
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("polars") is not None
+
+    # ---- plan -------------------------------------------------------------
+    def scan(self):
+        schema = self.ingestion.schema
+        overrides = {c: getattr(pl, self.DTYPES[str(t)]) for c, t in (schema.get("dtypes") or {}).items()
+                     if str(t) in self.DTYPES}
+        frames = [pl.scan_csv(path, schema_overrides=overrides, null_values=schema.get("na_values") or None)
+                  for path in self.ingestion.file_paths]
+        lf = frames[0] if len(frames) == 1 else pl.concat(frames, how="vertical")
+        if schema.get("usecols"):
+            # Like read_csv(usecols=...): file order, and the other columns are never parsed
+            usecols = set(schema["usecols"])
+            lf = lf.select([c for c in lf.collect_schema().names() if c in usecols])
+        return lf
+
+    def plan(self, lf=None):
+        """(features plan, imputation-statistics plan) over lf (default: scan())."""
+        lf = self.scan() if lf is None else lf
+        names = lf.collect_schema().names()
+        target = self.ingestion.target_column
+
+        lf = lf.drop([c for c in self.ingestion.drop_columns if c in names])
+        if self.ingestion.target_mapping:
+            if target not in names:
+                raise KeyError(f"Target column '{target}' not found in data.")
+            lf = lf.with_columns(pl.col(target).cast(pl.String).str.strip_chars()
+                                 .replace_strict(self.ingestion.target_mapping, default=None).alias(target))
+
+        schema = lf.collect_schema()
+        coerced = []
+        for col in self.numeric_to_coerce:
+            if col not in schema:
+                logging.warning(f"Column '{col}' not in dataframe during coercion.")
+                continue
+            if schema[col] == pl.String:
+                # pd.to_numeric(errors="coerce"): unparseable values become missing
+                coerced.append(pl.col(col).str.strip_chars().cast(pl.Float64, strict=False).fill_nan(None).alias(col))
+        lf = lf.with_columns(coerced) if coerced else lf
+        imputed = [c for c in self.numeric_to_coerce if c in schema]
+        stats = lf.select([self._statistic(c).alias(c) for c in imputed] +
+                          [pl.col(c).null_count().alias(f"{c}__nulls") for c in imputed])
+        if imputed:
+            lf = lf.with_columns([pl.col(c).fill_null(self._statistic(c)) for c in imputed])
+
+        for spec in self.specs:
+            lf = getattr(self, f"_{spec['kind']}")(lf, spec, lf.collect_schema().names())
+        return lf, stats
+
+    def _statistic(self, col: str):
+        if self.strategy == "median":
+            return pl.col(col).median()
+        if self.strategy == "mean":
+            return pl.col(col).mean()
+        # Series.mode().iloc[0]: the smallest of the most frequent values
+        return pl.col(col).mode().sort().first()
+
+    @staticmethod
+    def _equals(col: str, value: Any):
+        return (pl.col(col).cast(pl.String) == value).fill_null(False).cast(pl.Int64)
+
+    def _count_matches(self, lf, spec: Dict, names: List[str]):
+        missing = [c for c in spec["columns"] if c not in names]
+        if "fill_missing" in spec and missing:
+            lf = lf.with_columns([pl.lit(spec["fill_missing"]).alias(c) for c in missing])
+        present = [c for c in spec["columns"] if c in names or "fill_missing" in spec]
+        total = pl.sum_horizontal([self._equals(c, spec["value"]) for c in present]) if present else pl.lit(0)
+        return lf.with_columns(total.cast(pl.Int64).alias(spec["name"]))
+
+    def _ratio(self, lf, spec: Dict, names: List[str]):
+        if spec["numerator"] not in names or spec["denominator"] not in names:
+            return lf
+        denominator = pl.col(spec["denominator"]).cast(pl.Float64)
+        if "zero_denominator" in spec:
+            denominator = pl.when(denominator == 0).then(pl.lit(float(spec["zero_denominator"]))).otherwise(denominator)
+        return lf.with_columns((pl.col(spec["numerator"]).cast(pl.Float64) / denominator).alias(spec["name"]))
+
+    def _flag(self, lf, spec: Dict, names: List[str]):
+        if spec["column"] not in names:
+            return lf
+        if "equals" in spec:
+            flag = self._equals(spec["column"], spec["equals"])
+        else:
+            pattern = "|".join(spec["contains_any"])
+            if not spec.get("case", True):
+                pattern = f"(?i){pattern}"
+            flag = pl.col(spec["column"]).cast(pl.String).str.contains(pattern).fill_null(False).cast(pl.Int64)
+        return lf.with_columns(flag.alias(spec["name"]))
+
+    def _binning(self, lf, spec: Dict, names: List[str]):
+        if spec["column"] not in names:
+            return lf
+        bins, labels = [float(b) for b in spec["bins"]], list(spec["labels"])
+        value = pl.col(spec["column"]).cast(pl.Float64)
+        right = spec.get("right", False)
+        binned = pl.lit(None, dtype=pl.String)
+        for i in reversed(range(len(bins) - 1)):
+            inside = (value > bins[i]) & (value <= bins[i + 1]) if right else (value >= bins[i]) & (value < bins[i + 1])
+            binned = pl.when(inside).then(pl.lit(labels[i])).otherwise(binned)
+        return lf.with_columns(binned.cast(pl.Enum(labels)).alias(spec["name"]))
+
+    # ---- execution --------------------------------------------------------
+    def run(self) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """Collect the plan: the prepared frame (as pandas) and the training fill values."""
+        lf, stats = self.plan()
+        df, stats_df = pl.collect_all([lf, stats])
+        # One contiguous buffer per column (the scan yields several chunks), so to_pandas can share them
+        df = df.rechunk()
+        target = self.ingestion.target_column
+        if self.ingestion.target_mapping and df[target].null_count():
+            raise ValueError(f"Target mapping introduced NaNs. Check mapping for column '{target}'.")
+        fill_values: Dict[str, float] = {}
+        for col in stats_df.columns:
+            if not col.endswith("__nulls"):
+                fill_values[col] = float(stats_df[col][0])
+                logging.info(f"Imputed {stats_df[f'{col}__nulls'][0]} NaNs in '{col}' using {self.strategy}.")
+        out = self.to_pandas(df, ordered=[s["name"] for s in self.specs if s["kind"] == "binning"])
+        logging.info(f"Loaded and prepared {self.ingestion.file_path} with the polars backend, shape {out.shape}")
+        return out, fill_values
+
+    def to_pandas(self, df, ordered: List[str]) -> pd.DataFrame:
+        """pandas frame without pyarrow; numeric columns of a rechunked df without nulls share its buffers."""
+        columns: Dict[str, Any] = {}
+        for s in df.iter_columns():
+            if s.dtype == pl.String:
+                # Gather from the distinct values instead of materialising one Python str per row
+                s = s.cast(pl.Enum(s.drop_nulls().unique().sort().to_list()))
+                if s.name not in self.categorical:
+                    codes, categories = self._codes(s)
+                    columns[s.name] = np.append(np.asarray(categories, dtype=object), np.nan)[codes]
+                    continue
+            if s.dtype == pl.Enum:
+                # pandas' read_csv(dtype="category") sorts the categories, as the cast above does
+                codes, categories = self._codes(s)
+                columns[s.name] = pd.Categorical.from_codes(codes, categories=categories, ordered=s.name in ordered)
+            elif s.dtype.is_numeric() and s.null_count():
+                columns[s.name] = s.cast(pl.Float64).fill_null(np.nan).to_numpy()
+            else:
+                columns[s.name] = s.to_numpy()
+        return pd.DataFrame(columns, copy=False)
+
+    @staticmethod
+    def _codes(s) -> Tuple[np.ndarray, List]:
+        """Codes of an Enum series (-1 where missing) and its categories."""
+        return s.to_physical().cast(pl.Int64).fill_null(-1).to_numpy(), s.dtype.categories.to_list()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from data_pipeline.stage_cache import StageCache
+
+class ScoreCache:
+    """
+    Persistent cache of churn probabilities keyed by a fingerprint of each
+    prepared customer row, so rows that did not change since the last scoring
+    run skip the preprocessor and the model.
+
+    The fingerprint is 128 bits: two pd.util.hash_pandas_object passes over the
+    row values, with hash keys derived from the column names. Entries are
+    stored in a local SQLite file under the cache `version`, the SHA-256 of the
+    preprocessor and model artifacts: a scorer opened on a retrained
+    preprocessor.joblib or a new model pickle never reads the old version's
+    entries. Several versions share one file (A/B scoring, registry versions);
+    past `max_entries` the least recently used entries of any version are
+    evicted (down to 90% of it, in one statement), which ages out stale ones.
+    hits/misses/evictions count this process's lookups (see stats()).
+    """
+    # Eviction trims to this fraction of max_entries, so the (unindexed) LRU scan runs rarely
+    EVICT_TO = 0.9
+
+    def __init__(self, path: str, version: str, max_entries: int = 1_000_000):
+        self.path = path
+        self.version = version
+        self.max_entries = int(max_entries)
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Scoring runs in executor threads; every statement holds the lock
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS scores (
+                version TEXT NOT NULL, key BLOB NOT NULL, score REAL NOT NULL, last_used INTEGER NOT NULL,
+                PRIMARY KEY (version, key)) WITHOUT ROWID;
+            CREATE TEMP TABLE IF NOT EXISTS batch_keys (key BLOB NOT NULL);
+        """)
+        self._tick = self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM scores").fetchone()[0]
+        # Row count as of opening plus this scorer's inserts (which may replace); recounted when it passes max_entries
+        self._entries = self._count()
+
+    @staticmethod
+    def from_config(config: Dict, artifact_paths: Iterable[str]) -> Optional["ScoreCache"]:
+        conf = config.get("serving", {}).get("cache", {})
+        if not conf.get("enabled", False):
+            return None
+        return ScoreCache(conf.get("path", "cache/scores.sqlite"), ScoreCache.version_of(artifact_paths),
+                          conf.get("max_entries", 1_000_000))
+
+    @staticmethod
+    def version_of(artifact_paths: Iterable[str]) -> str:
+        """Digest of the artifacts' contents (plus the pandas version, whose row hashing the fingerprints use)."""
+        h = hashlib.sha256(pd.__version__.encode())
+        for path in artifact_paths:
+            h.update(StageCache.sha256(path).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def fingerprints(X: pd.DataFrame) -> List[bytes]:
+        """16-byte key per row of X; the column names are part of the key, the index is not."""
+        schema = hashlib.md5("|".join(map(str, X.columns)).encode()).hexdigest()
+        halves = [pd.util.hash_pandas_object(X, index=False, hash_key=schema[i:i + 16]).to_numpy(dtype=np.uint64)
+                  for i in (0, 16)]
+        keys = np.ascontiguousarray(np.column_stack(halves)).view("V16").ravel()
+        return [k.tobytes() for k in keys]
+
+    # ---- lookups ----------------------------------------------------------
+    def get_many(self, keys: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """(scores, hit mask) for the keys; scores are NaN where there was no entry."""
+        with self._lock, self._db:
+            # One join and one LRU touch per batch instead of a statement per key;
+            # batch_keys' rowid keeps the input order, so misses come back as NULL in place
+            self._db.execute("DELETE FROM batch_keys")
+            self._db.executemany("INSERT INTO batch_keys VALUES (?)", ((k,) for k in keys))
+            rows = self._db.execute("SELECT s.score FROM batch_keys b LEFT JOIN scores s ON s.version = ? "
+                                    "AND s.key = b.key ORDER BY b.rowid", (self.version,)).fetchall()
+            scores = np.array([r[0] for r in rows], dtype=np.float64).reshape(len(keys))
+            if not np.isnan(scores).all():
+                self._advance()
+                self._db.execute("UPDATE scores SET last_used = ? WHERE version = ? AND key IN (SELECT key FROM batch_keys)",
+                                 (self._tick, self.version))
+        hit = ~np.isnan(scores)
+        self.hits += int(hit.sum())
+        self.misses += int((~hit).sum())
+        return scores, hit
+
+    def put_many(self, keys: List[bytes], scores) -> None:
+        with self._lock:
+            self._advance()
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+                                     [(self.version, k, float(s), self._tick) for k, s in zip(keys, scores)])
+                self._entries += len(keys)
+                if self._entries > self.max_entries:
+                    self._entries = self._count()
+                    excess = self._entries - int(self.max_entries * self.EVICT_TO)
+                    if self._entries > self.max_entries and excess > 0:
+                        # Across versions: entries of artifacts nobody scores with any more go first
+                        self._db.execute("DELETE FROM scores WHERE (version, key) IN (SELECT version, key FROM scores "
+                                         "ORDER BY last_used LIMIT ?)", (excess,))
+                        self.evictions += excess
+                        self._entries -= excess
+
+    def _advance(self) -> None:
+        # Wall-clock ticks, so LRU order is comparable between the scorers (and processes) sharing the file
+        self._tick = max(self._tick + 1, time.time_ns())
+
+    def _count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Lookup counters of this process; `entries` are this version's, `total_entries` the file's."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM scores WHERE version = ?", (self.version,)).fetchone()[0]
+            total = self._count()
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "entries": entries, "total_entries": total,
+                "max_entries": self.max_entries}
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM scores")
+            self._entries = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
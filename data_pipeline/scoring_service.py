@@ -0,0 +1,288 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import joblib
+
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.compiled_transformer import CompiledPreprocessor
+from data_pipeline.feature_preparer import FeaturePreparer
+from data_pipeline.flat_trees import FlatTreeEnsemble
+from data_pipeline.model_registry import ModelRegistry
+from data_pipeline.score_cache import ScoreCache
+
+class ChurnScorer:
+    """
+    Loads the fitted preprocessor and a model once and scores raw customer
+    records with the same cleaning, binning and feature engineering as training.
+    A model path "registry:<name>[:<version>]" takes the preprocessor, model
+    and fill values of a registered version instead (see ModelRegistry).
+    """
+    def __init__(self, config: Dict, model_path: Optional[str] = None):
+        art = config["artifacts"]
+        self.model_path = model_path or config["serving"]["model_path"]
+        self.registry: Optional[ModelRegistry] = None
+        if self.model_path.startswith("registry:"):
+            self._load_registered(config)
+            return
+        self.preprocessor = ChurnScorer.load_preprocessor(config)
+        # .npz: a tree ensemble exported by TreeEnsembleExporter, evaluated with numpy only
+        self.model = FlatTreeEnsemble.load(self.model_path) if self.model_path.endswith(".npz") else joblib.load(self.model_path)
+        self.preparer = ChurnScorer.load_preparer(config)
+        # Versioned by the artifacts' contents: a new preprocessor.joblib or model drops the old scores
+        self.cache = ScoreCache.from_config(config, [art["preprocessor"], self.model_path])
+        logging.info(f"Scorer loaded preprocessor {art['preprocessor']} and model {self.model_path}")
+
+    def _load_registered(self, config: Dict) -> None:
+        # The process-wide registry LRU: scorers of versions loaded before are built without unpickling
+        self.registry = ModelRegistry.shared(config)
+        name, version = ModelRegistry.parse(self.model_path)
+        entry = self.registry.load(name, version, compiled=config.get("serving", {}).get("compiled", False))
+        self.model_path = entry.uri
+        self.preprocessor = entry.preprocessor
+        self.model = entry.model
+        self.preparer = FeaturePreparer(config, entry.fill_values)
+        # meta.json is unique per version, so cached scores never cross versions
+        self.cache = ScoreCache.from_config(config, [self.registry.path(entry.name, entry.version)])
+        logging.info(f"Scorer loaded {entry.uri} (load {entry.load_s * 1000:.1f} ms)")
+
+    @staticmethod
+    def load_preprocessor(config: Dict):
+        """
+        The fitted preprocessor; with serving.compiled, its NumPy version. A compiled
+        artifact written with (or after) preprocessor.joblib is loaded directly,
+        which skips unpickling the sklearn ColumnTransformer and importing sklearn.
+        """
+        art = config["artifacts"]
+        compiled = config.get("serving", {}).get("compiled", False)
+        compiled_path = art.get("compiled_preprocessor")
+        if compiled and compiled_path and os.path.exists(compiled_path) \
+                and os.path.getmtime(compiled_path) >= os.path.getmtime(art["preprocessor"]):
+            return CompiledPreprocessor.load(compiled_path)
+        preprocessor = joblib.load(art["preprocessor"])
+        if compiled:
+            # NumPy fast path: same output as the ColumnTransformer without its per-call overhead
+            preprocessor = CompiledPreprocessor.from_fitted(preprocessor)
+        return preprocessor
+
+    @staticmethod
+    def load_preparer(config: Dict) -> FeaturePreparer:
+        """Row-wise cleaning and feature engineering with the training fill values (when saved)."""
+        fill_path = ArtifactSaver.fill_values_path(config["artifacts"])
+        fill_values = None
+        if os.path.exists(fill_path):
+            with open(fill_path, "r") as f:
+                fill_values = json.load(f)
+        return FeaturePreparer(config, fill_values)
+
+    def score(self, records: pd.DataFrame) -> np.ndarray:
+        X = self.preparer.features_only(records)
+        if self.cache is None:
+            return self._predict(X)
+        # Only rows whose prepared features were not scored before go through the preprocessor and model
+        keys = ScoreCache.fingerprints(X)
+        scores, hit = self.cache.get_many(keys)
+        if not hit.all():
+            miss = np.flatnonzero(~hit)
+            scores[miss] = self._predict(X.iloc[miss])
+            self.cache.put_many([keys[i] for i in miss], scores[miss])
+        return scores
+
+    def _predict(self, X: pd.DataFrame) -> np.ndarray:
+        X_proc = self.preprocessor.transform(X)
+        return self.model.predict_proba(X_proc)[:, 1]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one vectorised call. A batch is
+    flushed when it reaches `max_batch_size` records or `max_wait_ms` after its
+    first request arrived; scoring runs in a worker thread so the event loop
+    keeps accepting requests (which then form the next batch).
+    """
+    def __init__(self, scorer: ChurnScorer, max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, records: List[Dict[str, Any]]) -> List[float]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[List[Dict], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _score_batch(self, batch: List[Tuple[List[Dict], asyncio.Future]]) -> List[Any]:
+        records = [r for recs, _ in batch for r in recs]
+        try:
+            probs = self.scorer.score(pd.DataFrame.from_records(records))
+        except Exception:
+            if len(batch) == 1:
+                raise
+            # Isolate the offending request instead of failing everyone in the batch
+            return [self._score_single(recs) for recs, _ in batch]
+        out, start = [], 0
+        for recs, _ in batch:
+            out.append(probs[start:start + len(recs)].tolist())
+            start += len(recs)
+        return out
+
+    def _score_single(self, records: List[Dict]) -> Any:
+        try:
+            return self.scorer.score(pd.DataFrame.from_records(records)).tolist()
+        except Exception as e:
+            return e
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            try:
+                results = await loop.run_in_executor(None, self._score_batch, batch)
+            except Exception as e:
+                results = [e] * len(batch)
+            self.batches += 1
+            self.rows += sum(len(recs) for recs, _ in batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class ScoringServer:
+    """
+    Minimal HTTP/1.1 server on asyncio streams (keep-alive, Content-Length bodies).
+
+      POST /score   {"records": [{...raw customer row...}, ...]} -> {"churn_probability": [...]}
+      GET  /health  -> {"status": "ok"}
+      GET  /metrics -> batch/row counters of the micro-batcher (and score cache / model registry stats)
+    """
+    def __init__(self, scorer: ChurnScorer, host: str = "127.0.0.1", port: int = 8080,
+                 max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(scorer, max_batch_size, max_wait_ms)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @staticmethod
+    def from_config(config: Dict, model_path: Optional[str] = None) -> "ScoringServer":
+        serving = config.get("serving", {})
+        return ScoringServer(
+            ChurnScorer(config, model_path),
+            host=serving.get("host", "127.0.0.1"),
+            port=int(serving.get("port", 8080)),
+            max_batch_size=int(serving.get("max_batch_size", 256)),
+            max_wait_ms=float(serving.get("max_wait_ms", 5.0)),
+        )
+
+    async def start(self) -> None:
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"Scoring service listening on http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            b = self.batcher
+            metrics = {"batches": b.batches, "rows": b.rows, "avg_batch_rows": b.rows / b.batches if b.batches else 0.0}
+            if b.scorer.cache is not None:
+                metrics["score_cache"] = b.scorer.cache.stats()
+            if b.scorer.registry is not None:
+                metrics["registry"] = b.scorer.registry.stats()
+            return 200, metrics
+        if method == "POST" and path == "/score":
+            try:
+                payload = json.loads(body)
+                records = payload["records"] if isinstance(payload, dict) else payload
+                if not isinstance(records, list) or not records:
+                    raise ValueError("expected a non-empty list of records")
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {"error": f"Bad request body: {e}"}
+            try:
+                return 200, {"churn_probability": await self.batcher.submit(records)}
+            except Exception as e:
+                logging.exception("Scoring failed")
+                return 500, {"error": str(e)}
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
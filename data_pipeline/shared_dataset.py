@@ -0,0 +1,160 @@
+from __future__ import annotations
+import logging
+import secrets
+import sys
+import threading
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from data_pipeline.artifact_saver import ArtifactSaver, sparse
+
+# Per-process cache of attached datasets, keyed by their first block name
+_attached: Dict[str, "SharedDataset"] = {}
+_attach_lock = threading.Lock()
+
+def _open_block(name: str) -> SharedMemory:
+    """Attach to an existing block without registering it with this process's resource tracker."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # Before 3.13 every attach registers the block, and a worker's tracker would unlink it
+    # (or warn about a "leak") when the worker exits, although the publisher owns it
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+def _release(blocks: List[SharedMemory], unlink: bool) -> None:
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # Arrays still reference the mapping; it is unmapped when they are collected
+            pass
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+class SharedDataset:
+    """
+    Feature matrices published once into multiprocessing.shared_memory blocks
+    and attached by worker processes by name, so parallel trainers read one
+    copy instead of each loading (and decompressing) its own.
+
+    The publishing process owns the blocks: `publish()` copies each array
+    (dense, or the data/indices/indptr of a CSR matrix) into a block and
+    returns the owner, whose `spec` is a small picklable dict to send to the
+    workers. Workers call `SharedDataset.attached(spec)`, which maps the blocks
+    read-only (cached per process, so repeated tasks attach once) and does not
+    copy. The owner unlinks the blocks on close() / leaving its `with` block,
+    or when it is garbage collected; workers only unmap.
+    """
+    def __init__(self, spec: Dict[str, Dict[str, Any]], blocks: List[SharedMemory], owner: bool):
+        self.spec = spec
+        self.owner = owner
+        self.arrays: Dict[str, Any] = {name: self._view(entry, {b.name: b for b in blocks}) for name, entry in spec.items()}
+        # Set after `arrays` so that on collection the views go before the blocks they export from
+        self._blocks = blocks
+        self._finalizer = weakref.finalize(self, _release, blocks, owner)
+
+    @staticmethod
+    def _view(entry: Dict[str, Any], blocks: Dict[str, SharedMemory]):
+        parts = {}
+        for part, (block, shape, dtype) in entry["parts"].items():
+            arr = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=blocks[block].buf)
+            arr.flags.writeable = False
+            parts[part] = arr
+        if entry["kind"] == "dense":
+            return parts["values"]
+        return sparse.csr_matrix((parts["data"], parts["indices"], parts["indptr"]), shape=tuple(entry["shape"]), copy=False)
+
+    @staticmethod
+    def publish(arrays: Dict[str, Any], prefix: str = "churn") -> "SharedDataset":
+        """Copy arrays (name -> ndarray or sparse matrix) into new shared-memory blocks owned by the caller."""
+        token = secrets.token_hex(4)
+        spec: Dict[str, Dict[str, Any]] = {}
+        blocks: List[SharedMemory] = []
+        try:
+            for i, (name, value) in enumerate(arrays.items()):
+                if sparse.issparse(value):
+                    csr = sparse.csr_matrix(value)
+                    parts = {"data": csr.data, "indices": csr.indices, "indptr": csr.indptr}
+                    entry: Dict[str, Any] = {"kind": "csr", "shape": list(csr.shape), "parts": {}}
+                else:
+                    parts = {"values": np.asarray(value)}
+                    entry = {"kind": "dense", "shape": list(parts["values"].shape), "parts": {}}
+                for part, arr in parts.items():
+                    # Zero-byte blocks are not allowed
+                    block = SharedMemory(name=f"{prefix}_{token}_{i}_{part}", create=True, size=max(arr.nbytes, 1))
+                    blocks.append(block)
+                    np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+                    entry["parts"][part] = (block.name, list(arr.shape), arr.dtype.str)
+                spec[name] = entry
+        except BaseException:
+            _release(blocks, unlink=True)
+            raise
+        total = sum(b.size for b in blocks)
+        logging.info(f"Published {len(spec)} arrays to shared memory ({total / 2**20:.1f} MiB in {len(blocks)} blocks).")
+        return SharedDataset(spec, blocks, owner=True)
+
+    @staticmethod
+    def from_artifacts(config: Dict, names: Optional[List[str]] = None) -> "SharedDataset":
+        """Publish the pipeline's saved matrices (default x_train, y_train, x_test, y_test) from disk."""
+        art = config["artifacts"]
+        names = names or ["x_train", "y_train", "x_test", "y_test"]
+        if art.get("format", "npz") == "npy":
+            from data_pipeline.artifact_saver import ArtifactLoader
+            loader = ArtifactLoader.from_config(config)
+            return SharedDataset.publish({name: loader.load(name) for name in names})
+        return SharedDataset.publish({name: ArtifactSaver.load_matrix(art[name]) for name in names})
+
+    @staticmethod
+    def attached(spec: Dict[str, Dict[str, Any]]) -> "SharedDataset":
+        """Read-only views of a published dataset in this process (attached once, then reused)."""
+        names = [block for entry in spec.values() for block, _, _ in entry["parts"].values()]
+        key = names[0] if names else ""
+        with _attach_lock:
+            dataset = _attached.get(key)
+        if dataset is None:
+            SharedDataset._prune()
+            dataset = SharedDataset(spec, [_open_block(name) for name in names], owner=False)
+            with _attach_lock:
+                _attached[key] = dataset
+        return dataset
+
+    @staticmethod
+    def _prune() -> None:
+        """Unmap cached datasets whose owner has unlinked them (long-lived workers attach many over time)."""
+        with _attach_lock:
+            cached = [dataset for dataset in _attached.values() if dataset._blocks]
+        for dataset in cached:
+            try:
+                _open_block(dataset._blocks[0].name).close()
+            except FileNotFoundError:
+                dataset.close()
+
+    def __getitem__(self, name: str):
+        return self.arrays[name]
+
+    def close(self) -> None:
+        """Drop the views and unmap the blocks; the owner also unlinks them."""
+        self.arrays = {}
+        if not self.owner:
+            with _attach_lock:
+                for key, dataset in list(_attached.items()):
+                    if dataset is self:
+                        del _attached[key]
+        self._finalizer()
+
+    def __enter__(self) -> "SharedDataset":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import joblib
+
+from data_pipeline.lazy_module import LazyModule
+
+sparse = LazyModule("scipy.sparse")
+
+class StageCache:
+    """
+    Content-addressed on-disk cache for pipeline stage outputs.
+
+    Each entry lives in `<dir>/<stage>-<key>/` with a manifest.json. DataFrames
+    and Series are stored column by column (one .npy per column; string and
+    categorical columns as integer codes plus a JSON vocabulary), arrays as .npy,
+    sparse matrices as .npz and anything else through joblib. Entries are evicted
+    least-recently-used first once the cache grows past `max_bytes`.
+
+    Stages may save concurrently (execution.workers) and runs may share the
+    directory: entries are written under a unique `.tmp` name and renamed,
+    eviction never looks at unfinished entries, runs one thread at a time and
+    treats files deleted under it by another process as already evicted.
+    """
+    VERSION = 1
+    _evict_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2_000_000_000):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def from_config(config: Dict) -> Optional["StageCache"]:
+        conf = config.get("cache", {})
+        if not conf.get("enabled", False):
+            return None
+        return StageCache(conf.get("dir", "cache/pipeline"), conf.get("max_bytes", 2_000_000_000))
+
+    # ---- keys -------------------------------------------------------------
+    def file_digest(self, path: str, block_size: int = 1 << 20) -> str:
+        """SHA-256 of the file contents, memoised on (path, size, mtime) so unchanged inputs are not re-read."""
+        stat = os.stat(path)
+        memo_path = os.path.join(self.cache_dir, "file_digests.json")
+        memo: Dict[str, Dict] = {}
+        if os.path.exists(memo_path):
+            try:
+                with open(memo_path, "r") as f:
+                    memo = json.load(f)
+            except ValueError:
+                # A damaged memo only costs re-hashing the inputs
+                logging.warning(f"Ignoring unreadable {memo_path}; input digests are recomputed.")
+        abs_path = os.path.abspath(path)
+        entry = memo.get(abs_path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        digest = StageCache.sha256(path, block_size)
+        memo[abs_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        # Written aside and renamed, so runs sharing cache.dir never read a half-written memo
+        fd, tmp = tempfile.mkstemp(prefix="file_digests-", suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(memo, f)
+            os.replace(tmp, memo_path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return digest
+
+    @staticmethod
+    def sha256(path: str, block_size: int = 1 << 20) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    @staticmethod
+    def key(stage: str, config_slice: Any, upstream: List[str]) -> str:
+        payload = json.dumps(
+            {"version": StageCache.VERSION, "stage": stage, "config": config_slice, "upstream": upstream},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{stage}-{key[:20]}")
+
+    # ---- load / save ------------------------------------------------------
+    def contains(self, stage: str, key: str) -> bool:
+        manifest_path = os.path.join(self._entry_dir(stage, key), "manifest.json")
+        if not os.path.exists(manifest_path):
+            return False
+        with open(manifest_path, "r") as f:
+            return json.load(f).get("key") == key
+
+    def load(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry_dir(stage, key)
+        manifest_path = os.path.join(entry, "manifest.json")
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get("key") != key:
+            return None
+        try:
+            outputs = {name: self._read(os.path.join(entry, name), meta) for name, meta in manifest["items"].items()}
+        except (OSError, ValueError, KeyError):
+            logging.warning(f"Discarding unreadable cache entry {entry}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # Touch the manifest so eviction sees this entry as recently used
+        try:
+            os.utime(manifest_path)
+        except FileNotFoundError:
+            pass  # evicted meanwhile; the outputs were read already
+        return outputs
+
+    def save(self, stage: str, key: str, outputs: Dict[str, Any]) -> None:
+        entry = self._entry_dir(stage, key)
+        # Unique per writer: two saves of the same entry never share (or delete) a staging dir
+        tmp = tempfile.mkdtemp(prefix=os.path.basename(entry) + ".", suffix=".tmp", dir=self.cache_dir)
+        try:
+            items = {name: self._write(os.path.join(tmp, name), value) for name, value in outputs.items()}
+            with open(os.path.join(tmp, "manifest.json"), "w") as f:
+                json.dump({"stage": stage, "key": key, "created": time.time(), "items": items}, f)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # A concurrent save of the same key renamed its copy first; the contents are the same
+                if not os.path.exists(os.path.join(entry, "manifest.json")):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    @staticmethod
+    def _write_column(path: str, series: pd.Series) -> Dict:
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            np.save(path + ".npy", series.cat.codes.to_numpy())
+            return {"kind": "categorical", "categories": series.cat.categories.tolist(), "ordered": bool(dtype.ordered)}
+        if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            np.save(path + ".npy", series.to_numpy())
+            return {"kind": "numeric"}
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        np.save(path + ".npy", codes.astype(np.int32))
+        return {"kind": "factorized", "uniques": [str(u) for u in uniques], "dtype": str(dtype)}
+
+    @staticmethod
+    def _read_column(path: str, meta: Dict, name: str, index: pd.Index) -> pd.Series:
+        values = np.load(path + ".npy")
+        if meta["kind"] == "categorical":
+            data = pd.Categorical.from_codes(values, categories=meta["categories"], ordered=meta["ordered"])
+            return pd.Series(data, index=index, name=name)
+        if meta["kind"] == "numeric":
+            return pd.Series(values, index=index, name=name)
+        uniques = np.asarray(meta["uniques"] + [None], dtype=object)
+        # code -1 (missing) picks the trailing None
+        return pd.Series(uniques[values], index=index, name=name).astype(meta["dtype"])
+
+    def _write(self, path: str, value: Any) -> Dict:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            frame = value.to_frame() if isinstance(value, pd.Series) else value
+            os.makedirs(path)
+            np.save(os.path.join(path, "__index__.npy"), frame.index.to_numpy())
+            columns = []
+            for i, col in enumerate(frame.columns):
+                meta = self._write_column(os.path.join(path, f"c{i}"), frame[col])
+                columns.append({"name": col, **meta})
+            return {"type": "series" if isinstance(value, pd.Series) else "frame", "columns": columns}
+        if sparse.issparse(value):
+            sparse.save_npz(path + ".npz", value)
+            return {"type": "sparse"}
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            np.save(path + ".npy", value)
+            return {"type": "array"}
+        joblib.dump(value, path + ".joblib")
+        return {"type": "object"}
+
+    def _read(self, path: str, meta: Dict) -> Any:
+        kind = meta["type"]
+        if kind in ("frame", "series"):
+            index = pd.Index(np.load(os.path.join(path, "__index__.npy"), allow_pickle=True))
+            cols = [self._read_column(os.path.join(path, f"c{i}"), c, c["name"], index) for i, c in enumerate(meta["columns"])]
+            if kind == "series":
+                return cols[0]
+            return pd.concat(cols, axis=1) if cols else pd.DataFrame(index=index)
+        if kind == "sparse":
+            return sparse.load_npz(path + ".npz")
+        if kind == "array":
+            return np.load(path + ".npy")
+        return joblib.load(path + ".joblib")
+
+    # ---- eviction ---------------------------------------------------------
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for f in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, f))
+                except FileNotFoundError:
+                    pass
+        return total
+
+    def evict(self) -> None:
+        with StageCache._evict_lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp"):
+                continue  # being written; renamed into place when complete
+            path = os.path.join(self.cache_dir, name)
+            try:
+                mtime = os.path.getmtime(os.path.join(path, "manifest.json"))
+            except (FileNotFoundError, NotADirectoryError):
+                continue  # not an entry, or evicted by another run sharing the directory
+            entries.append((mtime, self._dir_size(path), path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            logging.info(f"Evicted cache entry {path} ({size} bytes)")
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak-RSS growth and input/output shapes for
+    each pipeline stage and writes them as a JSON run report.
+
+    Peak RSS comes from psutil when installed (Windows: peak working set),
+    otherwise from resource.getrusage; `rss_peak_delta_bytes` is how far the
+    stage raised the process high-water mark, so a stage that stays below an
+    earlier peak reports 0. When stages run concurrently (StageScheduler),
+    `start_s` (offset from the start of the run) shows the overlap, and CPU time
+    and peak RSS are process-wide, so they include the stages running alongside.
+    One stage can additionally be captured with
+    cProfile or tracemalloc (`instrumentation.profile_stage` / `profiler`).
+    """
+    PROFILERS = ("cprofile", "tracemalloc")
+
+    def __init__(self, report_path: Optional[str] = None, profile_stage: Optional[str] = None,
+                 profiler: str = "cprofile", top: int = 25, enabled: bool = True):
+        if profiler not in self.PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'. Use one of {self.PROFILERS}.")
+        self.report_path = report_path
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.top = top
+        self.enabled = enabled
+        self.stages: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def from_config(config: Dict) -> "StageProfiler":
+        conf = config.get("instrumentation", {})
+        report = conf.get("report") or os.path.join(os.path.dirname(config["artifacts"]["x_train"]), "run_report.json")
+        return StageProfiler(
+            report_path=report,
+            profile_stage=conf.get("profile_stage"),
+            profiler=conf.get("profiler", "cprofile"),
+            top=int(conf.get("top", 25)),
+            enabled=bool(conf.get("enabled", False)),
+        )
+
+    # ---- measurements -----------------------------------------------------
+    @staticmethod
+    def peak_rss() -> Optional[int]:
+        """Process peak resident set size in bytes, or None if the platform exposes none."""
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return int(getattr(info, "peak_wset", None) or getattr(info, "peak_rss", None) or info.rss)
+        except ImportError:
+            pass
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux, bytes on macOS
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+    @staticmethod
+    def shape_of(value: Any) -> Optional[List[int]]:
+        shape = getattr(value, "shape", None)
+        if shape is not None:
+            return [int(n) for n in shape]
+        if isinstance(value, (list, tuple, dict)):
+            return [len(value)]
+        return None
+
+    @staticmethod
+    def shapes(values: Optional[Dict[str, Any]]) -> Dict[str, Optional[List[int]]]:
+        return {name: StageProfiler.shape_of(v) for name, v in (values or {}).items()}
+
+    # ---- recording --------------------------------------------------------
+    @contextmanager
+    def stage(self, name: str, inputs: Optional[Dict[str, Any]] = None, **extra) -> Iterator[Dict[str, Any]]:
+        """
+        Measure the enclosed block. The caller stores what the stage produced with
+        `record["outputs"] = StageProfiler.shapes(outputs)`; setting `record["discard"]`
+        drops the measurement (e.g. a cache lookup that missed).
+        """
+        record: Dict[str, Any] = {"stage": name, "inputs": self.shapes(inputs), "outputs": {}, **extra}
+        if not self.enabled:
+            yield record
+            return
+        capture = name == self.profile_stage
+        profile = None
+        if capture and self.profiler == "cprofile":
+            profile = cProfile.Profile()
+        elif capture:
+            tracemalloc.start()
+        rss_before = self.peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        record["start_s"] = wall - self._started
+        record["thread"] = threading.current_thread().name
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            rss_after = self.peak_rss()
+            record["rss_peak_bytes"] = rss_after
+            record["rss_peak_delta_bytes"] = rss_after - rss_before if rss_after is not None else None
+            if record.pop("discard", False):
+                if capture and profile is None:
+                    tracemalloc.stop()
+                return
+            if capture:
+                record["profile"] = self._cprofile_stats(profile) if profile is not None else self._tracemalloc_stats()
+            self.stages.append(record)
+            logging.info(
+                f"Stage '{name}': {record['wall_s']:.3f}s wall, {record['cpu_s']:.3f}s CPU, "
+                f"peak RSS +{(record['rss_peak_delta_bytes'] or 0) / 2**20:.1f} MiB"
+            )
+
+    def _cprofile_stats(self, profile: cProfile.Profile) -> Dict[str, Any]:
+        stats_path = os.path.splitext(self.report_path)[0] + f".{self.profile_stage}.prof"
+        os.makedirs(os.path.dirname(stats_path) or ".", exist_ok=True)
+        profile.dump_stats(stats_path)
+        stats = pstats.Stats(profile, stream=io.StringIO()).sort_stats("cumulative")
+        top = []
+        for func in stats.fcn_list[:self.top]:
+            cc, nc, tt, ct, _ = stats.stats[func]
+            top.append({"function": f"{func[0]}:{func[1]}({func[2]})", "calls": nc, "tottime_s": tt, "cumtime_s": ct})
+        return {"kind": "cprofile", "stats_file": stats_path, "top_cumulative": top}
+
+    def _tracemalloc_stats(self) -> Dict[str, Any]:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        top = [{"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+               for stat in snapshot.statistics("lineno")[:self.top]]
+        return {"kind": "tracemalloc", "traced_current_bytes": current, "traced_peak_bytes": peak, "top_lines": top}
+
+    # ---- report -----------------------------------------------------------
+    def report(self, **extra) -> Dict[str, Any]:
+        return {
+            "started_at": self._started_at,
+            "total_wall_s": time.perf_counter() - self._started,
+            # Equal to total_wall_s (minus overhead) for a sequential run, larger when stages overlapped
+            "stage_wall_sum_s": sum(s["wall_s"] for s in self.stages),
+            **extra,
+            "stages": self.stages,
+        }
+
+    def write(self, **extra) -> Optional[str]:
+        if not self.enabled:
+            return None
+        os.makedirs(os.path.dirname(self.report_path) or ".", exist_ok=True)
+        with open(self.report_path, "w") as f:
+            json.dump(self.report(**extra), f, indent=2, default=str)
+        logging.info(f"Run report written to {self.report_path}")
+        return self.report_path
@@ -0,0 +1,174 @@
+from __future__ import annotations
+import copy
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from data_pipeline.data_pipeline import DataPipeline, Stage
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.stage_cache import StageCache
+from data_pipeline.stage_profiler import StageProfiler
+from data_pipeline.stage_scheduler import StageScheduler
+
+class SweepRunner:
+    """
+    Runs the pipeline for every combination of a grid of config overrides,
+    computing each distinct stage once.
+
+    Stages are identified by their content key (DataPipeline.stage_keys: config
+    slice plus upstream keys). The ingestion/imputation/feature/split prefix that
+    no grid option touches has a single key for the whole sweep; an encode stage
+    is shared by the variants that differ only in resampling, and so on. The
+    union of the variants' stage graphs runs on one StageScheduler (by default a
+    process pool over all cores). Each variant's artifact writes are its own
+    stages and go to `<output_dir>/<variant>/`.
+    """
+    def __init__(self, config: Dict, grid: Dict[str, List[Any]], output_dir: str,
+                 workers: Optional[int] = None, executor: str = "process"):
+        if not grid:
+            raise ValueError("Sweep grid is empty.")
+        if config.get("execution", {}).get("mode", "in_memory") == "chunked":
+            raise ValueError("Sweeps run the in-memory pipeline; set execution.mode to 'in_memory'.")
+        self.config = config
+        self.grid = grid
+        self.output_dir = output_dir
+        self.scheduler = StageScheduler(max_workers=workers or os.cpu_count(), executor=executor)
+
+    @staticmethod
+    def from_config(config: Dict) -> "SweepRunner":
+        conf = config.get("sweep", {})
+        return SweepRunner(config, conf.get("grid") or {}, conf.get("output_dir", "artifacts_sweep"),
+                           workers=conf.get("workers"), executor=conf.get("executor", "process"))
+
+    # ---- variants ---------------------------------------------------------
+    @staticmethod
+    def variant_name(overrides: Dict[str, Any]) -> str:
+        return "_".join(f"{key.rsplit('.', 1)[-1]}-{str(value).lower()}" for key, value in overrides.items())
+
+    def variants(self) -> List[Tuple[str, Dict[str, Any], Dict]]:
+        """(name, overrides, config) per grid combination; artifacts are redirected to the variant's directory."""
+        out = []
+        for combo in itertools.product(*self.grid.values()):
+            overrides = dict(zip(self.grid.keys(), combo))
+            name = self.variant_name(overrides)
+            conf = copy.deepcopy(self.config)
+            for dotted, value in overrides.items():
+                section = conf
+                *parents, leaf = dotted.split(".")
+                for part in parents:
+                    section = section.setdefault(part, {})
+                section[leaf] = value
+            variant_dir = os.path.join(self.output_dir, name)
+            conf["artifacts"] = {key: os.path.join(variant_dir, os.path.basename(path)) if isinstance(path, str) and path else path
+                                 for key, path in conf["artifacts"].items()}
+            if conf.get("instrumentation", {}).get("report"):
+                conf["instrumentation"]["report"] = os.path.join(variant_dir, "run_report.json")
+            conf.pop("sweep", None)
+            out.append((name, overrides, conf))
+        return out
+
+    # ---- graph ------------------------------------------------------------
+    def _graph(self, variants: List[Tuple[str, Dict[str, Any], Dict]], cache: Optional[StageCache]):
+        """Union of the variants' stage graphs with one node per distinct stage key."""
+        digests: Dict[str, str] = {}
+
+        def file_digest(path: str) -> str:
+            if path not in digests:
+                digests[path] = cache.file_digest(path) if cache is not None else StageCache.sha256(path)
+            return digests[path]
+
+        nodes: Dict[str, Tuple[DataPipeline, Stage, str]] = {}
+        inputs: Dict[str, Dict[str, str]] = {}
+        targets: List[str] = []
+        for name, _, conf in variants:
+            pipeline = DataPipeline(conf)
+            stages = pipeline._stages()
+            producer = {out: s for s in stages for out in s.outputs}
+            keys = pipeline.stage_keys(file_digest)
+            # Artifact writes depend on the variant's paths, which the stage keys do not cover
+            node_of = {s.name: f"{s.name}@{name}" if set(s.outputs) & set(DataPipeline.SAVE_OUTPUTS)
+                       else f"{s.name}:{keys[s.name][:12]}" for s in stages}
+            for stage in stages:
+                node = node_of[stage.name]
+                if node not in nodes:
+                    nodes[node] = (pipeline, stage, keys[stage.name])
+                    inputs[node] = {i: node_of[producer[i].name] for i in stage.inputs}
+                if set(stage.outputs) & set(DataPipeline.SAVE_OUTPUTS):
+                    targets.append(node)
+
+        # Keep what the artifact writes need, stopping at stages available from the cache
+        graph: Dict[str, List[str]] = {}
+        hits: Set[str] = set()
+        pending = list(targets)
+        while pending:
+            node = pending.pop()
+            if node in graph:
+                continue
+            _, stage, key = nodes[node]
+            if cache is not None and stage.cacheable and cache.contains(stage.name, key):
+                hits.add(node)
+                graph[node] = []
+                continue
+            graph[node] = sorted(set(inputs[node].values()))
+            pending.extend(graph[node])
+        return graph, nodes, inputs, hits
+
+    # ---- run --------------------------------------------------------------
+    def run(self) -> Dict[str, Any]:
+        variants = self.variants()
+        cache = StageCache.from_config(self.config)
+        graph, nodes, inputs, hits = self._graph(variants, cache)
+        profiler = StageProfiler(report_path=os.path.join(self.output_dir, "sweep_report.json"))
+        results: Dict[str, Dict[str, Any]] = {}
+        consumers = {node: sum(node in deps for deps in graph.values()) for node in graph}
+        lock = threading.Lock()
+
+        def job(node: str) -> None:
+            pipeline, stage, key = nodes[node]
+            outputs = None
+            if node in hits:
+                with profiler.stage(node, cache="hit"):
+                    outputs = cache.load(stage.name, key)
+                if outputs is None:
+                    # Entry vanished since planning: let the variant's own resolver rebuild it
+                    outputs = pipeline._resolve(stage.outputs)
+            else:
+                ins = {i: results[src][i] for i, src in inputs[node].items()}
+                with profiler.stage(node, ins, cache="miss" if cache is not None and stage.cacheable else "off") as record:
+                    outputs = self.scheduler.call(stage.fn, **ins)
+                    record["outputs"] = StageProfiler.shapes(outputs)
+                    if cache is not None and stage.cacheable:
+                        cache.save(stage.name, key, outputs)
+            with lock:
+                results[node] = outputs
+                # Drop intermediate outputs once every stage reading them has finished
+                for src in graph[node]:
+                    consumers[src] -= 1
+                    if consumers[src] == 0:
+                        results.pop(src, None)
+
+        naive = len(variants) * len(DataPipeline(self.config).stage_names())
+        logging.info(f"Sweep: {len(variants)} variants, {len(graph)} stage runs instead of {naive}.")
+        start = time.perf_counter()
+        try:
+            self.scheduler.run(graph, job)
+        finally:
+            self.scheduler.shutdown()
+
+        summary = {
+            "grid": self.grid,
+            "wall_s": time.perf_counter() - start,
+            "stage_runs": len(graph),
+            "stage_runs_without_sharing": naive,
+            "cache_hits": sorted(hits),
+            "variants": [{"name": name, "overrides": overrides, "artifacts": conf["artifacts"]}
+                         for name, overrides, conf in variants],
+            "config_hash": ArtifactSaver.config_hash(self.config),
+        }
+        ArtifactSaver.save_json(os.path.join(self.output_dir, "sweep.json"), summary)
+        profiler.write(**{k: v for k, v in summary.items() if k != "variants"})
+        logging.info(f"Sweep finished in {summary['wall_s']:.1f}s; artifacts under {self.output_dir}")
+        return summary
@@ -0,0 +1,193 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+from typing import Any, Dict, List
+import joblib
+import numpy as np
+
+from data_pipeline.flat_trees import FlatTreeEnsemble
+
+class TreeEnsembleExporter:
+    """
+    Converts fitted binary tree classifiers into a FlatTreeEnsemble.
+
+    Supported: sklearn DecisionTree/RandomForest/ExtraTrees/GradientBoosting
+    classifiers, XGBoost XGBClassifier (binary:logistic, numeric splits; read
+    from the booster's JSON dump) and CatBoostClassifier (numeric oblivious
+    trees; read from its JSON export). The library of the source model is only
+    needed here, at export time.
+    """
+    @staticmethod
+    def export(model) -> FlatTreeEnsemble:
+        name = type(model).__name__
+        if name == "DecisionTreeClassifier":
+            return TreeEnsembleExporter._sklearn_forest(model, [model])
+        if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+            return TreeEnsembleExporter._sklearn_forest(model, model.estimators_)
+        if name == "GradientBoostingClassifier":
+            return TreeEnsembleExporter._sklearn_boosting(model)
+        if name == "XGBClassifier":
+            return TreeEnsembleExporter._xgboost(model)
+        if name == "CatBoostClassifier":
+            return TreeEnsembleExporter._catboost(model)
+        raise TypeError(f"Cannot export {name}; supported: sklearn trees/forests/gradient boosting, XGBoost, CatBoost")
+
+    # ---- sklearn ----------------------------------------------------------
+    @staticmethod
+    def _sklearn_nodes(tree, class_probability: bool) -> Dict[str, np.ndarray]:
+        t = tree.tree_
+        leaf = t.children_left == -1
+        if class_probability:
+            if t.value.shape[2] != 2:
+                raise ValueError("Only binary classifiers can be exported")
+            counts = t.value[:, 0, :]
+            value = counts[:, 1] / counts.sum(axis=1)
+        else:
+            value = t.value[:, 0, 0]
+        missing_left = getattr(t, "missing_go_to_left", np.zeros(t.node_count, dtype=np.uint8)).astype(bool)
+        return {
+            "feature": np.where(leaf, -1, t.feature),
+            # sklearn compares float32 features with float64 thresholds
+            "threshold": np.where(leaf, 0.0, FlatTreeEnsemble.float32_at_most(t.threshold)),
+            "left": t.children_left, "right": t.children_right,
+            "missing_left": missing_left & ~leaf,
+            "value": np.where(leaf, value, 0.0),
+        }
+
+    @staticmethod
+    def _sklearn_forest(model, trees) -> FlatTreeEnsemble:
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary classifiers can be exported")
+        nodes = [TreeEnsembleExporter._sklearn_nodes(tree, class_probability=True) for tree in trees]
+        return FlatTreeEnsemble.from_nodes(nodes, model.n_features_in_, combine="mean", link="identity",
+                                           source=type(model).__name__)
+
+    @staticmethod
+    def _sklearn_boosting(model) -> FlatTreeEnsemble:
+        if model.estimators_.shape[1] != 1:
+            raise ValueError("Only binary GradientBoostingClassifier can be exported")
+        base = float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+        nodes = [TreeEnsembleExporter._sklearn_nodes(tree, class_probability=False) for tree in model.estimators_[:, 0]]
+        return FlatTreeEnsemble.from_nodes(nodes, model.n_features_in_, combine="sum", base=base,
+                                           scale=model.learning_rate, link="logistic", source=type(model).__name__)
+
+    # ---- XGBoost ----------------------------------------------------------
+    @staticmethod
+    def _xgboost(model) -> FlatTreeEnsemble:
+        booster = model.get_booster()
+        config = json.loads(booster.save_config())
+        objective = config["learner"]["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Only binary:logistic XGBoost models can be exported, not {objective}")
+        base_score = float(config["learner"]["learner_model_param"]["base_score"])
+        names = booster.feature_names or []
+        index = {n: i for i, n in enumerate(names)}
+        dumps = booster.get_dump(dump_format="json")
+        try:
+            # predict_proba stops at the early-stopping iteration when there is one
+            per_round = int(config["learner"]["gradient_booster"]["gbtree_model_param"].get("num_parallel_tree", 1))
+            dumps = dumps[:(model.best_iteration + 1) * per_round]
+        except (AttributeError, KeyError, TypeError):
+            pass
+
+        def feature_of(split: str) -> int:
+            return index[split] if split in index else int(split.lstrip("f"))
+
+        trees = []
+        for dump in dumps:
+            flat: List[Dict[str, Any]] = []
+            pending = [json.loads(dump)]
+            while pending:
+                flat.append(pending.pop())
+                pending.extend(flat[-1].get("children", []))
+            position = {node["nodeid"]: i for i, node in enumerate(flat)}
+            tree = {k: np.zeros(len(flat)) for k in ("threshold", "value")}
+            tree.update({k: np.full(len(flat), -1) for k in ("feature", "left", "right")})
+            tree["missing_left"] = np.zeros(len(flat), dtype=bool)
+            for i, node in enumerate(flat):
+                if "leaf" in node:
+                    tree["value"][i] = node["leaf"]
+                    continue
+                if "split_condition" not in node:
+                    raise ValueError("Categorical XGBoost splits cannot be exported")
+                tree["feature"][i] = feature_of(node["split"])
+                # XGBoost sends x < split_condition to "yes" (compared in float32)
+                tree["threshold"][i] = FlatTreeEnsemble.float32_at_most(np.float32(node["split_condition"]), strict=True)
+                tree["left"][i], tree["right"][i] = position[node["yes"]], position[node["no"]]
+                tree["missing_left"][i] = node["missing"] == node["yes"]
+            trees.append(tree)
+        base = float(np.log(base_score / (1.0 - base_score)))
+        return FlatTreeEnsemble.from_nodes(trees, model.n_features_in_, combine="sum", base=base,
+                                           link="logistic", source="XGBClassifier")
+
+    # ---- CatBoost ---------------------------------------------------------
+    @staticmethod
+    def _catboost(model) -> FlatTreeEnsemble:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            model.save_model(path, format="json")
+            with open(path, "r") as f:
+                exported = json.load(f)
+        if "oblivious_trees" not in exported:
+            raise ValueError("Only CatBoost models with oblivious trees can be exported")
+        float_features = {f["feature_index"]: f for f in exported["features_info"].get("float_features", [])}
+        trees = []
+        for tree in exported["oblivious_trees"]:
+            splits = tree.get("splits", [])
+            if any(s.get("split_type", "FloatFeature") != "FloatFeature" for s in splits):
+                raise ValueError("Only numeric CatBoost splits can be exported (no categorical/CTR features)")
+            leaf_values = np.asarray(tree["leaf_values"], dtype=np.float64)
+            if len(leaf_values) != 2 ** len(splits):
+                raise ValueError("Only single-dimension (binary) CatBoost leaves can be exported")
+            trees.append(TreeEnsembleExporter._oblivious_nodes(splits, leaf_values, float_features))
+        scale, bias = exported.get("scale_and_bias", [1.0, [0.0]])
+        bias = float(bias[0]) if isinstance(bias, list) else float(bias)
+        return FlatTreeEnsemble.from_nodes(trees, len(model.feature_names_), combine="sum", base=bias,
+                                           scale=float(scale), link="logistic", source="CatBoostClassifier")
+
+    @staticmethod
+    def _oblivious_nodes(splits: List[Dict], leaf_values: np.ndarray, float_features: Dict[int, Dict]) -> Dict:
+        """Unroll an oblivious tree (one split per level, leaf index bit l = split l true) into explicit nodes."""
+        depth = len(splits)
+        n_internal = 2 ** depth - 1
+        n = n_internal + len(leaf_values)
+        tree = {"feature": np.full(n, -1), "threshold": np.zeros(n), "left": np.full(n, -1), "right": np.full(n, -1),
+                "missing_left": np.zeros(n, dtype=bool), "value": np.zeros(n)}
+        # Heap layout: internal node i at level l has children 2i+1 (split false) and 2i+2 (split true)
+        for i in range(n_internal):
+            level = int(np.floor(np.log2(i + 1)))
+            split = splits[level]
+            info = float_features.get(split["float_feature_index"], {})
+            tree["feature"][i] = info.get("flat_feature_index", split["float_feature_index"])
+            # CatBoost: x > border sets the bit (goes right)
+            tree["threshold"][i] = FlatTreeEnsemble.float32_at_most(np.float32(split["border"]))
+            tree["left"][i], tree["right"][i] = 2 * i + 1, 2 * i + 2
+            tree["missing_left"][i] = info.get("nan_value_treatment", "AsIs") != "AsTrue"
+        for i in range(n_internal, n):
+            # Path bits from the root: bit l is set when the level-l split went right
+            node, bits, level = i, 0, depth - 1
+            while node > 0:
+                parent = (node - 1) // 2
+                bits |= (node == 2 * parent + 2) << level
+                node, level = parent, level - 1
+            tree["value"][i] = leaf_values[bits]
+        return tree
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export pickled tree models to numpy-only .npz evaluators")
+    parser.add_argument("models", nargs="+", help="Pickled models, e.g. JoblibModels/decision_tree.pkl")
+    parser.add_argument("--output-dir", default=None, help="Default: next to each model as <name>.flat.npz")
+    args = parser.parse_args()
+    for path in args.models:
+        flat = TreeEnsembleExporter.export(joblib.load(path))
+        out_dir = args.output_dir or os.path.dirname(path)
+        out = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".flat.npz")
+        os.makedirs(out_dir or ".", exist_ok=True)
+        flat.save(out)
+        print(f"{path} -> {out} ({flat.info()})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import asyncio
+import logging
+import sys
+import yaml
+from data_pipeline.scoring_service import ScoringServer
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    with open("config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    # Optional model override: python serve.py JoblibModels/logistic_regression.pkl
+    model_path = sys.argv[1] if len(sys.argv) > 1 else None
+    server = ScoringServer.from_config(config, model_path)
+    asyncio.run(server.serve_forever())
@@ -0,0 +1,39 @@
+import pytest
+
+@pytest.fixture
+def pipeline_config(tmp_path):
+    out = tmp_path / "artifacts"
+    return {
+        "data": {
+            "file_path": "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv",
+            "drop_columns": ["customerID"],
+            "target_column": "Churn",
+            "target_mapping": {"Yes": 1, "No": 0}
+        },
+        "preprocessing": {
+            "missing_value_strategy": "median",
+            "numeric_to_coerce": ["TotalCharges"],
+            "encoding": "onehot",
+            "scaling": "standard",
+            "test_size": 0.2,
+            "random_state": 42,
+            "smote": False,
+            "service_columns": [
+                "OnlineSecurity", "OnlineBackup", "DeviceProtection",
+                "TechSupport", "StreamingTV", "StreamingMovies"
+            ],
+            "binning": {
+                "tenure_bins": [0, 12, 24, 48, 72],
+                "tenure_labels": ["New", "Established", "Loyal", "Very Loyal"]
+            },
+            "autopay_keywords": ["automatic", "bank transfer"]
+        },
+        "artifacts": {
+            "x_train": str(out / "X_train.npz"),
+            "y_train": str(out / "y_train.npz"),
+            "x_test": str(out / "X_test.npz"),
+            "y_test": str(out / "y_test.npz"),
+            "feature_names": str(out / "feature_names.npy"),
+            "preprocessor": str(out / "preprocessor.joblib"),
+        }
+    }
@@ -0,0 +1,46 @@
+import copy
+import pytest
+import numpy as np
+from scipy import sparse
+from data_pipeline.artifact_saver import ArtifactSaver, ArtifactLoader
+from data_pipeline.data_pipeline import DataPipeline
+
+def _with_artifacts(config, name, **artifact_opts):
+    config = copy.deepcopy(config)
+    for key, path in config["artifacts"].items():
+        config["artifacts"][key] = path.replace("artifacts", name)
+    config["artifacts"].update(artifact_opts)
+    return config
+
+def test_npy_format_matches_npz(pipeline_config):
+    npz_config = _with_artifacts(pipeline_config, "npz")
+    npy_config = _with_artifacts(pipeline_config, "npy", format="npy")
+    DataPipeline(npz_config).run()
+    DataPipeline(npy_config).run()
+
+    loader = ArtifactLoader.from_config(npy_config)
+    X_train = loader.load("x_train")
+    assert isinstance(X_train, np.memmap)
+    np.testing.assert_array_equal(X_train, ArtifactSaver.load_matrix(npz_config["artifacts"]["x_train"]))
+    np.testing.assert_array_equal(loader.load("y_test"), np.load(npz_config["artifacts"]["y_test"])["arr_0"])
+    assert loader.feature_names == list(np.load(npz_config["artifacts"]["feature_names"], allow_pickle=True))
+    assert loader.matches(npy_config)
+    assert not loader.matches(npz_config)
+
+def test_float32_storage(pipeline_config):
+    config = _with_artifacts(pipeline_config, "f32", format="npy", float32=True)
+    DataPipeline(config).run()
+    loader = ArtifactLoader.from_config(config)
+    assert loader.manifest["arrays"]["x_train"]["dtype"] == "float32"
+    assert loader.load("y_train").dtype == np.int64
+
+def test_chunked_sparse_npy_layout(pipeline_config):
+    config = _with_artifacts(pipeline_config, "csr", format="npy")
+    config["preprocessing"]["sparse"] = True
+    config["execution"] = {"mode": "chunked", "chunk_size": 2500}
+    DataPipeline(config).run()
+    loader = ArtifactLoader.from_config(config)
+    X_train = loader.load("x_train")
+    assert sparse.issparse(X_train)
+    assert X_train.shape == tuple(loader.manifest["arrays"]["x_train"]["shape"])
+    assert X_train.shape[0] == loader.load("y_train").shape[0]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_pipeline.batch_profiler import BatchProfiler
+from data_pipeline.drift_monitor import DriftMonitor
+
+def _frame(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "charges": rng.lognormal(4, 1, n),
+        "tenure": rng.integers(0, 73, n),
+        "contract": rng.choice(["Month-to-month", "One year", "Two year"], n, p=[0.55, 0.25, 0.2]),
+    })
+    df.loc[::40, "charges"] = np.nan
+    return df
+
+def test_merged_chunks_equal_single_pass():
+    df = _frame()
+    whole = BatchProfiler().update(df)
+    parts = [BatchProfiler().update(df.iloc[i:i + 3000]) for i in range(0, len(df), 3000)]
+    merged = parts[0]
+    for part in parts[1:]:
+        # Through JSON-compatible dicts, as profiles travel between workers and files
+        merged.merge(BatchProfiler.from_dict(part.to_dict()))
+    assert merged.rows == whole.rows
+    for col in ("charges", "tenure"):
+        a, b = merged.columns[col], whole.columns[col]
+        assert (a.count, a.nulls, a.positive, a.zeros) == (b.count, b.nulls, b.positive, b.zeros)
+        assert a.mean == pytest.approx(b.mean) and a.std == pytest.approx(b.std)
+    assert merged.columns["contract"].counts == whole.columns["contract"].counts
+
+def test_quantiles_within_relative_accuracy():
+    df = _frame()
+    profile = BatchProfiler(relative_accuracy=0.01).update(df)
+    charges = df["charges"].dropna()
+    for q in (0.05, 0.25, 0.5, 0.75, 0.99):
+        assert profile.columns["charges"].quantile(q) == pytest.approx(charges.quantile(q), rel=0.01 * 1.01)
+    # Few distinct values: the frequency table gives exact quantiles
+    assert profile.columns["tenure"].exact
+    assert profile.columns["tenure"].quantile(0.5) == df["tenure"].median()
+    assert profile.columns["charges"].std == pytest.approx(charges.std(ddof=0))
+
+def test_fill_values_match_pandas():
+    df = pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+    total = pd.to_numeric(df["TotalCharges"], errors="coerce")
+    profile = BatchProfiler(["TotalCharges"]).update(df)
+    assert profile.columns["TotalCharges"].nulls == total.isna().sum()
+    assert profile.fill_values("mean")["TotalCharges"] == pytest.approx(total.mean())
+    assert profile.fill_values("median")["TotalCharges"] == pytest.approx(total.median(), rel=0.005)
+    assert profile.fill_values("most_frequent")["TotalCharges"] == total.mode().iloc[0]
+
+def test_psi_flags_shifted_batch():
+    reference = _frame()
+    profile = DriftMonitor.profile(reference)
+    same = DriftMonitor(max_psi=0.25).check(_frame(seed=1), profile, {})
+    assert same["max_psi"] < 0.05 and not same["exceeded"]
+
+    shifted = _frame(seed=1)
+    shifted["contract"] = "Month-to-month"
+    shifted["charges"] *= 1.5
+    report = DriftMonitor(max_mean_shift=10.0, max_psi=0.25).check(shifted, profile, {})
+    assert report["psi"]["contract"] > 0.25 and report["psi"]["charges"] > 0.1
+    assert report["psi"]["tenure"] < 0.05
+    assert report["exceeded"]
+
+def test_parallel_profile_matches_serial(pipeline_config):
+    serial = BatchProfiler.profile_csv(pipeline_config, workers=1, chunk_size=2000)
+    parallel = BatchProfiler.profile_csv(pipeline_config, workers=2, chunk_size=2000)
+    assert parallel.rows == serial.rows == 7043
+    for col, sketch in serial.columns.items():
+        other = parallel.columns[col]
+        assert (other.kind, other.count, other.nulls) == (sketch.kind, sketch.count, sketch.nulls)
+        if sketch.kind == "numeric":
+            assert other.quantile(0.5) == sketch.quantile(0.5)
+            assert other.mean == pytest.approx(sketch.mean)
+        else:
+            assert other.counts == sketch.counts
+    assert parallel.psi(serial) == pytest.approx({col: 0.0 for col in serial.columns})
@@ -0,0 +1,53 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from data_pipeline.batch_transformer import BatchTransformer
+from data_pipeline.cli import main
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.scoring_service import ChurnScorer
+
+DATA = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+def _expected(config, path):
+    return ChurnScorer.load_preprocessor(config).transform(
+        ChurnScorer.load_preparer(config).features_only(pd.read_csv(path)))
+
+def test_split_covers_file_on_line_boundaries(tmp_path):
+    path = tmp_path / "rows.csv"
+    # No trailing newline on the last row
+    path.write_bytes(b"a,b\n" + b"\n".join(f"{i},{'x' * (i % 7)}".encode() for i in range(1000)))
+    header, ranges = BatchTransformer.split(str(path), chunk_size=64)
+    data = path.read_bytes()
+    assert header == b"a,b\n" and ranges[0][0] == len(header) and ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges[:-1])
+    assert sum(data[s:e].count(b"\n") for s, e in ranges) == 999
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shards_match_single_transform(pipeline_config, tmp_path, workers):
+    DataPipeline(pipeline_config).run()
+    records = pd.read_csv(DATA).drop(columns=["Churn"])
+    records.to_csv(tmp_path / "records.csv", index=False)
+
+    manifest = BatchTransformer(pipeline_config, workers=workers, chunk_size=900).run(
+        str(tmp_path / "records.csv"), str(tmp_path / "shards"))
+    assert len(manifest["shards"]) >= 7 and manifest["rows"] == len(records)
+    assert [s["path"] for s in manifest["shards"]] == [f"part-{i:05d}.npy" for i in range(len(manifest["shards"]))]
+    np.testing.assert_allclose(BatchTransformer.load(str(tmp_path / "shards")), _expected(pipeline_config, tmp_path / "records.csv"))
+
+def test_cli_directory_output_is_sharded(pipeline_config, tmp_path):
+    pipeline_config["preprocessing"]["sparse"] = True
+    DataPipeline(pipeline_config).run()
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(pipeline_config))
+    pd.read_csv(DATA).head(3000).to_csv(tmp_path / "records.csv", index=False)
+
+    out = tmp_path / "out"
+    assert main(["transform", str(tmp_path / "records.csv"), "-o", str(out), "--workers", "2",
+                 "--chunk-size", "1000", "--config", str(config_path)]) == 0
+    manifest = json.loads((out / "manifest.json").read_text())
+    assert manifest["workers"] == 2 and manifest["shards"][0]["path"].endswith(".npz")
+    X = BatchTransformer.load(str(out))
+    np.testing.assert_allclose(X.toarray(), _expected(pipeline_config, tmp_path / "records.csv").toarray())
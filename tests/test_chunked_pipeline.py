@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+import numpy as np
+from data_pipeline.artifact_saver import NpzStreamWriter
+from data_pipeline.chunked_pipeline import ChunkedDataPipeline
+from data_pipeline.config_validator import ConfigValidator
+
+@pytest.fixture
+def chunked_config(pipeline_config):
+    pipeline_config["execution"] = {"mode": "chunked", "chunk_size": 1500}
+    return pipeline_config
+
+def test_npz_stream_writer_matches_savez(tmp_path):
+    data = np.arange(30, dtype=np.float64).reshape(10, 3)
+    path = str(tmp_path / "x.npz")
+    with NpzStreamWriter(path, data.shape) as writer:
+        writer.write(data[:4])
+        writer.write(data[4:])
+    assert np.array_equal(np.load(path)["arr_0"], data)
+
+def test_npz_stream_writer_rejects_short_write(tmp_path):
+    writer = NpzStreamWriter(str(tmp_path / "x.npz"), (5, 2))
+    writer.write(np.zeros((3, 2)))
+    with pytest.raises(ValueError):
+        writer.close()
+
+def test_chunked_pipeline_writes_all_rows(chunked_config):
+    ChunkedDataPipeline(chunked_config).run()
+    art = chunked_config["artifacts"]
+    X_train = np.load(art["x_train"])["arr_0"]
+    X_test = np.load(art["x_test"])["arr_0"]
+    y_train = np.load(art["y_train"])["arr_0"]
+    feature_names = np.load(art["feature_names"], allow_pickle=True)
+
+    assert len(X_train) + len(X_test) == 7043
+    assert len(y_train) == len(X_train)
+    assert X_train.shape[1] == X_test.shape[1] == len(feature_names)
+    # Scaler was partial-fitted on exactly the train rows that were written
+    np.testing.assert_allclose(X_train[:, 0].mean(), 0.0, atol=1e-9)
+
+def test_chunked_pipeline_rejects_smote(chunked_config):
+    chunked_config["preprocessing"]["smote"] = True
+    with pytest.raises(ValueError):
+        ChunkedDataPipeline(chunked_config).run()
+
+def test_chunked_pipeline_rejects_small_chunks(chunked_config):
+    chunked_config["execution"]["chunk_size"] = 7
+    assert any("chunk_size" in p for p in ConfigValidator.validate(chunked_config, check_paths=False))
+    with pytest.raises(ValueError, match="chunk_size"):
+        ChunkedDataPipeline(chunked_config)
+    chunked_config["execution"]["mode"] = "in_memory"
+    assert ConfigValidator.validate(chunked_config, check_paths=False) == []
@@ -0,0 +1,86 @@
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from data_pipeline.cli import main
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.scoring_service import ChurnScorer
+
+DATA = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+MODEL_PATH = "JoblibModels/logistic_regression.pkl"
+# Cumulative -X importtime of the CLI plus the modules its light commands use; sklearn alone costs more
+IMPORT_BUDGET_S = 1.5
+HEAVY = ("sklearn", "imblearn", "scipy")
+
+def _write_config(config, tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+def _importtime(args):
+    """Top-level packages imported by `python -X importtime <args>` and their total import time in seconds."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules, total_us = set(), 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return modules, total_us / 1e6
+
+def test_light_modules_import_within_budget():
+    modules, total_s = _importtime(
+        ["-c", "import data_pipeline.cli, data_pipeline.data_pipeline, data_pipeline.scoring_service"])
+    assert not modules & set(HEAVY), f"eagerly imported: {modules & set(HEAVY)}"
+    assert total_s < IMPORT_BUDGET_S, f"import took {total_s:.2f}s (budget {IMPORT_BUDGET_S}s)"
+
+def test_validate_command_skips_pandas(pipeline_config, tmp_path, capsys):
+    path = _write_config(pipeline_config, tmp_path)
+    modules, _ = _importtime(["-m", "data_pipeline.cli", "validate", "--config", path])
+    assert "pandas" not in modules
+    assert main(["validate", "--config", path]) == 0
+
+    pipeline_config["preprocessing"]["encoding"] = "bogus"
+    pipeline_config["preprocessing"]["test_size"] = 2
+    pipeline_config["data"]["file_path"] = str(tmp_path / "missing.csv")
+    del pipeline_config["artifacts"]["x_test"]
+    assert main(["validate", "--config", _write_config(pipeline_config, tmp_path)]) == 1
+    out = capsys.readouterr().out
+    for problem in ("preprocessing.encoding", "test_size", "missing.csv", "artifacts.x_test"):
+        assert problem in out
+
+def test_transform_and_score_match_scorer(pipeline_config, tmp_path, capsys):
+    pipeline_config["preprocessing"]["service_columns"] = [
+        "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup",
+        "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"
+    ]
+    DataPipeline(pipeline_config).run()
+    path = _write_config(pipeline_config, tmp_path)
+    records = pd.read_csv(DATA).head(25)
+    records.to_csv(tmp_path / "records.csv", index=False)
+
+    assert main(["transform", str(tmp_path / "records.csv"), "-o", str(tmp_path / "X.npy"), "--config", path]) == 0
+    scorer = ChurnScorer(pipeline_config, MODEL_PATH)
+    expected = scorer.preprocessor.transform(scorer.preparer.features_only(records.copy()))
+    np.testing.assert_allclose(np.load(tmp_path / "X.npy"), expected)
+
+    out_csv = tmp_path / "scores.csv"
+    assert main(["score", str(tmp_path / "records.csv"), "--model", MODEL_PATH, "-o", str(out_csv), "--config", path]) == 0
+    scores = pd.read_csv(out_csv)
+    assert list(scores.columns) == ["customerID", "churn_probability", "churn_prediction"]
+    assert scores["customerID"].tolist() == records["customerID"].tolist()
+    np.testing.assert_allclose(scores["churn_probability"], scorer.score(records.copy()))
+
+def test_flags_without_subcommand_mean_run(pipeline_config, tmp_path, capsys):
+    assert main(["--stage", "clean", "--config", _write_config(pipeline_config, tmp_path)]) == 0
+    assert "Stage 'clean' done" in capsys.readouterr().out
+
+def test_bench_lists_benchmarks(capsys):
+    assert main(["bench"]) == 0
+    assert "scoring_service" in capsys.readouterr().out
+    assert main(["bench", "does_not_exist"]) == 1
@@ -0,0 +1,67 @@
+import copy
+import pytest
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from data_pipeline.feature_preparer import FeaturePreparer
+from data_pipeline.feature_encoding import PreprocessorFactory
+from data_pipeline.compiled_transformer import CompiledPreprocessor
+
+@pytest.fixture(scope="module")
+def prepared():
+    config = {
+        "data": {"drop_columns": ["customerID"], "target_column": "Churn", "target_mapping": {"Yes": 1, "No": 0},
+                 "file_path": "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"},
+        "preprocessing": {
+            "missing_value_strategy": "median", "numeric_to_coerce": ["TotalCharges"],
+            "service_columns": ["PhoneService", "OnlineSecurity", "OnlineBackup", "TechSupport"],
+            "autopay_keywords": ["automatic"],
+            "binning": {"tenure_bins": [0, 12, 24, 48, 72], "tenure_labels": ["New", "Established", "Loyal", "Very Loyal"]},
+        }
+    }
+    X = FeaturePreparer(config, {"TotalCharges": 1397.475}).features_only(
+        pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"))
+    X["gender"] = X["gender"].astype(object)
+    X.loc[3, "gender"] = "Other"       # unseen category
+    X.loc[5, "gender"] = np.nan        # missing
+    X.loc[6, "gender"] = None
+    return config, X
+
+def _fit(config, X, **prep):
+    config = copy.deepcopy(config)
+    config["preprocessing"].update(prep)
+    numeric = list(X.select_dtypes(include=["int64", "float64"]).columns)
+    categorical = list(X.select_dtypes(include=["object", "category"]).columns)
+    # Fit on rows without the oddities so they are unknown at transform time
+    return PreprocessorFactory.create(numeric, categorical, config).fit(X.iloc[10:])
+
+@pytest.mark.parametrize("encoding", ["onehot", "label", "onehot_topk", "hashing"])
+@pytest.mark.parametrize("scaling", ["standard", "minmax"])
+@pytest.mark.parametrize("sparse_output", [False, True])
+@pytest.mark.parametrize("n_rows", [1, 10, 1000])
+def test_bit_identical(prepared, encoding, scaling, sparse_output, n_rows):
+    config, X = prepared
+    preprocessor = _fit(config, X, encoding=encoding, scaling=scaling, sparse=sparse_output)
+    compiled = CompiledPreprocessor.from_fitted(preprocessor)
+    batch = X.iloc[:n_rows]
+    expected, actual = preprocessor.transform(batch), compiled.transform(batch)
+    assert sparse.issparse(expected) == sparse.issparse(actual)
+    if sparse.issparse(expected):
+        expected, actual = expected.toarray(), actual.toarray()
+    assert expected.dtype == actual.dtype and expected.shape == actual.shape
+    assert expected.tobytes() == actual.tobytes()
+
+def test_nan_seen_in_fit(prepared):
+    config, X = prepared
+    for encoding in ("onehot", "label", "onehot_topk", "hashing"):
+        preprocessor = _fit(config, X.iloc[::-1], encoding=encoding, scaling="standard",
+                            onehot_topk={"max_categories": 3}, hashing={"n_features": 8})
+        compiled = CompiledPreprocessor.from_fitted(preprocessor)
+        assert preprocessor.transform(X.iloc[:200]).tobytes() == compiled.transform(X.iloc[:200]).tobytes()
+
+def test_save_load_roundtrip(prepared, tmp_path):
+    config, X = prepared
+    compiled = CompiledPreprocessor.from_fitted(_fit(config, X, encoding="onehot", scaling="standard"))
+    compiled.save(str(tmp_path / "compiled.joblib"))
+    loaded = CompiledPreprocessor.load(str(tmp_path / "compiled.joblib"))
+    np.testing.assert_array_equal(loaded.transform(X.iloc[:50]), compiled.transform(X.iloc[:50]))
@@ -0,0 +1,48 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import average_precision_score, f1_score, roc_auc_score
+from data_pipeline.cross_validator import CrossValidator
+from data_pipeline.evaluation_metrics import BinaryMetrics
+
+@pytest.mark.parametrize("decimals", [None, 1])
+def test_metrics_match_sklearn(decimals):
+    rng = np.random.default_rng(0)
+    y = rng.random(2000) < 0.3
+    scores = rng.random(2000) * 0.7 + y * 0.3
+    if decimals is not None:
+        scores = np.round(scores, decimals)
+    m = BinaryMetrics.evaluate(y, scores, threshold=0.5)
+    assert m["ROC_AUC"] == pytest.approx(roc_auc_score(y, scores))
+    assert m["PR_AUC"] == pytest.approx(average_precision_score(y, scores))
+    assert m["F1"] == pytest.approx(f1_score(y, scores >= 0.5))
+    assert m["best_F1"] >= m["F1"]
+
+def test_metrics_threshold_above_all_scores():
+    m = BinaryMetrics.evaluate([0, 1, 1], [0.1, 0.2, 0.3], threshold=0.9)
+    assert m["Precision"] == m["Recall"] == m["F1"] == 0.0
+    assert m["ROC_AUC"] == 1.0
+
+def test_cross_validation_with_fold_cache(pipeline_config, tmp_path, monkeypatch):
+    pipeline_config["cache"] = {"enabled": True, "dir": str(tmp_path / "cache")}
+    models = CrossValidator.load_models([
+        {"name": "Logistic Regression", "estimator": "sklearn.linear_model.LogisticRegression", "params": {"max_iter": 1000}},
+        {"name": "Decision Tree", "pickle": "JoblibModels/decision_tree.pkl"},
+        {"name": "Missing", "estimator": "not_installed_lib.Model"},
+    ])
+    assert list(models) == ["Logistic Regression", "Decision Tree"]
+    cv = CrossValidator(pipeline_config, models, n_splits=3, n_jobs=2)
+    per_fold = cv.run()
+    assert len(per_fold) == 2 * 4
+    assert set(per_fold["fold"]) == {"fold0", "fold1", "fold2", "holdout"}
+    summary = pd.read_csv(os.path.join(cv.output_dir, "cv_results.csv"))
+    assert list(summary["Model"]) == ["Logistic Regression", "Decision Tree"]
+    assert {"ROC_AUC", "ROC_AUC_std", "holdout_PR_AUC"} <= set(summary.columns)
+    assert summary.loc[0, "ROC_AUC"] > 0.8
+
+    # Second run: every fold comes from the cache, so nothing is re-encoded
+    import data_pipeline.cross_validator as module
+    monkeypatch.setattr(module, "_build_fold", lambda *a: pytest.fail("fold rebuilt"))
+    rerun = CrossValidator(pipeline_config, models, n_splits=3, n_jobs=1).run()
+    pd.testing.assert_frame_equal(rerun[["Model", "fold", "ROC_AUC"]], per_fold[["Model", "fold", "ROC_AUC"]])
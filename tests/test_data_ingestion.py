@@ -51,3 +51,35 @@ def test_validate_columns():
     
     with pytest.raises(ValueError):
         DataIngestion.validate_columns(df, ['A', 'C'])
+
+
+@pytest.fixture
+def schema_config(sample_config):
+    sample_config["data"]["schema"] = {
+        "usecols": ["gender", "tenure", "PaymentMethod", "TotalCharges", "Churn"],
+        "na_values": [" "],
+        "dtypes": {"gender": "category", "tenure": "int64", "PaymentMethod": "category",
+                   "TotalCharges": "float64", "Churn": "category"},
+    }
+    return sample_config
+
+def test_load_data_applies_schema(schema_config):
+    df = DataIngestion(schema_config).load_data()
+    assert list(df.columns) == schema_config["data"]["schema"]["usecols"]
+    assert isinstance(df["gender"].dtype, pd.CategoricalDtype)
+    assert df["TotalCharges"].dtype == np.float64
+    # Blank TotalCharges cells parse straight to NaN
+    assert df["TotalCharges"].isna().sum() == 11
+
+    cleaned = DataIngestion(schema_config).basic_clean(df)
+    assert set(cleaned["Churn"].unique()) == {0, 1}
+
+def test_iter_chunks_applies_schema(schema_config):
+    chunks = list(DataIngestion(schema_config).iter_chunks(3000))
+    assert sum(len(c) for c in chunks) == 7043
+    assert all(isinstance(c["PaymentMethod"].dtype, pd.CategoricalDtype) for c in chunks)
+
+def test_pyarrow_engine_is_optional(schema_config):
+    schema_config["data"]["schema"]["engine"] = "pyarrow"
+    df = DataIngestion(schema_config).load_data()
+    assert len(df) == 7043
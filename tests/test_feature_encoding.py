@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_pipeline.category_hasher import CategoryHasher
+from data_pipeline.chunked_pipeline import ChunkedDataPipeline
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.drift_monitor import DriftMonitor
+from data_pipeline.feature_encoding import HashingEncoder, TopKOneHotEncoder
+
+@pytest.fixture
+def high_cardinality():
+    rng = np.random.default_rng(0)
+    # Zipf-like column with hundreds of categories plus missing values, and a small one
+    city = pd.Series([f"city{int(v)}" for v in rng.zipf(1.5, 5000) % 400], dtype=object)
+    city[rng.choice(5000, 50, replace=False)] = np.nan
+    return pd.DataFrame({"city": city, "plan": rng.choice(["a", "b"], 5000)})
+
+def test_topk_caps_width_and_routes_rare_to_other(high_cardinality):
+    X = high_cardinality
+    encoder = TopKOneHotEncoder(max_categories=10).fit(X)
+    names = list(encoder.get_feature_names_out(["city", "plan"]))
+    assert len(names) == 10 + 3
+    assert names[9] == "city_other" and names[-3:] == ["plan_a", "plan_b", "plan_other"]
+    counts = X["city"].value_counts(dropna=False)
+    assert set(encoder.categories_[0]) == set(counts.index[:9])
+
+    out = encoder.transform(pd.DataFrame({"city": ["city1", "never-seen", counts.index[-1]], "plan": ["a", "c", "b"]}))
+    assert out.sum(axis=1).tolist() == [2, 2, 2]
+    assert out[1, 9] == 1 and out[2, 9] == 1 and out[1, 12] == 1
+
+    # min_frequency also moves categories below the floor to "other"
+    floor = TopKOneHotEncoder(max_categories=50, min_frequency=0.05).fit(X)
+    assert all(counts[c] >= 0.05 * len(X) for c in floor.categories_[0])
+
+def test_hashing_width_is_fixed_and_stable(high_cardinality):
+    X = high_cardinality
+    encoder = HashingEncoder(n_features=16).fit(X)
+    out = encoder.transform(X)
+    assert out.shape == (len(X), 16)
+    assert (out.sum(axis=1) == 2).all()
+    # Unseen categories still land in a bucket, the same one in every process
+    unseen = encoder.transform(pd.DataFrame({"city": ["brand-new"], "plan": ["a"]}))
+    assert unseen[0, CategoryHasher.bucket("city", "brand-new", 16)] >= 1
+    names = encoder.get_feature_names_out()
+    assert len(set(names)) == 16 and all(n.startswith("hash_") for n in names)
+    assert any("plan=a" in n for n in names)
+
+@pytest.mark.parametrize("encoding, options, n_cat_outputs", [
+    ("onehot_topk", {"max_categories": 3}, None),
+    ("hashing", {"n_features": 12}, 12),
+])
+def test_pipeline_with_bounded_encoders(pipeline_config, encoding, options, n_cat_outputs):
+    pipeline_config["preprocessing"].update({"encoding": encoding, encoding: options})
+    out = DataPipeline(pipeline_config)._resolve(["X_train_proc", "X_train", "feature_names", "preprocessor"])
+    numeric = list(out["X_train"].select_dtypes(include=["int64", "float64"]).columns)
+    categorical = list(out["X_train"].select_dtypes(include=["object", "category"]).columns)
+    if n_cat_outputs is None:
+        n_cat_outputs = sum(min(out["X_train"][c].nunique(dropna=False), 2) + 1 for c in categorical)
+        assert "Contract_other" in out["feature_names"]
+    assert out["X_train_proc"].shape[1] == len(out["feature_names"]) == len(numeric) + n_cat_outputs
+    # Drift checks see every training category for top-k and skip hashing
+    categories = DriftMonitor.encoder_categories(out["preprocessor"])
+    if encoding == "onehot_topk":
+        assert set(categories["PaymentMethod"]) == set(out["X_train"]["PaymentMethod"].unique())
+    else:
+        assert categories == {}
+
+def test_chunked_topk_uses_counts_over_all_chunks(pipeline_config):
+    pipeline_config["preprocessing"].update({"encoding": "onehot_topk", "onehot_topk": {"max_categories": 2}})
+    pipeline_config["execution"] = {"mode": "chunked", "chunk_size": 1500}
+    DataPipeline(pipeline_config).run()
+    names = list(np.load(pipeline_config["artifacts"]["feature_names"], allow_pickle=True))
+    # Most frequent payment method over the whole file, not just the first chunk
+    assert "PaymentMethod_Electronic check" in names and "PaymentMethod_other" in names
+    assert len(np.load(pipeline_config["artifacts"]["x_train"])["arr_0"][0]) == len(names)
@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+import numpy as np
+from data_pipeline.feature_engine import FeatureEngine
+
+@pytest.fixture
+def feature_config():
+    return {
+        "preprocessing": {
+            "service_columns": [
+                "PhoneService", "OnlineSecurity", "OnlineBackup", "DeviceProtection",
+                "TechSupport", "StreamingTV", "StreamingMovies"
+            ],
+            "autopay_keywords": ["automatic", "bank transfer"],
+            "binning": {
+                "tenure_bins": [0, 12, 24, 48, 72],
+                "tenure_labels": ["New", "Established", "Loyal", "Very Loyal"]
+            }
+        }
+    }
+
+@pytest.fixture
+def telco_df():
+    return pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+def test_vectorized_matches_legacy(feature_config, telco_df):
+    legacy = FeatureEngine.stage_for(feature_config)(telco_df.copy())
+    vectorized = FeatureEngine.stage_for({**feature_config, "features": {"engine": "vectorized"}})(telco_df.copy())
+    pd.testing.assert_frame_equal(legacy, vectorized)
+
+def test_missing_service_column_filled_like_legacy(feature_config, telco_df):
+    df = telco_df.drop(columns=["PhoneService"])
+    legacy = FeatureEngine.stage_for(feature_config)(df.copy())
+    vectorized = FeatureEngine.from_config(feature_config).transform(df.copy())
+    pd.testing.assert_frame_equal(legacy, vectorized)
+
+def test_binning_right_closed():
+    engine = FeatureEngine([
+        {"name": "Bucket", "kind": "binning", "column": "x", "bins": [0, 10, 20], "labels": ["lo", "hi"], "right": True}
+    ])
+    df = engine.transform(pd.DataFrame({"x": [0.0, 5.0, 10.0, 15.0, 20.0, np.nan]}))
+    expected = pd.cut(df["x"], bins=[0, 10, 20], labels=["lo", "hi"], right=True)
+    pd.testing.assert_series_equal(df["Bucket"], expected, check_names=False)
+
+def test_flag_on_categorical_dtype():
+    engine = FeatureEngine([{"name": "F", "kind": "flag", "column": "c", "contains_any": ["AUTO"], "case": False}])
+    df = engine.transform(pd.DataFrame({"c": pd.Categorical(["Auto pay", "cash", None, "auto"])}))
+    assert df["F"].tolist() == [1, 0, 0, 1]
+
+def test_unknown_kind_raises():
+    with pytest.raises(ValueError):
+        FeatureEngine([{"name": "X", "kind": "polynomial"}])
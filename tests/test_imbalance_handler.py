@@ -0,0 +1,82 @@
+import json
+import os
+import numpy as np
+import pytest
+from scipy import sparse
+from imblearn.over_sampling import SMOTE
+from data_pipeline.imbalance_handler import ImbalanceHandler
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.chunked_pipeline import ChunkedDataPipeline
+
+@pytest.fixture
+def imbalanced():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 12))
+    y = (rng.random(2000) < 0.25).astype(np.int64)
+    return X, y
+
+@pytest.mark.parametrize("kwargs", [{}, {"n_jobs": 2}, {"knn_backend": "batched", "batch_size": 100}])
+def test_exact_backends_match_default_smote(imbalanced, kwargs):
+    X, y = imbalanced
+    expected_X, expected_y = SMOTE(random_state=42).fit_resample(X, y)
+    X_res, y_res = ImbalanceHandler(random_state=42, **kwargs).fit_resample(X, y)
+    np.testing.assert_array_equal(X_res, expected_X)
+    np.testing.assert_array_equal(y_res, expected_y)
+
+@pytest.mark.parametrize("kwargs", [
+    {"knn_backend": "approximate", "n_components": 4},
+    {"max_minority_samples": 100},
+    {"strategy": "random_oversample"},
+])
+def test_strategies_balance_classes(imbalanced, kwargs):
+    X, y = imbalanced
+    X_res, y_res = ImbalanceHandler(random_state=42, **kwargs).fit_resample(X, y)
+    counts = np.bincount(y_res)
+    assert counts[0] == counts[1] == np.bincount(y)[0]
+    # Original rows come first and are untouched
+    np.testing.assert_array_equal(X_res[:len(y)], X)
+
+def test_capped_smote_keeps_csr(imbalanced):
+    X, y = imbalanced
+    X_res, y_res = ImbalanceHandler(random_state=42, max_minority_samples=100).fit_resample(sparse.csr_matrix(X), y)
+    assert sparse.isspmatrix_csr(X_res)
+    assert X_res.shape == (len(y_res), X.shape[1])
+
+def test_class_weight_skips_resampling(imbalanced):
+    X, y = imbalanced
+    handler = ImbalanceHandler(strategy="class_weight")
+    X_res, y_res = handler.fit_resample(X, y)
+    assert X_res is X and y_res is y
+    counts = np.bincount(y)
+    assert handler.class_weights_[1] == pytest.approx(len(y) / (2 * counts[1]))
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ImbalanceHandler(strategy="adasyn")
+
+def test_pipeline_class_weight(pipeline_config):
+    pipeline_config["preprocessing"]["smote"] = True
+    pipeline_config["preprocessing"]["resampling"] = {"strategy": "class_weight"}
+    DataPipeline(pipeline_config).run()
+    art = pipeline_config["artifacts"]
+    assert np.load(art["y_train"])["arr_0"].shape == (5634,)
+    with open(os.path.join(os.path.dirname(art["preprocessor"]), "class_weights.json")) as f:
+        weights = json.load(f)
+    assert set(weights) == {"0", "1"} and weights["1"] > weights["0"]
+
+def test_chunked_class_weight_matches_in_memory_counts(pipeline_config):
+    pipeline_config["preprocessing"]["smote"] = True
+    pipeline_config["preprocessing"]["resampling"] = {"strategy": "class_weight"}
+    pipeline_config["execution"] = {"mode": "chunked", "chunk_size": 100_000}
+    ChunkedDataPipeline(pipeline_config).run()
+    with open(os.path.join(os.path.dirname(pipeline_config["artifacts"]["preprocessor"]), "class_weights.json")) as f:
+        weights = json.load(f)
+    y_train = np.load(pipeline_config["artifacts"]["y_train"])["arr_0"]
+    expected = ImbalanceHandler.balanced_weights(y_train)
+    assert weights == pytest.approx({str(c): w for c, w in expected.items()})
+
+def test_chunked_rejects_random_oversample(pipeline_config):
+    pipeline_config["preprocessing"]["smote"] = True
+    pipeline_config["preprocessing"]["resampling"] = {"strategy": "random_oversample"}
+    with pytest.raises(ValueError):
+        ChunkedDataPipeline(pipeline_config).run()
@@ -0,0 +1,93 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from data_pipeline.artifact_saver import ArtifactSaver, ArtifactLoader
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.incremental_pipeline import IncrementalDataPipeline
+
+SOURCE = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+@pytest.fixture
+def extracts(tmp_path):
+    df = pd.read_csv(SOURCE, dtype=str, keep_default_na=False)
+    paths = {}
+    for name, part in (("base", df.iloc[:6000]), ("new", df.iloc[6000:6500]), ("newer", df.iloc[6500:])):
+        paths[name] = str(tmp_path / f"{name}.csv")
+        part.to_csv(paths[name], index=False)
+    return paths
+
+@pytest.fixture
+def base_config(pipeline_config, extracts):
+    pipeline_config["data"]["file_path"] = extracts["base"]
+    pipeline_config["artifacts"]["format"] = "npy"
+    return pipeline_config
+
+def _rows(config, name):
+    return ArtifactLoader.from_config(config).load(name).shape[0]
+
+def test_append_npy_grows_in_place(tmp_path):
+    path = str(tmp_path / "a.npy")
+    np.save(path, np.arange(6, dtype=np.float32).reshape(3, 2))
+    ArtifactSaver.append_npy(path, np.ones((2, 2)))
+    out = np.load(path)
+    assert out.dtype == np.float32 and out.shape == (5, 2)
+    np.testing.assert_array_equal(out[3:], 1)
+    with pytest.raises(ValueError):
+        ArtifactSaver.append_npy(path, np.ones((1, 3)))
+
+def test_append_extends_artifacts(base_config, extracts):
+    DataPipeline(base_config).run()
+    X_before = np.array(ArtifactLoader.from_config(base_config).load("x_train"))
+    n_test = _rows(base_config, "y_test")
+
+    result = IncrementalDataPipeline(base_config).append(extracts["new"])
+    assert result["action"] == "appended"
+    X_after = ArtifactLoader.from_config(base_config).load("x_train")
+    assert len(X_after) == _rows(base_config, "y_train") == len(X_before) + result["train_rows"]
+    assert _rows(base_config, "y_test") == n_test + result["test_rows"]
+    assert result["train_rows"] + result["test_rows"] == 500
+    np.testing.assert_array_equal(X_after[:len(X_before)], X_before)
+
+    # The same extract again is recognised by its hash
+    assert IncrementalDataPipeline(base_config).append(extracts["new"])["action"] == "skipped"
+    with open(ArtifactSaver.incremental_state_path(base_config["artifacts"])) as f:
+        state = json.load(f)
+    assert [e["path"] for e in state["appended"]] == [extracts["new"]]
+
+def test_npz_artifacts_are_not_appendable(base_config):
+    base_config["artifacts"]["format"] = "npz"
+    with pytest.raises(ValueError, match="npy"):
+        IncrementalDataPipeline(base_config)
+
+@pytest.mark.parametrize("strategy", ["smote", "random_oversample"])
+def test_resampled_training_set_is_refit(base_config, extracts, strategy):
+    base_config["preprocessing"]["smote"] = True
+    base_config["preprocessing"]["resampling"] = {"strategy": strategy}
+    DataPipeline(base_config).run()
+    result = IncrementalDataPipeline(base_config).append(extracts["new"])
+    assert result["action"] == "refit" and result["reason"] == "resampling"
+    # Rebuilt from both files and oversampled as a whole: the classes are balanced again
+    y_train = np.asarray(ArtifactLoader.from_config(base_config).load("y_train"))
+    assert (y_train == 1).sum() == (y_train == 0).sum()
+    assert _rows(base_config, "y_test") == round(6500 * 0.2)
+
+def test_unseen_category_triggers_refit(base_config, extracts, tmp_path):
+    DataPipeline(base_config).run()
+    df = pd.read_csv(extracts["new"], dtype=str, keep_default_na=False)
+    df.loc[df.index[:100], "PaymentMethod"] = "Crypto wallet"
+    drifted = str(tmp_path / "drifted.csv")
+    df.to_csv(drifted, index=False)
+
+    result = IncrementalDataPipeline(base_config).append(drifted)
+    assert result["action"] == "refit" and result["reason"] == "drift"
+    assert result["drift"]["new_category_rows"] == {"PaymentMethod": 100}
+    assert _rows(base_config, "y_train") + _rows(base_config, "y_test") == 6500
+    # The refit preprocessor knows the new category, so later extracts append again
+    assert IncrementalDataPipeline(base_config).append(extracts["newer"])["action"] == "appended"
+
+def test_force_refit(base_config, extracts):
+    DataPipeline(base_config).run()
+    base_config["incremental"] = {"force_refit": True}
+    result = IncrementalDataPipeline(base_config).append(extracts["new"])
+    assert result["action"] == "refit" and result["reason"] == "force_refit"
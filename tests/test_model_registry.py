@@ -0,0 +1,91 @@
+import json
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.model_registry import ModelRegistry
+from data_pipeline.scoring_service import ChurnScorer
+from data_pipeline.tree_exporter import TreeEnsembleExporter
+
+MODEL_PATH = "JoblibModels/logistic_regression.pkl"
+
+@pytest.fixture
+def registry_config(pipeline_config, tmp_path):
+    # Full service list so the preprocessor output matches the 54 features the models were trained on
+    pipeline_config["preprocessing"]["service_columns"] = [
+        "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup",
+        "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"
+    ]
+    DataPipeline(pipeline_config).run()
+    pipeline_config["serving"] = {"model_path": MODEL_PATH}
+    pipeline_config["registry"] = {"path": str(tmp_path / "registry"), "max_loaded": 2}
+    return pipeline_config
+
+@pytest.fixture
+def raw_frame():
+    return pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv").head(50).drop(columns=["Churn"])
+
+def test_register_and_load_roundtrip(registry_config):
+    registry = ModelRegistry.from_config(registry_config)
+    assert registry.register_artifacts("churn", MODEL_PATH, registry_config, metrics={"auc": 0.8}) == 1
+    assert registry.register_artifacts("churn", MODEL_PATH, registry_config) == 2
+    assert registry.names() == ["churn"] and registry.versions("churn") == [1, 2]
+
+    meta = registry.meta("churn", 1)
+    art = registry_config["artifacts"]
+    feature_names = list(np.load(art["feature_names"], allow_pickle=True))
+    assert meta["config_hash"] == ArtifactSaver.config_hash(registry_config)
+    assert meta["feature_signature"] == ModelRegistry.feature_signature(feature_names)
+    assert meta["metrics"] == {"auc": 0.8} and meta["fill_values"].keys() == {"TotalCharges"}
+
+    entry = registry.load("churn")
+    assert entry.version == 2 and entry.uri == "registry:churn:2"
+    X_test = ArtifactSaver.load_array(art["x_test"])
+    np.testing.assert_array_equal(entry.model.predict_proba(X_test), joblib.load(MODEL_PATH).predict_proba(X_test))
+
+def test_lru_hits_and_evictions(registry_config):
+    registry = ModelRegistry.from_config(registry_config)
+    for _ in range(3):
+        registry.register_artifacts("churn", MODEL_PATH, registry_config)
+    first = registry.load("churn", 1)
+    assert registry.load("churn", 1) is first
+    registry.load("churn", 2)
+    registry.load("churn", 3)  # max_loaded=2: version 1 is the least recently used
+    stats = registry.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert [e["model"] for e in stats["loaded"]] == ["registry:churn:2", "registry:churn:3"]
+    assert registry.load("churn", 1) is not first
+
+def test_register_rejects_feature_mismatch(registry_config):
+    registry = ModelRegistry.from_config(registry_config)
+    with pytest.raises(ValueError, match="features"):
+        registry.register("churn", joblib.load(MODEL_PATH), joblib.load(registry_config["artifacts"]["preprocessor"]),
+                          ["a", "b"], registry_config)
+    assert registry.names() == []
+
+def test_scorer_on_registered_model_matches_file_model(registry_config, raw_frame):
+    ModelRegistry.from_config(registry_config).register_artifacts("churn", MODEL_PATH, registry_config)
+    scorer = ChurnScorer(registry_config, "registry:churn")
+    assert scorer.model_path == "registry:churn:1"
+    np.testing.assert_allclose(scorer.score(raw_frame), ChurnScorer(registry_config).score(raw_frame))
+    # A second scorer of the same version reuses the loaded objects
+    assert ChurnScorer(registry_config, "registry:churn:1").model is scorer.model
+    assert scorer.registry.stats()["hits"] == 1
+
+def test_exported_trees_are_memory_mapped(registry_config):
+    art = registry_config["artifacts"]
+    X_train, y_train = ArtifactSaver.load_array(art["x_train"]), ArtifactSaver.load_array(art["y_train"])
+    forest = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X_train, y_train)
+    flat = TreeEnsembleExporter.export(forest)
+    feature_names = list(np.load(art["feature_names"], allow_pickle=True))
+    registry = ModelRegistry.from_config(registry_config)
+    registry.register("trees", flat, joblib.load(art["preprocessor"]), feature_names, registry_config)
+    entry = registry.load("trees")
+    assert isinstance(entry.model.threshold, np.memmap)
+    X_test = ArtifactSaver.load_array(art["x_test"])
+    np.testing.assert_allclose(entry.model.predict_proba(X_test), forest.predict_proba(X_test))
+    with open(registry.path("trees", 1)) as f:
+        assert json.load(f)["model_class"].endswith("FlatTreeEnsemble")
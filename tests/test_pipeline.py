@@ -1,6 +1,10 @@
+import copy
+import os
+import tracemalloc
 import pytest
 import pandas as pd
 import numpy as np
+from data_pipeline.artifact_saver import ArtifactSaver
 from data_pipeline.data_pipeline import DataPipeline
 
 @pytest.fixture
@@ -94,3 +98,44 @@ def _validate_data(self, df: pd.DataFrame) -> None:
     tenure = pd.to_numeric(df['tenure'])
     if (tenure < 0).any() or (tenure > 100).any():
         raise ValueError("Tenure values out of expected range (0-100 months)")
+
+def test_run_in_memory_matches_artifacts_and_writes_nothing(pipeline_config, tmp_path):
+    # Stage cache and run report enabled, as in config/config.yaml: run_in_memory still writes nothing
+    pipeline_config["cache"] = {"enabled": True, "dir": str(tmp_path / "cache")}
+    pipeline_config["instrumentation"] = {"enabled": True, "report": str(tmp_path / "report" / "run_report.json")}
+    in_memory_config = copy.deepcopy(pipeline_config)
+    out = DataPipeline(in_memory_config).run_in_memory()
+    assert os.listdir(tmp_path) == []
+
+    DataPipeline(pipeline_config).run()
+    art = pipeline_config["artifacts"]
+    np.testing.assert_array_equal(out["X_train"], ArtifactSaver.load_array(art["x_train"]))
+    np.testing.assert_array_equal(out["X_test"], ArtifactSaver.load_array(art["x_test"]))
+    np.testing.assert_array_equal(out["y_train"], ArtifactSaver.load_array(art["y_train"]))
+    np.testing.assert_array_equal(out["y_test"], ArtifactSaver.load_array(art["y_test"]))
+    assert out["feature_names"] == list(np.load(art["feature_names"], allow_pickle=True))
+    # The test matrix is built by the compiled preprocessor; the sklearn one gives the same values
+    X_test = DataPipeline(in_memory_config)._resolve(["X_test"])["X_test"]
+    np.testing.assert_array_equal(out["preprocessor"].transform(X_test), out["X_test"])
+    assert set(out["fill_values"]) == {"TotalCharges"}
+
+    # Both are opt-in; the cached run gives the same matrices
+    cached = DataPipeline(copy.deepcopy(pipeline_config)).run_in_memory(use_cache=True, write_report=True)
+    assert os.path.exists(pipeline_config["instrumentation"]["report"])
+    np.testing.assert_array_equal(cached["X_train"], out["X_train"])
+
+def test_run_in_memory_peak_allocation(pipeline_config):
+    pipeline = DataPipeline(pipeline_config)
+    pipeline.run_in_memory()  # warm-up: lazy imports and one-off caches are not part of the budget
+    tracemalloc.start()
+    try:
+        out = pipeline.run_in_memory()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    output_bytes = out["X_train"].nbytes + out["X_test"].nbytes
+    # The dense matrices, sklearn's per-block copy of the train one while fitting, and the loaded frame
+    # and its split (about 2.1x the outputs with pandas 3, 2.4x with pandas 2 object strings);
+    # retaining intermediate frames or stacking the test blocks pushes it to about 2.8-3.0x
+    assert peak < 2.6 * output_bytes
+    assert out["X_train"].shape[0] + out["X_test"].shape[0] == 7043
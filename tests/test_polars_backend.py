@@ -0,0 +1,41 @@
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+from data_pipeline.data_pipeline import DataPipeline
+
+pytest.importorskip("polars")
+
+SCHEMA = {
+    "dtypes": {"gender": "category", "SeniorCitizen": "int64", "Partner": "category", "tenure": "int64",
+               "PaymentMethod": "category", "MonthlyCharges": "float64", "TotalCharges": "float64",
+               "InternetService": "category", "OnlineSecurity": "category", "Churn": "category"},
+    "usecols": ["gender", "SeniorCitizen", "Partner", "tenure", "PaymentMethod", "MonthlyCharges", "TotalCharges",
+                "InternetService", "OnlineSecurity", "Churn"],
+    "na_values": [" "],
+}
+
+def _both(config, outputs):
+    pandas_out = DataPipeline(config)._resolve(outputs)
+    polars_config = copy.deepcopy(config)
+    polars_config["execution"] = {**config.get("execution", {}), "backend": "polars"}
+    return pandas_out, DataPipeline(polars_config)._resolve(outputs)
+
+@pytest.mark.parametrize("engine", ["legacy", "vectorized"])
+@pytest.mark.parametrize("schema", [None, SCHEMA])
+def test_polars_plan_matches_pandas_stages(pipeline_config, engine, schema):
+    pipeline_config["features"] = {"engine": engine}
+    if schema is not None:
+        pipeline_config["data"]["schema"] = schema
+    # A service column absent from the extract is added as "No", as FeatureEngineering does
+    pipeline_config["preprocessing"]["service_columns"] = ["OnlineSecurity", "StreamingTV", "Pager"]
+    expected, actual = _both(pipeline_config, ["features_df", "fill_values"])
+    pd.testing.assert_frame_equal(actual["features_df"], expected["features_df"])
+    assert actual["fill_values"] == pytest.approx(expected["fill_values"])
+
+def test_polars_backend_produces_same_artifacts(pipeline_config):
+    expected, actual = _both(pipeline_config, ["X_train_proc", "X_test_proc", "y_train", "feature_names"])
+    np.testing.assert_array_equal(actual["X_train_proc"], expected["X_train_proc"])
+    np.testing.assert_array_equal(actual["X_test_proc"], expected["X_test_proc"])
+    np.testing.assert_array_equal(actual["y_train"], expected["y_train"])
+    assert actual["feature_names"] == expected["feature_names"]
@@ -0,0 +1,89 @@
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.score_cache import ScoreCache
+from data_pipeline.scoring_service import ChurnScorer
+
+@pytest.fixture
+def cached_config(pipeline_config, tmp_path):
+    # Full service list so the preprocessor output matches the 54 features the models were trained on
+    pipeline_config["preprocessing"]["service_columns"] = [
+        "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup",
+        "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"
+    ]
+    DataPipeline(pipeline_config).run()
+    model_path = str(tmp_path / "model.pkl")
+    shutil.copy("JoblibModels/logistic_regression.pkl", model_path)
+    pipeline_config["serving"] = {"model_path": model_path,
+                                  "cache": {"enabled": True, "path": str(tmp_path / "scores.sqlite")}}
+    return pipeline_config
+
+@pytest.fixture
+def records():
+    return pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv").head(60).drop(columns=["Churn"])
+
+def test_fingerprints_follow_values_and_columns():
+    X = pd.DataFrame({"a": [1.0, 2.0, 1.0], "b": ["x", "y", "x"]}, index=[10, 11, 12])
+    keys = ScoreCache.fingerprints(X)
+    assert len(keys[0]) == 16 and keys[0] == keys[2] != keys[1]
+    assert ScoreCache.fingerprints(X.reset_index(drop=True)) == keys
+    assert ScoreCache.fingerprints(X.rename(columns={"a": "c"}))[0] != keys[0]
+    assert ScoreCache.fingerprints(X.assign(a=[1.5, 2.0, 1.0]))[0] != keys[0]
+
+def test_lru_eviction_and_versioning(tmp_path):
+    path = str(tmp_path / "scores.sqlite")
+    cache = ScoreCache(path, "v1", max_entries=3)
+    cache.put_many([b"a", b"b", b"c"], [0.1, 0.2, 0.3])
+    cache.get_many([b"a"])                          # "b" and "c" are now least recently used
+    cache.put_many([b"d"], [0.4])                   # over capacity: trimmed to 90% of it
+    scores, hit = cache.get_many([b"a", b"b", b"c", b"d"])
+    assert hit.tolist() == [True, False, False, True] and np.isnan(scores[1])
+    assert cache.stats()["evictions"] == 2 and cache.stats()["entries"] == 2
+    cache.close()
+
+    # Same version: entries survive reopening; another version starts empty
+    assert ScoreCache(path, "v1", max_entries=3).get_many([b"d"])[0][0] == pytest.approx(0.4)
+    v2 = ScoreCache(path, "v2", max_entries=3)
+    assert v2.stats()["entries"] == 0 and v2.get_many([b"d"])[1].tolist() == [False]
+
+def test_versions_share_the_file(tmp_path):
+    path = str(tmp_path / "scores.sqlite")
+    a = ScoreCache(path, "a", max_entries=4)
+    a.put_many([b"x", b"y"], [0.1, 0.2])
+    b = ScoreCache(path, "b", max_entries=4)
+    b.put_many([b"x"], [0.9])
+    # Opening a scorer on one version keeps the other's entries
+    assert ScoreCache(path, "a", max_entries=4).get_many([b"x", b"y"])[0].tolist() == [0.1, 0.2]
+    assert b.get_many([b"x"])[0].tolist() == [0.9]
+    # The LRU spans versions: "a"'s entries, used least recently, are evicted first
+    b.put_many([b"y", b"z"], [0.8, 0.7])
+    assert a.get_many([b"x", b"y"])[1].tolist() == [False, False]
+    assert b.stats()["entries"] == 3 and b.stats()["total_entries"] == 3
+
+def test_scorer_only_scores_changed_rows(cached_config, records):
+    scorer = ChurnScorer(cached_config)
+    first = scorer.score(records.copy())
+    assert scorer.cache.stats()["misses"] == len(records)
+
+    changed = records.copy()
+    changed.loc[7, "MonthlyCharges"] += 10.0
+    # Later runs (new process, same artifacts) hit for every unchanged customer
+    scorer = ChurnScorer(cached_config)
+    second = scorer.score(changed.copy())
+    assert scorer.cache.stats()["hits"] == len(records) - 1 and scorer.cache.stats()["misses"] == 1
+    np.testing.assert_array_equal(np.delete(second, 7), np.delete(first, 7))
+
+    uncached = dict(cached_config, serving={"model_path": cached_config["serving"]["model_path"]})
+    np.testing.assert_allclose(second, ChurnScorer(uncached).score(changed.copy()))
+
+def test_new_model_invalidates_cache(cached_config, records):
+    ChurnScorer(cached_config).score(records.copy())
+    shutil.copy("JoblibModels/decision_tree.pkl", cached_config["serving"]["model_path"])
+    scorer = ChurnScorer(cached_config)
+    assert scorer.cache.stats()["entries"] == 0
+    scores = scorer.score(records.copy())
+    assert scorer.cache.stats()["hits"] == 0
+    np.testing.assert_allclose(scores, scorer.model.predict_proba(
+        scorer.preprocessor.transform(scorer.preparer.features_only(records.copy())))[:, 1])
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+import pandas as pd
+import numpy as np
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.scoring_service import ChurnScorer, MicroBatcher, ScoringServer
+
+MODEL_PATH = "JoblibModels/logistic_regression.pkl"
+
+@pytest.fixture
+def scoring_config(pipeline_config):
+    # Full service list so the preprocessor output matches the 54 features the models were trained on
+    pipeline_config["preprocessing"]["service_columns"] = [
+        "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup",
+        "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies"
+    ]
+    DataPipeline(pipeline_config).run()
+    pipeline_config["serving"] = {"model_path": MODEL_PATH, "max_batch_size": 64, "max_wait_ms": 20}
+    return pipeline_config
+
+@pytest.fixture
+def raw_records():
+    df = pd.read_csv("data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv").head(20)
+    return df.drop(columns=["Churn"]).to_dict(orient="records")
+
+def test_scorer_matches_manual_pipeline(scoring_config, raw_records):
+    scorer = ChurnScorer(scoring_config)
+    probs = scorer.score(pd.DataFrame.from_records(raw_records))
+    assert probs.shape == (20,)
+    assert ((probs >= 0) & (probs <= 1)).all()
+    # Scoring row by row gives the same answer as scoring the batch
+    single = [scorer.score(pd.DataFrame.from_records([r]))[0] for r in raw_records[:5]]
+    np.testing.assert_allclose(single, probs[:5])
+
+def test_blank_total_charges_uses_training_fill_value(scoring_config, raw_records):
+    scorer = ChurnScorer(scoring_config)
+    assert "TotalCharges" in scorer.preparer.fill_values
+    record = dict(raw_records[0], TotalCharges=" ")
+    filled = dict(raw_records[0], TotalCharges=scorer.preparer.fill_values["TotalCharges"])
+    np.testing.assert_allclose(scorer.score(pd.DataFrame([record])), scorer.score(pd.DataFrame([filled])))
+
+def test_batcher_coalesces_concurrent_requests(scoring_config, raw_records):
+    scorer = ChurnScorer(scoring_config)
+
+    async def run():
+        batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=50)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit([r]) for r in raw_records))
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert batcher.rows == 20
+    assert batcher.batches < 20
+    expected = scorer.score(pd.DataFrame.from_records(raw_records))
+    np.testing.assert_allclose([r[0] for r in results], expected)
+
+def test_http_roundtrip_and_bad_request(scoring_config, raw_records):
+    async def request(port, method, path, payload=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, data = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(data)
+
+    async def run():
+        server = ScoringServer.from_config(scoring_config)
+        server.port = 0
+        await server.start()
+        ok = await request(server.port, "POST", "/score", {"records": raw_records[:3]})
+        bad = await request(server.port, "POST", "/score", {"records": []})
+        missing = await request(server.port, "GET", "/nope")
+        await server.stop()
+        return ok, bad, missing
+
+    ok, bad, missing = asyncio.run(run())
+    assert ok[0] == 200 and len(ok[1]["churn_probability"]) == 3
+    assert bad[0] == 400
+    assert missing[0] == 404
@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pytest
+from scipy import sparse
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.shared_dataset import SharedDataset
+
+def _private_kib():
+    """Anonymous (private, non-shared) resident memory of this process."""
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("RssAnon:"))
+
+def _read_in_worker(spec):
+    before = _private_kib()
+    shared = SharedDataset.attached(spec)
+    X, csr = shared["X"], shared["csr"]
+    total = float(X.sum())  # touches every page of the block
+    writable = X.flags.writeable or csr.data.flags.writeable
+    return total, float(csr.sum()), csr.shape, writable, _private_kib() - before
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs Linux /proc")
+def test_workers_attach_without_copying():
+    X = np.random.default_rng(0).random((4096, 2048))  # 64 MiB
+    csr = sparse.random(500, 40, density=0.1, format="csr", random_state=0)
+    with SharedDataset.publish({"X": X, "csr": csr}) as shared:
+        np.testing.assert_array_equal(shared["X"], X)
+        with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(_read_in_worker, [shared.spec] * 4))
+        for total, csr_total, shape, writable, private_kib in results:
+            assert total == pytest.approx(X.sum()) and csr_total == pytest.approx(csr.sum())
+            assert shape == csr.shape and not writable
+            # A private copy would add 64 MiB per worker
+            assert private_kib < 8 * 1024
+        # Workers exiting does not remove the blocks; only the owner does
+        block = shared.spec["X"]["parts"]["values"][0]
+        SharedMemory(name=block).close()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=block)
+
+def test_from_artifacts_matches_saved_matrices(pipeline_config):
+    pipeline_config["preprocessing"]["sparse"] = True
+    DataPipeline(pipeline_config).run()
+    with SharedDataset.from_artifacts(pipeline_config) as shared:
+        attached = SharedDataset.attached(shared.spec)
+        X_train = ArtifactSaver.load_matrix(pipeline_config["artifacts"]["x_train"])
+        assert sparse.issparse(attached["x_train"])
+        assert (attached["x_train"] != X_train).nnz == 0
+        np.testing.assert_array_equal(attached["y_test"], np.load(pipeline_config["artifacts"]["y_test"])["arr_0"])
+        attached.close()
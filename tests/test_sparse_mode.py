@@ -0,0 +1,46 @@
+import copy
+import pytest
+import numpy as np
+from scipy import sparse
+from data_pipeline.artifact_saver import ArtifactSaver, SparseNpzStreamWriter
+from data_pipeline.data_pipeline import DataPipeline
+
+def _run(config, tmp_path, name, **overrides):
+    config = copy.deepcopy(config)
+    config["preprocessing"].update(overrides.pop("preprocessing", {}))
+    config.update(overrides)
+    for key, path in config["artifacts"].items():
+        config["artifacts"][key] = path.replace("artifacts", name)
+    DataPipeline(config).run()
+    return ArtifactSaver.load_matrix(config["artifacts"]["x_train"]), ArtifactSaver.load_matrix(config["artifacts"]["x_test"])
+
+def test_sparse_stream_writer_roundtrip(tmp_path):
+    X = sparse.random(50, 6, density=0.3, format="csr", random_state=0)
+    path = str(tmp_path / "x.npz")
+    with SparseNpzStreamWriter(path, n_cols=6) as writer:
+        writer.write(X[:20])
+        writer.write(X[20:])
+    loaded = ArtifactSaver.load_matrix(path)
+    assert sparse.isspmatrix_csr(loaded)
+    assert (loaded != X).nnz == 0
+
+def test_sparse_mode_matches_dense(pipeline_config, tmp_path):
+    dense_train, dense_test = _run(pipeline_config, tmp_path, "dense")
+    sparse_train, sparse_test = _run(pipeline_config, tmp_path, "sparse", preprocessing={"sparse": True})
+    assert sparse.issparse(sparse_train) and sparse.issparse(sparse_test)
+    np.testing.assert_array_equal(sparse_train.toarray(), dense_train)
+    np.testing.assert_array_equal(sparse_test.toarray(), dense_test)
+
+def test_sparse_mode_smote_keeps_csr(pipeline_config, tmp_path):
+    X_train, _ = _run(pipeline_config, tmp_path, "smote", preprocessing={"sparse": True, "smote": True})
+    assert sparse.isspmatrix_csr(X_train)
+    y_train = np.load(pipeline_config["artifacts"]["y_train"].replace("artifacts", "smote"))["arr_0"]
+    assert X_train.shape[0] == len(y_train)
+    assert y_train.mean() == pytest.approx(0.5)
+
+def test_chunked_sparse_matches_chunked_dense(pipeline_config, tmp_path):
+    chunked = {"execution": {"mode": "chunked", "chunk_size": 2000}}
+    dense_train, _ = _run(pipeline_config, tmp_path, "cdense", **copy.deepcopy(chunked))
+    sparse_train, _ = _run(pipeline_config, tmp_path, "csparse", preprocessing={"sparse": True}, **copy.deepcopy(chunked))
+    assert sparse.issparse(sparse_train)
+    np.testing.assert_array_equal(sparse_train.toarray(), dense_train)
@@ -0,0 +1,90 @@
+import os
+import threading
+import pytest
+import pandas as pd
+import numpy as np
+from data_pipeline.stage_cache import StageCache
+
+@pytest.fixture
+def cache(tmp_path):
+    return StageCache(str(tmp_path / "cache"), max_bytes=10_000_000)
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'gender': ['Male', 'Female', None, 'Female'],
+        'tenure': [1, 34, 2, 45],
+        'TotalCharges': [29.85, np.nan, 108.15, 1840.75],
+        'TenureCategory': pd.Categorical(['New', 'Loyal', 'New', None], categories=['New', 'Loyal'], ordered=True)
+    }, index=[10, 3, 7, 1])
+
+def test_frame_roundtrip(cache, sample_df):
+    key = StageCache.key("clean", {"a": 1}, [])
+    cache.save("clean", key, {"df": sample_df, "y": sample_df["tenure"], "arr": np.eye(3), "names": ["a", "b"]})
+    loaded = cache.load("clean", key)
+    pd.testing.assert_frame_equal(loaded["df"], sample_df)
+    pd.testing.assert_series_equal(loaded["y"], sample_df["tenure"])
+    assert np.array_equal(loaded["arr"], np.eye(3))
+    assert loaded["names"] == ["a", "b"]
+
+def test_key_depends_on_config_and_upstream():
+    base = StageCache.key("encode", {"encoding": "onehot"}, ["abc"])
+    assert base == StageCache.key("encode", {"encoding": "onehot"}, ["abc"])
+    assert base != StageCache.key("encode", {"encoding": "label"}, ["abc"])
+    assert base != StageCache.key("encode", {"encoding": "onehot"}, ["abd"])
+
+def test_miss_returns_none(cache):
+    assert cache.load("clean", StageCache.key("clean", {}, [])) is None
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = StageCache(str(tmp_path / "cache"), max_bytes=20_000)
+    keys = [StageCache.key("s", {"i": i}, []) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.save("s", key, {"arr": np.full(1000, i, dtype=np.float64)})
+        # mtime resolution can be coarse; make the access order explicit
+        manifest = os.path.join(cache._entry_dir("s", key), "manifest.json")
+        os.utime(manifest, (i, i))
+    cache.evict()
+    assert cache.load("s", keys[0]) is None
+    assert cache.load("s", keys[2]) is not None
+
+def test_file_digest_tracks_content(cache, tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    first = cache.file_digest(str(path))
+    path.write_text("a,b\n1,3\n")
+    os.utime(path, ns=(0, 1))
+    assert cache.file_digest(str(path)) != first
+
+def test_file_digest_recovers_from_damaged_memo(cache, tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    memo_path = os.path.join(cache.cache_dir, "file_digests.json")
+    with open(memo_path, "w") as f:
+        f.write('{"truncat')  # what a reader racing a plain open(..., "w") could see
+    assert cache.file_digest(str(path)) == StageCache.sha256(str(path))
+    assert cache.file_digest(str(path)) == StageCache.sha256(str(path))
+    assert os.listdir(cache.cache_dir) == ["file_digests.json"]
+
+def test_concurrent_saves_and_eviction(tmp_path):
+    cache = StageCache(str(tmp_path / "cache"), max_bytes=200_000)
+    errors = []
+
+    def worker(t):
+        try:
+            for i in range(60):
+                key = StageCache.key("stage", {"t": t, "i": i % 20}, [])
+                cache.save("stage", key, {"X": np.full((2000,), i, dtype=np.float64)})
+                out = cache.load("stage", key)
+                assert out is None or out["X"][0] == i
+        except Exception as e:  # collected so the main thread sees failures
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not [n for n in os.listdir(cache.cache_dir) if n.endswith(".tmp")]
+    assert sum(StageCache._dir_size(os.path.join(cache.cache_dir, n)) for n in os.listdir(cache.cache_dir)) <= 200_000
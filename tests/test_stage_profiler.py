@@ -0,0 +1,66 @@
+import json
+import os
+import pytest
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.stage_profiler import StageProfiler
+
+def _report(config):
+    with open(os.path.join(os.path.dirname(config["artifacts"]["x_train"]), "run_report.json")) as f:
+        return json.load(f)
+
+def test_in_memory_run_report(pipeline_config):
+    pipeline_config["instrumentation"] = {"enabled": True}
+    DataPipeline(pipeline_config).run()
+    report = _report(pipeline_config)
+
+    assert report["mode"] == "in_memory"
+    stages = {s["stage"]: s for s in report["stages"]}
+    assert set(stages) == {"clean", "features", "split", "encode", "encode_test", "resample", "save_train",
+                           "save_test", "save_preprocessor", "save_metadata", "save_manifest"}
+    for s in stages.values():
+        assert s["wall_s"] >= 0 and s["cpu_s"] >= 0
+        assert "rss_peak_delta_bytes" in s
+    assert stages["clean"]["outputs"]["clean_df"][0] == 7043
+    assert stages["encode"]["inputs"]["X_train"] == [5634, 24]
+    assert stages["encode"]["outputs"]["X_train_proc"][0] == 5634
+
+def test_cache_hits_are_reported(pipeline_config, tmp_path):
+    pipeline_config["instrumentation"] = {"enabled": True}
+    pipeline_config["cache"] = {"enabled": True, "dir": str(tmp_path / "cache")}
+    DataPipeline(pipeline_config).run()
+    DataPipeline(pipeline_config).run()
+    stages = {s["stage"]: s for s in _report(pipeline_config)["stages"]}
+    # Every requested output comes from a cache entry, so the features stage never runs
+    assert stages["encode"]["cache"] == "hit"
+    assert stages["clean"]["cache"] == "hit"
+    assert "features" not in stages
+    assert stages["resample"]["cache"] == "off"
+
+@pytest.mark.parametrize("profiler", ["cprofile", "tracemalloc"])
+def test_profile_hook(pipeline_config, profiler):
+    pipeline_config["instrumentation"] = {"enabled": True, "profile_stage": "encode", "profiler": profiler, "top": 5}
+    DataPipeline(pipeline_config).run()
+    stages = {s["stage"]: s for s in _report(pipeline_config)["stages"]}
+    profile = stages["encode"]["profile"]
+    assert profile["kind"] == profiler
+    assert "profile" not in stages["clean"]
+    if profiler == "cprofile":
+        assert os.path.exists(profile["stats_file"])
+        assert 0 < len(profile["top_cumulative"]) <= 5
+    else:
+        assert profile["traced_peak_bytes"] > 0
+
+def test_chunked_run_report(pipeline_config):
+    pipeline_config["instrumentation"] = {"enabled": True}
+    pipeline_config["execution"] = {"mode": "chunked", "chunk_size": 2000}
+    DataPipeline(pipeline_config).run()
+    report = _report(pipeline_config)
+    assert [s["stage"] for s in report["stages"]] == ["imputation_pass", "fit_pass", "transform_pass", "save"]
+
+def test_disabled_by_default(pipeline_config):
+    DataPipeline(pipeline_config).run()
+    assert not os.path.exists(os.path.join(os.path.dirname(pipeline_config["artifacts"]["x_train"]), "run_report.json"))
+
+def test_unknown_profiler():
+    with pytest.raises(ValueError):
+        StageProfiler(profiler="perf")
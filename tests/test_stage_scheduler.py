@@ -0,0 +1,59 @@
+import copy
+import os
+import threading
+import pytest
+import numpy as np
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.stage_scheduler import StageScheduler
+
+def test_order_and_graph_errors():
+    graph = {"c": ["a", "b"], "a": [], "b": ["a"]}
+    assert StageScheduler.order(graph) == ["a", "b", "c"]
+    with pytest.raises(ValueError, match="unknown"):
+        StageScheduler.order({"a": ["missing"]})
+    with pytest.raises(ValueError, match="cycle"):
+        StageScheduler.order({"a": ["b"], "b": ["a"]})
+
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+    done = []
+
+    def job(node):
+        if node in ("left", "right"):
+            # Deadlocks (BrokenBarrierError) unless both branches run at the same time
+            barrier.wait()
+        done.append(node)
+
+    StageScheduler(max_workers=2).run({"root": [], "left": ["root"], "right": ["root"], "join": ["left", "right"]}, job)
+    assert done[0] == "root" and done[-1] == "join"
+
+def test_failure_propagates():
+    def job(node):
+        if node == "bad":
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        StageScheduler(max_workers=2).run({"bad": [], "after": ["bad"]}, job)
+
+@pytest.mark.parametrize("execution", [{"workers": 4}, {"workers": 2, "executor": "process"}])
+def test_parallel_run_matches_sequential(pipeline_config, execution):
+    pipeline_config["preprocessing"]["smote"] = True
+    configs = {}
+    for name, conf in (("sequential", {"workers": 1}), ("parallel", execution)):
+        configs[name] = copy.deepcopy(pipeline_config)
+        configs[name]["execution"] = conf
+        for key, path in configs[name]["artifacts"].items():
+            configs[name]["artifacts"][key] = path.replace("artifacts", name)
+        DataPipeline(configs[name]).run()
+    for key in ("x_train", "y_train", "x_test", "y_test"):
+        np.testing.assert_array_equal(ArtifactSaver.load_matrix(configs["sequential"]["artifacts"][key]),
+                                      ArtifactSaver.load_matrix(configs["parallel"]["artifacts"][key]))
+
+def test_run_single_stage(pipeline_config):
+    out = DataPipeline(pipeline_config).run_stage("encode")
+    assert set(out) == {"X_train_proc", "preprocessor", "feature_names"}
+    assert out["X_train_proc"].shape[0] == 5634
+    assert not os.path.exists(pipeline_config["artifacts"]["x_train"])
+    with pytest.raises(ValueError, match="Unknown stage"):
+        DataPipeline(pipeline_config).run_stage("train_model")
@@ -0,0 +1,42 @@
+import copy
+import json
+import os
+import pytest
+import numpy as np
+from data_pipeline.artifact_saver import ArtifactSaver
+from data_pipeline.data_pipeline import DataPipeline
+from data_pipeline.sweep_runner import SweepRunner
+
+GRID = {"preprocessing.encoding": ["onehot", "label"], "preprocessing.smote": [True, False]}
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_sweep_matches_individual_runs(pipeline_config, tmp_path, executor):
+    out_dir = str(tmp_path / "sweep")
+    summary = SweepRunner(pipeline_config, GRID, out_dir, workers=2, executor=executor).run()
+
+    names = [v["name"] for v in summary["variants"]]
+    assert names == ["encoding-onehot_smote-true", "encoding-onehot_smote-false",
+                     "encoding-label_smote-true", "encoding-label_smote-false"]
+    # clean/features/split once, encode + encode_test per encoding, the rest per variant
+    n_stages = len(DataPipeline(pipeline_config).stage_names())
+    assert summary["stage_runs_without_sharing"] == 4 * n_stages
+    assert summary["stage_runs"] == 3 + 2 * 2 + 4 * (n_stages - 5)
+    with open(os.path.join(out_dir, "sweep.json")) as f:
+        assert json.load(f)["stage_runs"] == summary["stage_runs"]
+
+    for variant in summary["variants"]:
+        conf = copy.deepcopy(pipeline_config)
+        conf["preprocessing"]["encoding"] = variant["overrides"]["preprocessing.encoding"]
+        conf["preprocessing"]["smote"] = variant["overrides"]["preprocessing.smote"]
+        DataPipeline(conf).run()
+        for key in ("x_train", "y_train", "x_test", "y_test"):
+            assert os.path.dirname(variant["artifacts"][key]) == os.path.join(out_dir, variant["name"])
+            np.testing.assert_array_equal(ArtifactSaver.load_matrix(variant["artifacts"][key]),
+                                          ArtifactSaver.load_matrix(conf["artifacts"][key]))
+
+def test_sweep_rejects_empty_grid_and_chunked_mode(pipeline_config, tmp_path):
+    with pytest.raises(ValueError):
+        SweepRunner(pipeline_config, {}, str(tmp_path))
+    pipeline_config["execution"] = {"mode": "chunked"}
+    with pytest.raises(ValueError):
+        SweepRunner(pipeline_config, GRID, str(tmp_path))
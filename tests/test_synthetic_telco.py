@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from benchmarks.synthetic_telco import COLUMNS, TelcoSynthesizer
+from data_pipeline.data_ingestion import DataIngestion
+
+SOURCE = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+@pytest.fixture(scope="module")
+def synth():
+    return TelcoSynthesizer.from_csv(SOURCE)
+
+def test_generate_matches_schema(synth):
+    df = synth.generate(20_000, seed=1)
+    source = pd.read_csv(SOURCE)
+    assert list(df.columns) == COLUMNS
+    for col in ["Contract", "PaymentMethod", "InternetService", "MultipleLines"]:
+        assert set(df[col].unique()) <= set(source[col].unique())
+    assert df["Churn"].eq("Yes").mean() == pytest.approx(source["Churn"].eq("Yes").mean(), abs=0.02)
+    # Dependent services stay consistent with their parent
+    no_internet = df["InternetService"] == "No"
+    assert (df.loc[no_internet, "TechSupport"] == "No internet service").all()
+    assert (df.loc[~no_internet, "TechSupport"] != "No internet service").all()
+    assert df.loc[df["tenure"] == 0, "TotalCharges"].isna().all()
+
+def test_generate_is_seeded(synth):
+    pd.testing.assert_frame_equal(synth.generate(500, seed=3), synth.generate(500, seed=3))
+
+def test_cardinality_widens_levels():
+    synth = TelcoSynthesizer.from_csv(SOURCE, cardinality={"PaymentMethod": 40})
+    df = synth.generate(50_000, seed=0)
+    assert 4 < df["PaymentMethod"].nunique() <= 40
+
+def test_write_csv_roundtrips_through_ingestion(synth, tmp_path):
+    path = synth.write_csv(str(tmp_path / "telco.csv"), 2_500, chunk_size=1_000)
+    config = {"data": {"file_path": path, "drop_columns": ["customerID"], "target_column": "Churn",
+                       "target_mapping": {"Yes": 1, "No": 0}}}
+    ingestion = DataIngestion(config)
+    df = ingestion.basic_clean(ingestion.load_data())
+    assert len(df) == 2_500
+    assert "customerID" not in df.columns
+    assert pd.to_numeric(df["TotalCharges"], errors="coerce").notna().sum() == (df["tenure"] > 0).sum()
@@ -0,0 +1,123 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from data_pipeline.flat_trees import FlatTreeEnsemble
+from data_pipeline.tree_exporter import TreeEnsembleExporter
+
+def _data(n=3000, n_features=8, seed=0, nan_rate=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    if nan_rate:
+        X[rng.random(X.shape) < nan_rate] = np.nan
+    return X, y
+
+def _boundary_rows(flat, n_features, rng):
+    """Rows whose features sit exactly on, just below and just above split thresholds."""
+    internal = (flat.feature >= 0) & np.isfinite(flat.threshold) & (np.abs(flat.threshold) < 1e30)
+    X = rng.normal(size=(600, n_features)).astype(np.float32)
+    picks = rng.choice(np.flatnonzero(internal), size=600)
+    for k, node in enumerate(picks):
+        t = flat.threshold[node]
+        X[k, flat.feature[node]] = (t, np.nextafter(t, np.float32(np.inf)), np.nextafter(t, np.float32(-np.inf)))[k % 3]
+    return X.astype(np.float64)
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeClassifier(max_depth=8, random_state=0),
+    RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0),
+    GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0),
+])
+def test_sklearn_models_match(model):
+    X, y = _data(nan_rate=0.0 if isinstance(model, GradientBoostingClassifier) else 0.05)
+    model.fit(X, y)
+    flat = TreeEnsembleExporter.export(model)
+    X_test, _ = _data(n=1000, seed=1, nan_rate=0.0 if isinstance(model, GradientBoostingClassifier) else 0.05)
+    X_test = np.vstack([X_test, _boundary_rows(flat, X.shape[1], np.random.default_rng(2))])
+    np.testing.assert_allclose(flat.predict_proba(X_test), model.predict_proba(X_test), rtol=1e-9, atol=1e-12)
+
+def test_pickled_decision_tree_and_roundtrip(tmp_path):
+    model = joblib.load("JoblibModels/decision_tree.pkl")
+    flat = TreeEnsembleExporter.export(model)
+    path = str(tmp_path / "tree.npz")
+    flat.save(path)
+    loaded = FlatTreeEnsemble.load(path)
+    rng = np.random.default_rng(0)
+    X = np.vstack([rng.normal(size=(500, model.n_features_in_)), _boundary_rows(flat, model.n_features_in_, rng)])
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), atol=1e-12)
+    assert loaded.info() == flat.info()
+    with pytest.raises(ValueError):
+        loaded.predict_proba(X[:, :3])
+
+def test_float32_at_most():
+    for t in (0.1, 1.5, -2.75, 1e-8):
+        for strict in (False, True):
+            f = FlatTreeEnsemble.float32_at_most(t, strict=strict)
+            xs = np.array([np.nextafter(f, np.float32(-1e9)), f, np.nextafter(f, np.float32(1e9))], dtype=np.float32)
+            expected = xs.astype(np.float64) < t if strict else xs.astype(np.float64) <= t
+            np.testing.assert_array_equal(xs <= f, expected)
+
+def test_xgboost_matches():
+    xgb = pytest.importorskip("xgboost")
+    X, y = _data(nan_rate=0.05)
+    model = xgb.XGBClassifier(n_estimators=40, max_depth=4).fit(X, y)
+    flat = TreeEnsembleExporter.export(model)
+    np.testing.assert_allclose(flat.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+def test_catboost_matches():
+    catboost = pytest.importorskip("catboost")
+    X, y = _data()
+    model = catboost.CatBoostClassifier(iterations=40, depth=4, verbose=False).fit(X, y)
+    flat = TreeEnsembleExporter.export(model)
+    np.testing.assert_allclose(flat.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+def test_unsupported_model():
+    from sklearn.linear_model import LogisticRegression
+    X, y = _data(n=200)
+    with pytest.raises(TypeError):
+        TreeEnsembleExporter.export(LogisticRegression().fit(X, y))
+
+def test_oblivious_tree_unrolling():
+    # CatBoost leaf index: bit l set when feature(split l) > border l
+    rng = np.random.default_rng(0)
+    splits = [{"float_feature_index": f, "border": b} for f, b in ((2, 0.1), (0, -0.3), (1, 0.7))]
+    leaf_values = rng.normal(size=8)
+    tree = TreeEnsembleExporter._oblivious_nodes(splits, leaf_values, {})
+    flat = FlatTreeEnsemble.from_nodes([tree], 3, link="identity")
+    X = rng.normal(size=(400, 3))
+    bits = sum((X[:, s["float_feature_index"]] > s["border"]).astype(int) << level for level, s in enumerate(splits))
+    np.testing.assert_allclose(flat.predict_margin(X), leaf_values[bits])
+
+class XGBClassifier:
+    """Stand-in exposing the booster JSON interface the exporter reads."""
+    n_features_in_ = 2
+
+    def __init__(self, dumps, base_score=0.5):
+        self.dumps, self.base_score = dumps, base_score
+
+    def get_booster(self):
+        return self
+
+    feature_names = None
+
+    def save_config(self):
+        import json
+        return json.dumps({"learner": {"objective": {"name": "binary:logistic"},
+                                       "learner_model_param": {"base_score": str(self.base_score)},
+                                       "gradient_booster": {"gbtree_model_param": {"num_parallel_tree": "1"}}}})
+
+    def get_dump(self, dump_format="json"):
+        return self.dumps
+
+def test_xgboost_dump_parsing():
+    import json
+    tree = {"nodeid": 0, "split": "f1", "split_condition": 0.5, "yes": 1, "no": 2, "missing": 2, "children": [
+        {"nodeid": 1, "leaf": -0.4},
+        {"nodeid": 2, "split": "f0", "split_condition": -1.0, "yes": 3, "no": 4, "missing": 3, "children": [
+            {"nodeid": 3, "leaf": 0.2}, {"nodeid": 4, "leaf": 0.9}]}]}
+    flat = TreeEnsembleExporter.export(XGBClassifier([json.dumps(tree)], base_score=0.3))
+    X = np.array([[0.0, 0.4], [0.0, 0.5], [-1.0, 0.7], [-1.5, np.nan], [np.nan, 0.6], [2.0, 3.0]])
+    leaves = np.array([-0.4, 0.9, 0.9, 0.2, 0.2, 0.9])  # x < condition goes "yes"
+    margin = np.log(0.3 / 0.7) + leaves
+    np.testing.assert_allclose(flat.predict_proba(X)[:, 1], 1 / (1 + np.exp(-margin)))